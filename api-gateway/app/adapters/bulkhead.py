@@ -0,0 +1,115 @@
+"""
+This module is responsible for bounding the concurrent requests to each in-network service.
+"""
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import async_timeout
+from fastapi import HTTPException, status
+
+from app.adapters.telemetry.prometheus import (BULKHEAD_IN_FLIGHT, BULKHEAD_QUEUE_DEPTH, BULKHEAD_QUEUE_WAIT,
+                                               BULKHEAD_REJECTIONS)
+from app.domain.models import BulkheadPolicy, Service
+from app.settings.app_settings import ApplicationSettings
+
+log = logging.getLogger("uvicorn")
+app_name = ApplicationSettings().get_app_name()
+
+
+class BulkheadFullError(HTTPException):
+    """
+    Raised when a request is shed because its service has too many requests in flight and waiting.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                         detail=f"Service {name} is overloaded.")
+
+
+class Bulkhead:
+    """
+    Bounds the requests in flight to a service, and the requests waiting for one of them to complete.
+
+    Requests beyond both bounds, or waiting longer than the queue timeout, are shed, so that a spike of traffic to a
+    slow service fails fast instead of piling up in the gateway.
+
+    Attributes:
+        name (str): the service name.
+        policy (BulkheadPolicy): the bulkhead settings.
+        semaphore (asyncio.Semaphore): the slots of the requests in flight.
+        queued (int): number of requests waiting for a slot.
+    """
+
+    def __init__(self, name: str, policy: BulkheadPolicy):
+        self.name = name
+        self.policy = policy
+        self.semaphore = asyncio.Semaphore(policy.max_concurrent)
+        self.queued = 0
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """
+        Holds a slot for the duration of a request, waiting for one if they are all taken.
+
+        Raises:
+            BulkheadFullError: when the queue is full, or the request waited too long.
+        """
+        if self.semaphore.locked():
+            await self._wait()
+        else:
+            await self.semaphore.acquire()
+
+        BULKHEAD_IN_FLIGHT.labels(service=self.name, app_name=app_name).inc()
+
+        try:
+            yield
+        finally:
+            self.semaphore.release()
+            BULKHEAD_IN_FLIGHT.labels(service=self.name, app_name=app_name).dec()
+
+    async def _wait(self) -> None:
+        if self.queued >= self.policy.max_queued:
+            self._reject(reason="queue_full")
+
+        self.queued += 1
+        BULKHEAD_QUEUE_DEPTH.labels(service=self.name, app_name=app_name).set(self.queued)
+        start = time.perf_counter()
+
+        try:
+            async with async_timeout.timeout(self.policy.queue_timeout):
+                await self.semaphore.acquire()
+        except asyncio.TimeoutError:
+            self._reject(reason="queue_timeout")
+        finally:
+            self.queued -= 1
+            BULKHEAD_QUEUE_DEPTH.labels(service=self.name, app_name=app_name).set(self.queued)
+            BULKHEAD_QUEUE_WAIT.labels(service=self.name, app_name=app_name).observe(time.perf_counter() - start)
+
+    def _reject(self, reason: str) -> None:
+        BULKHEAD_REJECTIONS.labels(service=self.name, reason=reason, app_name=app_name).inc()
+        log.warning(f"Request to {self.name} shed: {reason}")
+        raise BulkheadFullError(self.name)
+
+
+bulkheads: dict[str, Bulkhead] = dict()
+
+
+def get_bulkhead(service: Service) -> Bulkhead:
+    """
+    Get the bulkhead of a service, creating it on first use.
+
+    Args:
+        service: the in-network service
+
+    Returns:
+        Bulkhead: the service bulkhead.
+    """
+    key = service.name.lower()
+
+    if (bulkhead := bulkheads.get(key)) is None or bulkhead.policy != service.bulkhead:
+        bulkhead = bulkheads[key] = Bulkhead(name=service.name, policy=service.bulkhead)
+
+    return bulkhead
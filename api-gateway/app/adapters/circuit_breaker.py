@@ -0,0 +1,156 @@
+"""
+This module is responsible for shielding in-network services, and the gateway, from calls to a failing service.
+"""
+import logging
+import time
+from collections import deque
+from typing import Callable
+
+from fastapi import HTTPException, status
+
+from app.adapters.telemetry.prometheus import CIRCUIT_BREAKER_REJECTIONS, CIRCUIT_BREAKER_STATE
+from app.domain.models import CircuitBreakerPolicy, CircuitState, Service
+from app.settings.app_settings import ApplicationSettings
+
+log = logging.getLogger("uvicorn")
+app_name = ApplicationSettings().get_app_name()
+
+STATE_VALUES = {CircuitState.CLOSED: 0, CircuitState.HALF_OPEN: 1, CircuitState.OPEN: 2}
+
+
+class CircuitOpenError(HTTPException):
+    """
+    Raised when a call is rejected because the circuit of its service is open.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                         detail=f"Service {name} is unavailable.")
+
+
+class CircuitBreaker:
+    """
+    Tracks the outcome of the calls to a service, and rejects calls while it is failing.
+
+    The circuit opens once the rate of failed or slow calls, over the most recent ones, reaches the policy
+    threshold. After a while, it half-opens to let a few trial calls through: the circuit closes again if they
+    all succeed, and reopens on the first failure.
+
+    Attributes:
+        name (str): the service name.
+        policy (CircuitBreakerPolicy): the breaker settings.
+        outcomes (deque[bool]): whether each of the most recent calls failed.
+        opened_at (float): when the circuit last opened, according to the clock.
+        trials (int): number of trial calls let through since the circuit half-opened.
+        successes (int): number of trial calls which succeeded since the circuit half-opened.
+    """
+
+    def __init__(self, name: str, policy: CircuitBreakerPolicy, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.policy = policy
+        self.clock = clock
+        self.outcomes: deque[bool] = deque(maxlen=policy.window)
+        self.opened_at = 0.0
+        self.trials = 0
+        self.successes = 0
+        self._state = CircuitState.CLOSED
+        self._export()
+
+    @property
+    def state(self) -> CircuitState:
+        """
+        The circuit state, which turns half-open once the circuit has been open long enough.
+        """
+        if self._state == CircuitState.OPEN and self.clock() - self.opened_at >= self.policy.open_duration:
+            self._transition(CircuitState.HALF_OPEN)
+
+        return self._state
+
+    def acquire(self) -> None:
+        """
+        Lets a call through, unless the circuit is open or enough trial calls are already in flight.
+
+        Raises:
+            CircuitOpenError: when the call is rejected.
+        """
+        match self.state:
+            case CircuitState.CLOSED:
+                return
+            case CircuitState.HALF_OPEN if self.trials < self.policy.half_open_calls:
+                self.trials += 1
+                return
+
+        CIRCUIT_BREAKER_REJECTIONS.labels(service=self.name, app_name=app_name).inc()
+        raise CircuitOpenError(self.name)
+
+    def record(self, failed: bool, duration: float) -> None:
+        """
+        Records the outcome of a call which was let through.
+
+        Args:
+            failed (bool): whether the call failed
+            duration (float): seconds the call took, slow calls count as failed
+        """
+        failed = failed or duration >= self.policy.slow_call_duration
+
+        match self._state:
+            case CircuitState.HALF_OPEN if failed:
+                self._open()
+            case CircuitState.HALF_OPEN:
+                self.successes += 1
+                if self.successes >= self.policy.half_open_calls:
+                    self._transition(CircuitState.CLOSED)
+            case CircuitState.CLOSED:
+                self.outcomes.append(failed)
+                if len(self.outcomes) >= self.policy.minimum_calls and self.failure_rate >= self.policy.failure_rate:
+                    self._open()
+
+    def release(self) -> None:
+        """
+        Gives back the slot of a call which was let through but never completed, like a cancelled one.
+        """
+        if self._state == CircuitState.HALF_OPEN and self.trials > 0:
+            self.trials -= 1
+
+    @property
+    def failure_rate(self) -> float:
+        """
+        The rate of failed calls among the most recent ones.
+        """
+        return sum(self.outcomes) / len(self.outcomes) if self.outcomes else 0.0
+
+    def _open(self) -> None:
+        self.opened_at = self.clock()
+        log.warning(f"Circuit of service {self.name} opened, failure rate: {self.failure_rate:.2f}")
+        self._transition(CircuitState.OPEN)
+
+    def _transition(self, state: CircuitState) -> None:
+        self._state = state
+        self.outcomes.clear()
+        self.trials = 0
+        self.successes = 0
+        self._export()
+
+    def _export(self) -> None:
+        CIRCUIT_BREAKER_STATE.labels(service=self.name, app_name=app_name).set(STATE_VALUES[self._state])
+
+
+circuit_breakers: dict[str, CircuitBreaker] = dict()
+
+
+def get_circuit_breaker(service: Service) -> CircuitBreaker:
+    """
+    Get the circuit breaker of a service, creating it on first use.
+
+    Args:
+        service: the in-network service
+
+    Returns:
+        CircuitBreaker: the service circuit breaker.
+    """
+    key = service.name.lower()
+
+    if (breaker := circuit_breakers.get(key)) is None or breaker.policy != service.circuit_breaker:
+        breaker = circuit_breakers[key] = CircuitBreaker(name=service.name, policy=service.circuit_breaker)
+
+    return breaker
@@ -0,0 +1,172 @@
+"""
+This module is responsible for adapting the concurrency of the requests to each in-network service to its latency.
+"""
+import abc
+import math
+
+from fastapi import HTTPException, status
+
+from app.adapters.telemetry.prometheus import CONCURRENCY_LIMIT, CONCURRENCY_LIMIT_REJECTIONS
+from app.domain.models import ConcurrencyLimitPolicy, LimitAlgorithm, Service
+from app.settings.app_settings import ApplicationSettings
+
+app_name = ApplicationSettings().get_app_name()
+
+# Number of samples the long-term latency of the gradient algorithm is averaged over.
+LONG_WINDOW = 600
+# Lowest ratio the gradient algorithm shrinks the limit by at once.
+MIN_GRADIENT = 0.5
+
+
+class ConcurrencyLimitError(HTTPException):
+    """
+    Raised when a request is rejected because its service already has as many requests in flight as it can take.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                         detail=f"Service {name} is overloaded.")
+
+
+class ConcurrencyLimiter(abc.ABC):
+    """
+    Limits the requests in flight to a service, adjusting the limit after the outcome of each of them.
+
+    Attributes:
+        name (str): the service name.
+        policy (ConcurrencyLimitPolicy): the limiter settings.
+        limit (float): the requests allowed in flight.
+        in_flight (int): the requests currently in flight.
+    """
+
+    def __init__(self, name: str, policy: ConcurrencyLimitPolicy):
+        self.name = name
+        self.policy = policy
+        self.limit = float(policy.initial_limit)
+        self.in_flight = 0
+        self._export()
+
+    def acquire(self) -> None:
+        """
+        Lets a request through, unless the limit is reached.
+
+        Raises:
+            ConcurrencyLimitError: when the request is rejected.
+        """
+        if self.in_flight >= int(self.limit):
+            CONCURRENCY_LIMIT_REJECTIONS.labels(service=self.name, app_name=app_name).inc()
+            raise ConcurrencyLimitError(self.name)
+
+        self.in_flight += 1
+
+    def release(self, latency: float | None = None, dropped: bool = False) -> None:
+        """
+        Tracks the completion of a request which was let through, adjusting the limit after its outcome.
+
+        Args:
+            latency (float | None): seconds the request took, None if it did not complete
+            dropped (bool): whether the request failed
+        """
+        self.in_flight -= 1
+
+        if latency is None:
+            return
+
+        limit = min(max(self.adjust(latency=latency, dropped=dropped), self.policy.min_limit), self.policy.max_limit)
+
+        if limit != self.limit:
+            self.limit = limit
+            self._export()
+
+    @abc.abstractmethod
+    def adjust(self, latency: float, dropped: bool) -> float:
+        """
+        Computes the next limit.
+
+        Args:
+            latency (float): seconds the request took
+            dropped (bool): whether the request failed
+
+        Returns:
+            float: the next limit, yet to be bounded.
+        """
+        raise NotImplementedError
+
+    @property
+    def saturated(self) -> bool:
+        """
+        Whether the requests in flight actually use the limit, which should only grow in that case.
+        """
+        return self.in_flight + 1 >= self.limit / 2
+
+    def _export(self) -> None:
+        CONCURRENCY_LIMIT.labels(service=self.name, app_name=app_name).set(int(self.limit))
+
+
+class AimdLimiter(ConcurrencyLimiter):
+    """
+    Additive increase, multiplicative decrease: the limit grows by one on every success, and is multiplied by the
+    backoff ratio on every failure or request slower than the latency threshold.
+    """
+
+    def adjust(self, latency: float, dropped: bool) -> float:
+        if dropped or latency >= self.policy.latency_threshold:
+            return self.limit * self.policy.backoff_ratio
+
+        return self.limit + 1 if self.saturated else self.limit
+
+
+class GradientLimiter(ConcurrencyLimiter):
+    """
+    Follows the gradient between the long-term average latency and the latest one: the limit shrinks as the latency
+    rises above the tolerated ratio of its average, and grows by its square root, as queueing allowance, otherwise.
+
+    Attributes:
+        long_latency (float | None): the long-term average latency, in seconds.
+    """
+
+    def __init__(self, name: str, policy: ConcurrencyLimitPolicy):
+        super().__init__(name=name, policy=policy)
+        self.long_latency: float | None = None
+
+    def adjust(self, latency: float, dropped: bool) -> float:
+        if self.long_latency is None:
+            self.long_latency = latency
+
+        self.long_latency += (latency - self.long_latency) / LONG_WINDOW
+
+        if not dropped and not self.saturated:
+            return self.limit
+
+        gradient = MIN_GRADIENT if dropped else max(MIN_GRADIENT, min(
+            1.0, self.policy.tolerance * self.long_latency / max(latency, 1e-9)))
+        limit = self.limit * gradient + math.sqrt(self.limit)
+
+        return self.limit * (1 - self.policy.smoothing) + limit * self.policy.smoothing
+
+
+LIMITERS: dict[LimitAlgorithm, type[ConcurrencyLimiter]] = {
+    LimitAlgorithm.AIMD: AimdLimiter,
+    LimitAlgorithm.GRADIENT: GradientLimiter,
+}
+
+concurrency_limiters: dict[str, ConcurrencyLimiter] = dict()
+
+
+def get_concurrency_limiter(service: Service) -> ConcurrencyLimiter:
+    """
+    Get the concurrency limiter of a service, creating it on first use.
+
+    Args:
+        service: the in-network service
+
+    Returns:
+        ConcurrencyLimiter: the service concurrency limiter.
+    """
+    key = service.name.lower()
+
+    if (limiter := concurrency_limiters.get(key)) is None or limiter.policy != service.concurrency_limit:
+        limiter_class = LIMITERS[service.concurrency_limit.algorithm]
+        limiter = concurrency_limiters[key] = limiter_class(name=service.name, policy=service.concurrency_limit)
+
+    return limiter
@@ -7,8 +7,12 @@ from typing import Any, AnyStr, Dict
 from typing import Optional
 
 import aiohttp
+from aiohttp import hdrs
+
+from app.domain.models import ConnectionPool, Service
 
 SIZE_POOL_AIOHTTP = 100
+JSON_CONTENT_TYPE = "application/json"
 
 
 class AsyncHttpClient(abc.ABC):
@@ -22,6 +26,7 @@ class AsyncHttpClient(abc.ABC):
             url: str,
             headers: dict[str, AnyStr] = None,
             raise_for_status: bool = False,
+            service: Service | None = None,
     ) -> aiohttp.ClientResponse:
         """Execute HTTP GET request.
 
@@ -31,6 +36,7 @@ class AsyncHttpClient(abc.ABC):
                 with the request.
             raise_for_status (bool): Automatically call
                 ClientResponse.raise_for_status() for response if set to True.
+            service (Service | None): The requested service, whose connection pool is used.
 
         Returns:
             response: HTTP GET request response - aiohttp.ClientResponse
@@ -45,18 +51,21 @@ class AsyncHttpClient(abc.ABC):
             data: Any | None = None,
             headers: dict[str, AnyStr] = None,
             raise_for_status: bool = False,
+            content_type: str = JSON_CONTENT_TYPE,
+            service: Service | None = None,
     ) -> aiohttp.ClientResponse:
         """Execute HTTP POST request.
 
         Args:
             url (str): HTTP POST request endpoint.
             data (Any | None): The data to send in the body of the
-                request. This can be a FormData object or anything that can be passed
-                into FormData, e.g. a dictionary, bytes, or file-like object.
+                request. Bytes are sent as-is, anything else is encoded as JSON.
             headers (dict[str, typing.AnyStr]): Optional HTTP Headers to send
                 with the request.
             raise_for_status (bool): Automatically call
                 ClientResponse.raise_for_status() for response if set to True.
+            content_type (str): Content type of pre-encoded (bytes) data.
+            service (Service | None): The requested service, whose connection pool is used.
 
         Returns:
             response: HTTP POST request response - aiohttp.ClientResponse
@@ -71,18 +80,21 @@ class AsyncHttpClient(abc.ABC):
             data: Any | None = None,
             headers: dict[str, AnyStr] = None,
             raise_for_status: bool = False,
+            content_type: str = JSON_CONTENT_TYPE,
+            service: Service | None = None,
     ) -> aiohttp.ClientResponse:
         """Execute HTTP PUT request.
 
         Args:
             url (str): HTTP PUT request endpoint.
             data (typing.Optional[typing.Any]): The data to send in the body of the
-                request. This can be a FormData object or anything that can be passed
-                into FormData, e.g. a dictionary, bytes, or file-like object.
+                request. Bytes are sent as-is, anything else is encoded as JSON.
             headers (typing.Dict[str, typing.AnyStr]): Optional HTTP Headers to send
                 with the request.
             raise_for_status (bool): Automatically call
                 ClientResponse.raise_for_status() for response if set to True.
+            content_type (str): Content type of pre-encoded (bytes) data.
+            service (Service | None): The requested service, whose connection pool is used.
 
         Returns:
             aiohttp.ClientResponse: HTTP PUT request response - aiohttp.ClientResponse
@@ -96,6 +108,7 @@ class AsyncHttpClient(abc.ABC):
             url: str,
             headers: dict[str, AnyStr] = None,
             raise_for_status: bool = False,
+            service: Service | None = None,
     ) -> aiohttp.ClientResponse:
         """Execute HTTP DELETE request.
 
@@ -105,6 +118,7 @@ class AsyncHttpClient(abc.ABC):
                 with the request.
             raise_for_status (bool): Automatically call
                 ClientResponse.raise_for_status() for response if set to True.
+            service (Service | None): The requested service, whose connection pool is used.
 
         Returns:
             response: HTTP DELETE request response - aiohttp.ClientResponse
@@ -119,18 +133,21 @@ class AsyncHttpClient(abc.ABC):
             data: Optional[Any] = None,
             headers: Dict[str, AnyStr] = None,
             raise_for_status: bool = False,
+            content_type: str = JSON_CONTENT_TYPE,
+            service: Service | None = None,
     ) -> aiohttp.ClientResponse:
         """Execute HTTP PATCH request.
 
         Args:
             url (str): HTTP PATCH request endpoint.
             data (typing.Optional[typing.Any]): The data to send in the body of the
-                request. This can be a FormData object or anything that can be passed
-                into FormData, e.g. a dictionary, bytes, or file-like object.
+                request. Bytes are sent as-is, anything else is encoded as JSON.
             headers (typing.Dict[str, typing.AnyStr]): Optional HTTP Headers to send
                 with the request.
             raise_for_status (bool): Automatically call
                 ClientResponse.raise_for_status() for response if set to True.
+            content_type (str): Content type of pre-encoded (bytes) data.
+            service (Service | None): The requested service, whose connection pool is used.
 
         Returns:
             response: HTTP PATCH request response - aiohttp.ClientResponse
@@ -143,51 +160,165 @@ class AiohttpClient(AsyncHttpClient):
     """Aiohttp session client utility.
 
     Utility class for handling HTTP async request for whole FastAPI application
-    scope.
+    scope. Requests to a known service use a session of their own, tuned after the
+    service connection pool settings, so that a slow service cannot starve the others.
+    The session of a service whose pool settings changed on reload is replaced, the
+    previous one being closed once the requests in flight on it timed out at the latest.
+    Requests to unknown services share a session tuned after the default pool settings.
     Attributes:
-        sem (asyncio.Semaphore, optional): Semaphore value.
         aiohttp_client (aiohttp.ClientSession, optional): Aiohttp client session
             object instance.
+        service_clients (dict[str, aiohttp.ClientSession]): Aiohttp client sessions
+            by service name.
+        service_pools (dict[str, ConnectionPool]): The pool settings each service
+            session was tuned after, by service name.
+        retired_clients (set[aiohttp.ClientSession]): Replaced sessions, not closed yet.
     """
 
     def __init__(self, aiohttp_client: aiohttp.ClientSession | None = None):
-        self.sem: Optional[asyncio.Semaphore] = None
         self.aiohttp_client: Optional[aiohttp.ClientSession] = aiohttp_client
+        self.service_clients: dict[str, aiohttp.ClientSession] = dict()
+        self.service_pools: dict[str, ConnectionPool] = dict()
+        self.retired_clients: set[aiohttp.ClientSession] = set()
         self.log: logging.Logger = logging.getLogger(__name__)
 
-    def get_aiohttp_client(self) -> aiohttp.ClientSession:
+    @staticmethod
+    def create_session(pool: ConnectionPool) -> aiohttp.ClientSession:
+        """Create an aiohttp client session tuned after connection pool settings.
+
+        Args:
+            pool (ConnectionPool): The connection pool settings.
+
+        Returns:
+            aiohttp.ClientSession: ClientSession object instance.
+        """
+        timeout = aiohttp.ClientTimeout(
+            total=pool.timeout,
+            sock_connect=pool.connect_timeout,
+            sock_read=pool.read_timeout,
+        )
+        connector = aiohttp.TCPConnector(
+            family=AF_INET,
+            limit=pool.size,
+            limit_per_host=pool.size,
+            keepalive_timeout=pool.keepalive_timeout,
+            ttl_dns_cache=pool.dns_cache_ttl,
+        )
+
+        return aiohttp.ClientSession(
+            timeout=timeout,
+            connector=connector,
+        )
+
+    def get_aiohttp_client(self, service: Service | None = None) -> aiohttp.ClientSession:
         """Create aiohttp client session object instance.
+
+        Args:
+            service (Service | None): The service to get the session for, or None for the
+                shared session.
+
         Returns:
             aiohttp.ClientSession: ClientSession object instance.
         """
+        if service is not None:
+            return self.get_service_client(service)
+
         if self.aiohttp_client is None:
             self.log.debug("Initialize AiohttpClient session.")
-            timeout = aiohttp.ClientTimeout(total=2)
-            connector = aiohttp.TCPConnector(
-                family=AF_INET,
-                limit_per_host=SIZE_POOL_AIOHTTP,
-            )
-            self.aiohttp_client = aiohttp.ClientSession(
-                timeout=timeout,
-                connector=connector,
-            )
+            self.aiohttp_client = self.create_session(ConnectionPool(size=SIZE_POOL_AIOHTTP))
 
         return self.aiohttp_client
 
+    def get_service_client(self, service: Service) -> aiohttp.ClientSession:
+        """Create the aiohttp client session object instance of a service.
+
+        Args:
+            service (Service): The service to get the session for.
+
+        Returns:
+            aiohttp.ClientSession: ClientSession object instance.
+        """
+        key = service.name.lower()
+        session = self.service_clients.get(key)
+
+        if session is not None and not session.closed and self.service_pools[key] != service.pool:
+            self.log.debug(f"Replace AiohttpClient session for {service.name}, its pool changed.")
+            self.retire(key)
+            session = None
+
+        if session is None or session.closed:
+            self.log.debug(f"Initialize AiohttpClient session for {service.name}.")
+            session = self.service_clients[key] = self.create_session(service.pool)
+            self.service_pools[key] = service.pool
+
+        return session
+
+    def retire(self, key: str) -> None:
+        """Stop using the session of a service, closing it once the requests in flight on it timed out at the latest.
+
+        Args:
+            key (str): The normalized service name.
+        """
+        session = self.service_clients.pop(key)
+        pool = self.service_pools.pop(key)
+        self.retired_clients.add(session)
+
+        loop = asyncio.get_running_loop()
+        loop.call_later(pool.timeout, lambda: loop.create_task(self.close_retired(session)))
+
+    async def close_retired(self, session: aiohttp.ClientSession) -> None:
+        """Close a replaced session, unless already closed."""
+        if session in self.retired_clients:
+            self.retired_clients.discard(session)
+            await session.close()
+
     async def close_aiohttp_client(self) -> None:
-        """Close aiohttp client session."""
+        """Close aiohttp client sessions."""
         if self.aiohttp_client:
             self.log.debug("Close AiohttpClient session.")
             await self.aiohttp_client.close()
             self.aiohttp_client = None
 
+        for name, session in self.service_clients.items():
+            self.log.debug(f"Close AiohttpClient session for {name}.")
+            await session.close()
+
+        for session in list(self.retired_clients):
+            await self.close_retired(session)
+
+        self.service_clients.clear()
+        self.service_pools.clear()
+
+    @staticmethod
+    def body_kwargs(data: Any | None,
+                    headers: Dict[str, AnyStr] | None,
+                    content_type: str) -> dict[str, Any]:
+        """Build the request body keyword arguments.
+
+        Pre-encoded bytes are sent as-is, with the given content type. Any other
+        data is left to aiohttp to encode as JSON.
+
+        Args:
+            data (Any | None): The request body.
+            headers (Dict[str, AnyStr] | None): The request headers.
+            content_type (str): Content type of pre-encoded data.
+
+        Returns:
+            dict[str, Any]: aiohttp request keyword arguments.
+        """
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            return {"data": data, "headers": {**(headers or {}), hdrs.CONTENT_TYPE: content_type}}
+
+        return {"json": data, "headers": headers}
+
     async def get(
             self,
             url: str,
             headers: Dict[str, AnyStr] = None,
             raise_for_status: bool = False,
+            service: Service | None = None,
     ) -> aiohttp.ClientResponse:
-        client = self.get_aiohttp_client()
+        client = self.get_aiohttp_client(service)
 
         self.log.debug(f"Started GET {url}")
         response = await client.get(
@@ -204,16 +335,17 @@ class AiohttpClient(AsyncHttpClient):
             data: Optional[Any] = None,
             headers: Dict[str, AnyStr] = None,
             raise_for_status: bool = False,
+            content_type: str = JSON_CONTENT_TYPE,
+            service: Service | None = None,
     ) -> aiohttp.ClientResponse:
-        client = self.get_aiohttp_client()
+        client = self.get_aiohttp_client(service)
 
         self.log.debug(f"Started POST: {url}")
         response = await client.post(
             url,
-            json=data,
-            headers=headers,
             raise_for_status=raise_for_status,
             allow_redirects=False,
+            **self.body_kwargs(data=data, headers=headers, content_type=content_type),
         )
 
         return response
@@ -224,16 +356,17 @@ class AiohttpClient(AsyncHttpClient):
             data: Optional[Any] = None,
             headers: Dict[str, AnyStr] = None,
             raise_for_status: bool = False,
+            content_type: str = JSON_CONTENT_TYPE,
+            service: Service | None = None,
     ) -> aiohttp.ClientResponse:
-        client = self.get_aiohttp_client()
+        client = self.get_aiohttp_client(service)
 
         self.log.debug(f"Started PUT: {url}")
         response = await client.put(
             url,
-            json=data,
-            headers=headers,
             raise_for_status=raise_for_status,
             allow_redirects=False,
+            **self.body_kwargs(data=data, headers=headers, content_type=content_type),
         )
 
         return response
@@ -243,8 +376,9 @@ class AiohttpClient(AsyncHttpClient):
             url: str,
             headers: Dict[str, AnyStr] = None,
             raise_for_status: bool = False,
+            service: Service | None = None,
     ) -> aiohttp.ClientResponse:
-        client = self.get_aiohttp_client()
+        client = self.get_aiohttp_client(service)
 
         self.log.debug(f"Started DELETE: {url}")
         response = await client.delete(
@@ -262,16 +396,17 @@ class AiohttpClient(AsyncHttpClient):
             data: Optional[Any] = None,
             headers: Dict[str, AnyStr] = None,
             raise_for_status: bool = False,
+            content_type: str = JSON_CONTENT_TYPE,
+            service: Service | None = None,
     ) -> aiohttp.ClientResponse:
-        client = self.get_aiohttp_client()
+        client = self.get_aiohttp_client(service)
 
         self.log.debug(f"Started PATCH: {url}")
         response = await client.patch(
             url,
-            json=data,
-            headers=headers,
             raise_for_status=raise_for_status,
             allow_redirects=False,
+            **self.body_kwargs(data=data, headers=headers, content_type=content_type),
         )
 
         return response
@@ -0,0 +1,173 @@
+"""
+This module is responsible for spreading the requests to an in-network service across its endpoints.
+"""
+import abc
+import itertools
+import math
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable
+
+from app.adapters.telemetry.prometheus import ENDPOINT_IN_FLIGHT, ENDPOINT_LATENCY
+from app.domain.models import Balancer, Service
+from app.settings.app_settings import ApplicationSettings
+
+app_name = ApplicationSettings().get_app_name()
+
+# Seconds over which the latency moving average of an endpoint decays.
+EWMA_DECAY = 10.0
+
+
+class Endpoint:
+    """
+    An endpoint of a service, along with its load.
+
+    Attributes:
+        service (str): the service name.
+        url (str): the endpoint url.
+        in_flight (int): number of requests to the endpoint currently in flight.
+        ewma (float): peak-sensitive exponentially weighted moving average of the endpoint latency, in seconds.
+        updated_at (float): when the moving average was last updated, according to the clock.
+    """
+
+    def __init__(self, service: str, url: str, clock: Callable[[], float] = time.monotonic):
+        self.service = service
+        self.url = url
+        self.clock = clock
+        self.in_flight = 0
+        self.ewma = 0.0
+        self.updated_at = clock()
+
+    def start(self) -> None:
+        """
+        Tracks a request sent to the endpoint.
+        """
+        self.in_flight += 1
+        ENDPOINT_IN_FLIGHT.labels(service=self.service, endpoint=self.url, app_name=app_name).inc()
+
+    def finish(self, latency: float) -> None:
+        """
+        Tracks the completion of a request sent to the endpoint.
+
+        Args:
+            latency (float): seconds the request took
+        """
+        self.in_flight -= 1
+        ENDPOINT_IN_FLIGHT.labels(service=self.service, endpoint=self.url, app_name=app_name).dec()
+        ENDPOINT_LATENCY.labels(service=self.service, endpoint=self.url, app_name=app_name).observe(latency)
+
+        now = self.clock()
+        decay = math.exp(-(now - self.updated_at) / EWMA_DECAY)
+        self.updated_at = now
+        # a latency above the average is taken as-is, so that a slowing endpoint is avoided straight away
+        self.ewma = latency if latency > self.ewma else self.ewma * decay + latency * (1 - decay)
+
+    @property
+    def cost(self) -> float:
+        """
+        The expected latency of the next request to the endpoint, given the requests already in flight.
+        """
+        return self.ewma * (self.in_flight + 1)
+
+
+class LoadBalancer(abc.ABC):
+    """
+    Load balancer interface
+
+    Attributes:
+        endpoints (list[Endpoint]): the service endpoints.
+    """
+
+    def __init__(self, endpoints: list[Endpoint]):
+        self.endpoints = endpoints
+
+    @abc.abstractmethod
+    def pick(self) -> Endpoint:
+        """
+        Picks the endpoint the next request is sent to.
+
+        Returns:
+            Endpoint: the chosen endpoint.
+        """
+        raise NotImplementedError
+
+    @asynccontextmanager
+    async def endpoint(self) -> AsyncIterator[str]:
+        """
+        Picks an endpoint, and tracks the load of the request sent to it.
+
+        Yields:
+            str: the endpoint url.
+        """
+        endpoint = self.pick()
+        endpoint.start()
+        start = time.perf_counter()
+
+        try:
+            yield endpoint.url
+        finally:
+            endpoint.finish(time.perf_counter() - start)
+
+
+class RoundRobinBalancer(LoadBalancer):
+    """
+    Picks endpoints in turn.
+    """
+
+    def __init__(self, endpoints: list[Endpoint]):
+        super().__init__(endpoints)
+        self.cycle = itertools.cycle(endpoints)
+
+    def pick(self) -> Endpoint:
+        return next(self.cycle)
+
+
+class LeastOutstandingBalancer(LoadBalancer):
+    """
+    Picks the endpoint with the fewest requests in flight, ties being broken at random.
+    """
+
+    def pick(self) -> Endpoint:
+        return min(random.sample(self.endpoints, len(self.endpoints)), key=lambda endpoint: endpoint.in_flight)
+
+
+class PeakEwmaBalancer(LoadBalancer):
+    """
+    Picks the endpoint with the lowest expected latency, ties being broken at random.
+    """
+
+    def pick(self) -> Endpoint:
+        return min(random.sample(self.endpoints, len(self.endpoints)), key=lambda endpoint: endpoint.cost)
+
+
+BALANCERS: dict[Balancer, type[LoadBalancer]] = {
+    Balancer.ROUND_ROBIN: RoundRobinBalancer,
+    Balancer.LEAST_OUTSTANDING: LeastOutstandingBalancer,
+    Balancer.PEAK_EWMA: PeakEwmaBalancer,
+}
+
+load_balancers: dict[str, LoadBalancer] = dict()
+
+
+def get_load_balancer(service: Service) -> LoadBalancer:
+    """
+    Get the load balancer of a service, creating it on first use, or when its endpoints or strategy changed.
+
+    Args:
+        service: the in-network service
+
+    Returns:
+        LoadBalancer: the service load balancer.
+    """
+    key = service.name.lower()
+    balancer_class = BALANCERS[service.balancer]
+    balancer = load_balancers.get(key)
+
+    if (balancer is None
+            or type(balancer) is not balancer_class
+            or [endpoint.url for endpoint in balancer.endpoints] != service.endpoints):
+        balancer = load_balancers[key] = balancer_class(
+            [Endpoint(service=service.name, url=url) for url in service.endpoints])
+
+    return balancer
@@ -2,28 +2,133 @@
 This module is responsible for making requests to in-network services.
 """
 import asyncio
-import json
+from contextlib import AsyncExitStack, asynccontextmanager, contextmanager
 import logging
-from typing import Any, TypeVar
-from urllib.parse import urlencode
+import time
+from functools import partial
+from typing import Any, AsyncIterator, Awaitable, Callable, Hashable, Iterator, Mapping, TypeVar
+from urllib.parse import urlencode, urlsplit
 
 import aiohttp
 import async_timeout
 from fastapi import HTTPException, status
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
 
-from app.adapters.http_client import AsyncHttpClient, aio_http_client
+from app.adapters.bulkhead import get_bulkhead
+from app.adapters.circuit_breaker import CircuitOpenError, get_circuit_breaker
+from app.adapters.concurrency_limiter import get_concurrency_limiter
+from app.adapters.http_client import AsyncHttpClient, JSON_CONTENT_TYPE, aio_http_client
+from app.adapters.load_balancer import get_load_balancer
+from app.adapters.retry import RETRYABLE_STATUSES, resilient
+from app.adapters.telemetry.prometheus import COALESCED_REQUESTS
+from app.domain.models import Service
 from app.domain.schemas import CamelCaseModel
+from app.settings.app_settings import ApplicationSettings
 
 log = logging.getLogger("uvicorn")
+app_name = ApplicationSettings().get_app_name()
 
+STREAM_CHUNK_SIZE = 64 * 1024
+DEFAULT_TIMEOUT = 60
+COALESCED_METHODS = frozenset({"GET", "HEAD"})
 
-async def make_request(
+# Headers which only make sense for a single connection, plus the ones describing a body aiohttp already decoded.
+UNFORWARDED_HEADERS = frozenset({
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "te",
+    "trailers",
+    "transfer-encoding",
+    "upgrade",
+    "content-length",
+    "content-encoding",
+})
+
+
+async def send_request(
         url: str,
         method: str,
-        data: dict | None = None,
+        data: dict | bytes | None = None,
         headers: dict | None = None,
         client: AsyncHttpClient = aio_http_client,
+        content_type: str = JSON_CONTENT_TYPE,
+        service: Service | None = None,
+) -> aiohttp.ClientResponse:
+    """
+    Send a request to an in-network service, without reading its body.
+
+    Args:
+        url: is the url for one of the in-network services
+        method: is the lower version of one of the HTTP methods: GET, POST, PUT, DELETE # noqa
+        data: is the payload, either pre-encoded bytes or a JSON-encodable dict
+        headers: is the header to put additional headers into request
+        client: is the async http client
+        content_type: is the content type of a pre-encoded payload
+        service: is the requested service, if known
+
+    Returns:
+        aiohttp.ClientResponse: the service response, which body is yet to be read.
+    """
+    match method.lower():
+        case 'get':
+            return await client.get(
+                url=url,
+                headers=headers,
+                raise_for_status=False,
+                service=service,
+            )
+        case 'post':
+            return await client.post(
+                url=url,
+                data=data,
+                headers=headers,
+                raise_for_status=False,
+                content_type=content_type,
+                service=service,
+            )
+        case 'put':
+            return await client.put(
+                url=url,
+                data=data,
+                headers=headers,
+                raise_for_status=False,
+                content_type=content_type,
+                service=service,
+            )
+        case 'delete':
+            return await client.delete(
+                url=url,
+                headers=headers,
+                raise_for_status=False,
+                service=service,
+            )
+        case 'patch':
+            return await client.patch(
+                url=url,
+                data=data,
+                headers=headers,
+                raise_for_status=False,
+                content_type=content_type,
+                service=service,
+            )
+        case _:
+            raise HTTPException(
+                status_code=status.HTTP_405_METHOD_NOT_ALLOWED,
+                detail=f"Method {method} is not allowed",
+            )
+
 
+async def make_request(
+        url: str,
+        method: str,
+        data: dict | bytes | None = None,
+        headers: dict | None = None,
+        client: AsyncHttpClient = aio_http_client,
+        content_type: str = JSON_CONTENT_TYPE,
+        service: Service | None = None,
 ) -> tuple[dict, int]:
     """
     Make request to in-network services.
@@ -31,9 +136,11 @@ async def make_request(
     Args:
         url: is the url for one of the in-network services
         method: is the lower version of one of the HTTP methods: GET, POST, PUT, DELETE # noqa
-        data: is the payload
+        data: is the payload, either pre-encoded bytes or a JSON-encodable dict
         headers: is the header to put additional headers into request
         client: is the async http client
+        content_type: is the content type of a pre-encoded payload
+        service: is the requested service, whose pool settings bound the request time
 
     Returns:
         tuple[dict, int]: is the response body and status code
@@ -42,104 +149,94 @@ async def make_request(
     if not data:
         data = {}
 
-    async with async_timeout.timeout(60):
-        response: aiohttp.ClientResponse
-
-        match method.lower():
-            case 'get':
-                response = await client.get(
-                    url=url,
-                    headers=headers,
-                    raise_for_status=False,
-                )
-            case 'post':
-                response = await client.post(
-                    url=url,
-                    data=data,
-                    headers=headers,
-                    raise_for_status=False,
-                )
-            case 'put':
-                response = await client.put(
-                    url=url,
-                    data=data,
-                    headers=headers,
-                    raise_for_status=False,
-                )
-            case 'delete':
-                response = await client.delete(
-                    url=url,
-                    headers=headers,
-                    raise_for_status=False,
-                )
-            case 'patch':
-                response = await client.patch(
-                    url=url,
-                    data=data,
-                    headers=headers,
-                    raise_for_status=False,
-                )
-            case _:
-                raise HTTPException(
-                    status_code=status.HTTP_405_METHOD_NOT_ALLOWED,
-                    detail=f"Method {method} is not allowed",
-                )
+    async with async_timeout.timeout(request_timeout(service)):
+        response = await send_request(url=url, method=method, data=data, headers=headers, client=client,
+                                      content_type=content_type, service=service)
 
         return await response.json(), response.status
 
 
-M = TypeVar('M', bound=CamelCaseModel)
+def request_timeout(service: Service | None) -> float:
+    """
+    Total seconds a request to an in-network service may take.
 
+    Args:
+        service: is the requested service, if known
 
-async def gateway(
-        client: AsyncHttpClient,
-        method: str,
-        service_url: str,
-        path: str,
-        query_params: dict | None = None,
-        request_body: dict | str | None = None,
-        headers: dict | None = None,
-) -> tuple[dict[str, Any], int]:
+    Returns:
+        float: the request deadline.
     """
-    Make request to in-network services.
+    return service.pool.timeout if service else DEFAULT_TIMEOUT
+
+
+def build_url(service_url: str, path: str, query_params: dict | None = None) -> str:
+    """
+    Build the url of an in-network service endpoint.
 
     Args:
-        client: an Async HTTP Client
-        method: is the lower version of one of the HTTP methods: GET, POST, PUT, DELETE # noqa
         service_url: is the url for one of the in-network services
         path: is the path to bind (like app.post('/api/users/'))
         query_params: is the query params to add to url
-        request_body: is the payload
-        headers: request headers
 
     Returns:
-        service result coming / non-blocking http request (coroutine)
+        str: the endpoint url.
     """
+    return f'{service_url}{path}' if not query_params else f'{service_url}{path}?{urlencode(query_params)}'
 
-    if not query_params:
-        query_params = {}
 
-    if not request_body:
-        request_body = {}
+@asynccontextmanager
+async def endpoint(service_url: str | None, service: Service | None) -> AsyncIterator[str]:
+    """
+    Picks the endpoint a request is sent to, balancing the load across the service endpoints.
 
-    if isinstance(request_body, str):
-        request_body = json.loads(request_body)
+    Args:
+        service_url: is the url for one of the in-network services, which bypasses load balancing
+        service: is the requested service
 
-    url = f'{service_url}{path}' if not query_params else f'{service_url}{path}?{urlencode(query_params)}'
+    Yields:
+        str: the endpoint url.
+    """
+    if service_url or service is None:
+        yield service_url
+        return
 
-    if not headers:
-        headers = dict()
+    async with get_load_balancer(service).endpoint() as url:
+        yield url
+
+
+@asynccontextmanager
+async def bulkhead(service: Service | None) -> AsyncIterator[None]:
+    """
+    Holds a slot of the service bulkhead for the duration of a request.
+
+    Args:
+        service: is the requested service, requests to unknown services are not limited
+
+    Raises:
+        BulkheadFullError: when the request is shed.
+    """
+    if service is None or not service.bulkhead.enabled:
+        yield
+        return
 
-    response: aiohttp.ClientResponse
+    async with get_bulkhead(service).slot():
+        yield
 
+
+@contextmanager
+def upstream_errors(url: str, method: str) -> Iterator[None]:
+    """
+    Translates errors raised while talking to an in-network service into HTTP errors.
+
+    Args:
+        url: the requested url
+        method: the requested method
+
+    Raises:
+        HTTPException: when the service timed out, is unreachable, or answered an unexpected content.
+    """
     try:
-        response_body, status_code_from_service = await make_request(
-            url=url,
-            method=method,
-            data=request_body,
-            headers=headers,
-            client=client,
-        )
+        yield
 
     except asyncio.TimeoutError:
         log.error(f'Time our for: {url}, {method}')
@@ -162,4 +259,399 @@ async def gateway(
             detail='Service error.',
         )
 
+
+M = TypeVar('M', bound=CamelCaseModel)
+R = TypeVar('R')
+
+
+async def guarded(service: Service | None, call: Callable[[], Awaitable[R]], failed: Callable[[R], bool]) -> R:
+    """
+    Executes a call to an in-network service through its circuit breaker.
+
+    Args:
+        service: is the requested service, calls to unknown services are not guarded
+        call: the call to the service
+        failed: tells whether the call result is a failure
+
+    Returns:
+        R: the call result.
+
+    Raises:
+        CircuitOpenError: when the service circuit is open.
+    """
+    if service is None or not service.circuit_breaker.enabled:
+        return await call()
+
+    breaker = get_circuit_breaker(service)
+    breaker.acquire()
+    start = time.perf_counter()
+
+    try:
+        result = await call()
+    except asyncio.CancelledError:
+        breaker.release()
+        raise
+    except Exception:
+        breaker.record(failed=True, duration=time.perf_counter() - start)
+        raise
+
+    breaker.record(failed=failed(result), duration=time.perf_counter() - start)
+    return result
+
+
+class Outcome:
+    """
+    Whether a call holding a concurrency slot failed, told once its result is known.
+
+    Attributes:
+        failed (bool): whether the call failed, the concurrency limit being adjusted accordingly
+    """
+
+    __slots__ = ("failed",)
+
+    def __init__(self):
+        self.failed = False
+
+
+@asynccontextmanager
+async def concurrency_slot(service: Service | None) -> AsyncIterator[Outcome]:
+    """
+    Holds a slot of the service adaptive concurrency limit for the duration of a call, which its outcome adjusts.
+
+    Args:
+        service: is the requested service, calls to unknown services are not limited
+
+    Yields:
+        Outcome: the outcome of the call, to be told whether it failed.
+
+    Raises:
+        ConcurrencyLimitError: when the service has as many calls in flight as its limit.
+    """
+    outcome = Outcome()
+
+    if service is None or not service.concurrency_limit.enabled:
+        yield outcome
+        return
+
+    limiter = get_concurrency_limiter(service)
+    limiter.acquire()
+    start = time.perf_counter()
+
+    try:
+        yield outcome
+    except CircuitOpenError:
+        limiter.release()
+        raise
+    except Exception:
+        limiter.release(latency=time.perf_counter() - start, dropped=True)
+        raise
+    except BaseException:
+        # Cancelled, or the client went away: the call says nothing of the service.
+        limiter.release()
+        raise
+
+    limiter.release(latency=time.perf_counter() - start, dropped=outcome.failed)
+
+
+async def limited(service: Service | None, call: Callable[[], Awaitable[R]], failed: Callable[[R], bool]) -> R:
+    """
+    Executes a call to an in-network service within its adaptive concurrency limit, which the call outcome adjusts.
+
+    Args:
+        service: is the requested service, calls to unknown services are not limited
+        call: the call to the service
+        failed: tells whether the call result is a failure
+
+    Returns:
+        R: the call result.
+
+    Raises:
+        ConcurrencyLimitError: when the service has as many calls in flight as its limit.
+    """
+    async with concurrency_slot(service) as outcome:
+        result = await call()
+        outcome.failed = failed(result)
+
+    return result
+
+
+def server_error(status_code: int) -> bool:
+    """
+    Tells whether a service status code means the service itself failed.
+
+    Args:
+        status_code: the service response status code
+
+    Returns:
+        bool: True on 5xx status codes.
+    """
+    return status_code >= status.HTTP_500_INTERNAL_SERVER_ERROR
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls, so that they share a single execution and its result.
+
+    Attributes:
+        calls (dict[Hashable, asyncio.Task]): the calls in flight, by key.
+    """
+
+    def __init__(self):
+        self.calls: dict[Hashable, asyncio.Task] = dict()
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[R]]) -> tuple[R, bool]:
+        """
+        Executes a call, unless an identical one is already in flight, in which case its result is awaited instead.
+
+        The call runs in a task of its own, so a cancelled caller does not cancel it for the others.
+
+        Args:
+            key: identifies identical calls
+            call: the call to execute
+
+        Returns:
+            tuple[R, bool]: the call result, and whether it was shared with another caller.
+        """
+        if (task := self.calls.get(key)) is not None:
+            return await asyncio.shield(task), True
+
+        task = self.calls[key] = asyncio.ensure_future(call())
+        task.add_done_callback(partial(self._forget, key))
+
+        return await asyncio.shield(task), False
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self.calls.get(key) is task:
+            del self.calls[key]
+
+        if not task.cancelled():
+            # retrieve the exception, as every caller may have been cancelled already
+            task.exception()
+
+
+single_flight = SingleFlight()
+
+
+async def gateway(
+        client: AsyncHttpClient,
+        method: str,
+        path: str,
+        service_url: str | None = None,
+        query_params: dict | None = None,
+        request_body: dict | str | bytes | None = None,
+        headers: dict | None = None,
+        content_type: str = JSON_CONTENT_TYPE,
+        service: Service | None = None,
+        coalesce: bool = True,
+) -> tuple[dict[str, Any], int]:
+    """
+    Make request to in-network services.
+
+    Identical concurrent GET requests are coalesced: they share one call to the service, and its parsed result,
+    which callers must therefore not mutate. Requests to a known service are bounded by its bulkhead and adaptive
+    concurrency limit, balanced across its endpoints and go through its circuit breaker, and idempotent ones are
+    retried and hedged according to its retry policy.
+
+    Args:
+        client: an Async HTTP Client
+        method: is the lower version of one of the HTTP methods: GET, POST, PUT, DELETE # noqa
+        path: is the path to bind (like app.post('/api/users/'))
+        service_url: is the url for one of the in-network services, defaults to one of the service endpoints
+        query_params: is the query params to add to url
+        request_body: is the payload, an encoded string or bytes are sent as-is
+        headers: request headers
+        content_type: content type of an encoded payload
+        service: is the in-network service, whose connection pool is used
+        coalesce: whether an idempotent request may share the result of an identical one in flight
+
+    Returns:
+        service result coming / non-blocking http request (coroutine)
+    """
+
+    if not request_body:
+        request_body = {}
+
+    if isinstance(request_body, str):
+        request_body = request_body.encode()
+
+    target = build_url(service_url="", path=path, query_params=query_params)
+
+    if not headers:
+        headers = dict()
+
+    async def call() -> tuple[dict[str, Any], int]:
+        async with endpoint(service_url=service_url, service=service) as base_url:
+            url = f"{base_url}{target}"
+
+            with upstream_errors(url=url, method=method):
+                return await make_request(
+                    url=url,
+                    method=method,
+                    data=request_body,
+                    headers=headers,
+                    client=client,
+                    content_type=content_type,
+                    service=service,
+                )
+
+    def failed(result: tuple[dict[str, Any], int]) -> bool:
+        return server_error(result[1])
+
+    async def attempt() -> tuple[dict[str, Any], int]:
+        async with bulkhead(service):
+            return await limited(service=service,
+                                 call=lambda: guarded(service=service, call=call, failed=failed),
+                                 failed=failed)
+
+    async def request() -> tuple[dict[str, Any], int]:
+        if service is None:
+            return await attempt()
+
+        return await resilient(service=service, method=method, call=attempt,
+                               retryable=lambda result: result[1] in RETRYABLE_STATUSES)
+
+    if not coalesce or method.upper() not in COALESCED_METHODS:
+        return await request()
+
+    (response_body, status_code_from_service), shared = await single_flight.do(
+        key=(method.upper(), service_url or service.name.lower(), target, tuple(sorted(headers.items()))),
+        call=request,
+    )
+
+    if shared:
+        COALESCED_REQUESTS.labels(service=service.name if service else urlsplit(service_url).netloc,
+                                  app_name=app_name).inc()
+
     return response_body, status_code_from_service
+
+
+class RelayedResponse(StreamingResponse):
+    """
+    Streaming response relaying the body of a service response.
+
+    The service response and the slots held for the request are released once the body is relayed, and once the
+    response was sent or failed to be, so that they are also released when the body is never iterated: when the client
+    went away before the response started, or an outer middleware failed.
+
+    Attributes:
+        response (aiohttp.ClientResponse): the service response
+        held (AsyncExitStack): the slots held for the request
+    """
+
+    def __init__(self, response: aiohttp.ClientResponse, held: AsyncExitStack | None = None):
+        self.response = response
+        self.held = held or AsyncExitStack()
+        super().__init__(content=relay(response, held=self.held),
+                         status_code=response.status,
+                         headers=forwarded_headers(response.headers))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.response.release()
+            await self.held.aclose()
+
+
+async def gateway_stream(
+        client: AsyncHttpClient,
+        method: str,
+        path: str,
+        service_url: str | None = None,
+        query_params: dict | None = None,
+        request_body: dict | str | bytes | None = None,
+        headers: dict | None = None,
+        content_type: str = JSON_CONTENT_TYPE,
+        service: Service | None = None,
+        timeout: float | None = None,
+) -> RelayedResponse:
+    """
+    Proxy a request to in-network services, streaming the response back.
+
+    Unlike `gateway`, the service response is neither parsed nor validated: its status, headers and body chunks are
+    relayed as they arrive. Use it on routes which do not need to inspect the payload.
+
+    Args:
+        client: an Async HTTP Client
+        method: is the lower version of one of the HTTP methods: GET, POST, PUT, DELETE # noqa
+        path: is the path to bind (like app.post('/api/users/'))
+        service_url: is the url for one of the in-network services, defaults to one of the service endpoints
+        query_params: is the query params to add to url
+        request_body: is the payload, an encoded string or bytes are sent as-is
+        headers: request headers
+        content_type: content type of an encoded payload
+        service: is the in-network service, whose connection pool is used
+        timeout: is the seconds the request may take, defaults to the service pool timeout
+
+    Returns:
+        RelayedResponse: the service response, relayed as-is.
+    """
+
+    if not request_body:
+        request_body = {}
+
+    if isinstance(request_body, str):
+        request_body = request_body.encode()
+
+    target = build_url(service_url="", path=path, query_params=query_params)
+
+    def failed(result: aiohttp.ClientResponse) -> bool:
+        return server_error(result.status)
+
+    # The bulkhead slot, the concurrency slot and the endpoint are held until the body is relayed, not only until the
+    # headers arrive: a streamed request is in flight for as long.
+    async with AsyncExitStack() as stack:
+        await stack.enter_async_context(bulkhead(service))
+        outcome = await stack.enter_async_context(concurrency_slot(service))
+
+        async def call() -> aiohttp.ClientResponse:
+            url = f"{await stack.enter_async_context(endpoint(service_url=service_url, service=service))}{target}"
+
+            with upstream_errors(url=url, method=method):
+                async with async_timeout.timeout(timeout or request_timeout(service)):
+                    return await send_request(url=url, method=method, data=request_body, headers=headers or dict(),
+                                              client=client, content_type=content_type, service=service)
+
+        response = await guarded(service=service, call=call, failed=failed)
+        outcome.failed = failed(response)
+        held = stack.pop_all()
+
+    return RelayedResponse(response, held=held)
+
+
+def forwarded_headers(headers: Mapping[str, str]) -> dict[str, str]:
+    """
+    Filters the headers of a service response which can be relayed to the client.
+
+    Args:
+        headers: the service response headers
+
+    Returns:
+        dict[str, str]: the end-to-end headers.
+    """
+    return {name: value for name, value in headers.items() if name.lower() not in UNFORWARDED_HEADERS}
+
+
+async def relay(response: aiohttp.ClientResponse, held: AsyncExitStack | None = None) -> AsyncIterator[bytes]:
+    """
+    Relays the body of a service response in chunks, releasing the connection once done.
+
+    Args:
+        response: the service response
+        held: the slots held for the request, released once the body is relayed or failed to be
+
+    Yields:
+        bytes: the next body chunk.
+    """
+    held = held or AsyncExitStack()
+
+    try:
+        async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+            yield chunk
+    except BaseException as error:
+        response.release()
+        await held.__aexit__(type(error), error, error.__traceback__)
+        raise
+
+    response.release()
+    await held.aclose()
@@ -4,7 +4,7 @@ Redis Connection Adapter.
 import abc
 from datetime import timedelta
 import logging
-from typing import TypeVar
+from typing import Any, TypeVar
 
 import aioredis
 import redis
@@ -21,6 +21,14 @@ class RedisConnectionError(Exception):
     pass
 
 
+class RedisNoScriptError(RedisConnectionError):
+    """Redis script error.
+
+    Exception raised when a script is run by its digest, but was not loaded in the Redis server script cache.
+    """
+    pass
+
+
 class RedisConnector(abc.ABC):
     """Define Redis utility.
 
@@ -46,12 +54,13 @@ class RedisConnector(abc.ABC):
         raise NotImplementedError
 
     @abc.abstractmethod
-    async def set(self, key: str, value: str) -> R:
+    async def set(self, key: str, value: str, expire: int | timedelta | None = None) -> R:
         """Set value to Redis database.
 
         Args:
             key (str): Redis key.
             value (str): Redis value.
+            expire (int|timedelta|None): Expiration time in seconds or a time delta, None never expires.
 
         Returns:
             R: Redis SET command response, for more info
@@ -126,6 +135,55 @@ class RedisConnector(abc.ABC):
         """
         raise NotImplementedError
 
+    @abc.abstractmethod
+    async def incrby_many(self, increments: dict[str, int], expire: int | timedelta) -> list[int]:
+        """Increment several keys by their amount, and set their expiration time, in a single pipelined round trip.
+
+        Args:
+            increments (dict[str, int]): Amounts by Redis key.
+            expire (int|timedelta): Expiration time in seconds or a time delta.
+
+        Returns:
+            list[int]: the incremented values, in the order of the keys.
+
+        Raises:
+            RedisConnectionError: If Redis client could not connect to Redis server.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def script_load(self, script: str) -> str:
+        """Load a Lua script in the Redis script cache.
+
+        Args:
+            script (str): Lua script.
+
+        Returns:
+            str: the SHA1 digest the script is run by.
+
+        Raises:
+            RedisConnectionError: If Redis client could not connect to Redis server.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def evalsha(self, sha: str, keys: list[str], args: list[str | int | float]) -> Any:
+        """Run a cached Lua script, in a single round trip and atomically.
+
+        Args:
+            sha (str): SHA1 digest of the script.
+            keys (list[str]): Redis keys the script accesses.
+            args (list[str | int | float]): Script arguments.
+
+        Returns:
+            Any: the script result.
+
+        Raises:
+            RedisNoScriptError: If the script is not loaded.
+            RedisConnectionError: If Redis client could not connect to Redis server.
+        """
+        raise NotImplementedError
+
 
 class RedisClient(RedisConnector):
     """Define Redis utility.
@@ -203,13 +261,13 @@ class RedisClient(RedisConnector):
             )
             return False
 
-    async def set(self, key: str, value: str) -> R:
+    async def set(self, key: str, value: str, expire: int | timedelta | None = None) -> R:
         redis_client = self.redis_client
 
         self.log.debug(f"Execute Redis SET command, key: {key}, value: {value}")
 
         try:
-            return await redis_client.set(key, value)
+            return await redis_client.set(key, value, ex=expire)
         except aioredis.RedisError as ex:
             self.log.exception(
                 "Redis SET command finished with exception",
@@ -280,6 +338,49 @@ class RedisClient(RedisConnector):
             )
             raise RedisConnectionError from ex
 
+    async def incrby_many(self, increments: dict[str, int], expire: int | timedelta) -> list[int]:
+        self.log.debug(f"Execute Redis INCRBY pipeline, keys: {list(increments)}")
+
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipeline:
+                for key, amount in increments.items():
+                    pipeline.incrby(key, amount)
+                    pipeline.expire(key, expire)
+
+                return (await pipeline.execute())[::2]
+        except aioredis.RedisError as ex:
+            self.log.exception(
+                "Redis INCRBY pipeline finished with exception",
+                exc_info=(type(ex), ex, ex.__traceback__),
+            )
+            raise RedisConnectionError from ex
+
+    async def script_load(self, script: str) -> str:
+        self.log.debug("Execute Redis SCRIPT LOAD command")
+
+        try:
+            return await self.redis_client.script_load(script)
+        except aioredis.RedisError as ex:
+            self.log.exception(
+                "Redis SCRIPT LOAD command finished with exception",
+                exc_info=(type(ex), ex, ex.__traceback__),
+            )
+            raise RedisConnectionError from ex
+
+    async def evalsha(self, sha: str, keys: list[str], args: list[str | int | float]) -> Any:
+        self.log.debug(f"Execute Redis EVALSHA command, sha: {sha}, keys: {keys}")
+
+        try:
+            return await self.redis_client.evalsha(sha, len(keys), *keys, *args)
+        except aioredis.exceptions.NoScriptError as ex:
+            raise RedisNoScriptError from ex
+        except aioredis.RedisError as ex:
+            self.log.exception(
+                "Redis EVALSHA command finished with exception",
+                exc_info=(type(ex), ex, ex.__traceback__),
+            )
+            raise RedisConnectionError from ex
+
 
 class RedisClusterConnection(RedisConnector):
     """Redis Cluster connection
@@ -302,10 +403,10 @@ class RedisClusterConnection(RedisConnector):
             )
             return False
 
-    async def set(self, key: str, value: str) -> R:
+    async def set(self, key: str, value: str, expire: int | timedelta | None = None) -> R:
         self.log.debug(f"Execute Redis SET command, key: {key}, value: {value}")
         try:
-            return self.redis.set(key, value)
+            return self.redis.set(key, value, ex=expire)
         except redis.exceptions.ClusterError as ex:
             self.log.exception(
                 "Redis SET command finished with exception",
@@ -369,6 +470,47 @@ class RedisClusterConnection(RedisConnector):
             )
             raise RedisConnectionError from ex
 
+    async def incrby_many(self, increments: dict[str, int], expire: int | timedelta) -> list[int]:
+        self.log.debug(f"Execute Redis INCRBY pipeline, keys: {list(increments)}")
+        try:
+            pipeline = self.redis.pipeline()
+
+            for key, amount in increments.items():
+                pipeline.incrby(key, amount)
+                pipeline.expire(key, expire)
+
+            return pipeline.execute()[::2]
+        except redis.exceptions.ClusterError as ex:
+            self.log.exception(
+                "Redis INCRBY pipeline finished with exception",
+                exc_info=(type(ex), ex, ex.__traceback__),
+            )
+            raise RedisConnectionError from ex
+
+    async def script_load(self, script: str) -> str:
+        self.log.debug("Execute Redis SCRIPT LOAD command")
+        try:
+            return self.redis.script_load(script)
+        except redis.exceptions.ClusterError as ex:
+            self.log.exception(
+                "Redis SCRIPT LOAD command finished with exception",
+                exc_info=(type(ex), ex, ex.__traceback__),
+            )
+            raise RedisConnectionError from ex
+
+    async def evalsha(self, sha: str, keys: list[str], args: list[str | int | float]) -> Any:
+        self.log.debug(f"Execute Redis EVALSHA command, sha: {sha}, keys: {keys}")
+        try:
+            return self.redis.evalsha(sha, len(keys), *keys, *args)
+        except redis.exceptions.NoScriptError as ex:
+            raise RedisNoScriptError from ex
+        except redis.exceptions.ClusterError as ex:
+            self.log.exception(
+                "Redis EVALSHA command finished with exception",
+                exc_info=(type(ex), ex, ex.__traceback__),
+            )
+            raise RedisConnectionError from ex
+
     async def close(self):
         self.log.debug("Closing Redis client")
         self.redis.close()
@@ -0,0 +1,304 @@
+"""
+This module is responsible for retrying and hedging idempotent requests to in-network services.
+"""
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, TypeVar
+
+from fastapi import HTTPException, status
+
+from app.adapters.bulkhead import BulkheadFullError
+from app.adapters.circuit_breaker import CircuitOpenError
+from app.adapters.concurrency_limiter import ConcurrencyLimitError
+from app.adapters.telemetry.prometheus import HEDGED_REQUESTS, RETRIED_REQUESTS, RETRY_BUDGET_EXHAUSTED
+from app.domain.models import RetryPolicy, Service
+from app.settings.app_settings import ApplicationSettings
+from app.settings.gateway_settings import GatewaySettings
+
+log = logging.getLogger("uvicorn")
+app_name = ApplicationSettings().get_app_name()
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+HEDGED_METHODS = frozenset({"GET", "HEAD"})
+RETRYABLE_STATUSES = frozenset({
+    status.HTTP_502_BAD_GATEWAY,
+    status.HTTP_503_SERVICE_UNAVAILABLE,
+    status.HTTP_504_GATEWAY_TIMEOUT,
+})
+LATENCY_SAMPLES = 100
+
+R = TypeVar('R')
+
+
+class RetryBudget:
+    """
+    Bounds the retries and hedged requests sent across every service, so that retries cannot amplify an outage.
+
+    Every request deposits `ratio` tokens, a retry withdraws one. On top of that, `min_per_second` tokens are
+    granted every second so that low traffic can still be retried. The balance never exceeds ten seconds worth of
+    the minimum allowance, and at least one token, deposits included: the traffic raises the rate of the retries
+    allowed, not the burst of them.
+
+    Attributes:
+        ratio (float): tokens deposited per request.
+        min_per_second (float): tokens granted per second.
+        capacity (float): the tokens available at most.
+        balance (float): the tokens available.
+    """
+
+    def __init__(self, ratio: float, min_per_second: float, clock: Callable[[], float] = time.monotonic):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.clock = clock
+        self.capacity = max(min_per_second * 10, 1.0)
+        self.balance = self.capacity
+        self.updated_at = clock()
+
+    def deposit(self) -> None:
+        """
+        Deposits the tokens earned by a request.
+        """
+        self._refill()
+        self.balance = min(self.balance + self.ratio, self.capacity)
+
+    def withdraw(self) -> bool:
+        """
+        Withdraws the token needed by a retry.
+
+        Returns:
+            bool: True if the retry is allowed.
+        """
+        self._refill()
+
+        if self.balance < 1:
+            return False
+
+        self.balance -= 1
+        return True
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.balance = min(self.balance + (now - self.updated_at) * self.min_per_second, self.capacity)
+        self.updated_at = now
+
+
+class LatencyWindow:
+    """
+    Keeps the most recent latencies observed for a service.
+
+    Attributes:
+        samples (deque[float]): the latencies, in seconds.
+    """
+
+    def __init__(self, size: int = LATENCY_SAMPLES):
+        self.samples: deque[float] = deque(maxlen=size)
+
+    def record(self, latency: float) -> None:
+        """
+        Records the latency of a successful call.
+
+        Args:
+            latency (float): seconds the call took
+        """
+        self.samples.append(latency)
+
+    def percentile(self, percentile: float) -> float:
+        """
+        Computes a percentile of the recorded latencies.
+
+        Args:
+            percentile (float): the percentile, between 0 and 1
+
+        Returns:
+            float: the latency, in seconds.
+        """
+        ordered = sorted(self.samples)
+        return ordered[min(int(percentile * len(ordered)), len(ordered) - 1)]
+
+
+gateway_settings = GatewaySettings()
+retry_budget = RetryBudget(ratio=gateway_settings.RETRY_BUDGET_RATIO,
+                           min_per_second=gateway_settings.RETRY_BUDGET_MIN_PER_SECOND)
+
+latency_windows: dict[str, LatencyWindow] = dict()
+
+
+def get_latency_window(service: Service) -> LatencyWindow:
+    """
+    Get the latency window of a service, creating it on first use.
+
+    Args:
+        service: the in-network service
+
+    Returns:
+        LatencyWindow: the service latencies.
+    """
+    return latency_windows.setdefault(service.name.lower(), LatencyWindow())
+
+
+def backoff(policy: RetryPolicy, attempt: int) -> float:
+    """
+    Computes the seconds to wait before retrying, with exponential backoff and full jitter.
+
+    Args:
+        policy: the service retry policy
+        attempt: the number of the attempt which just failed, starting at 1
+
+    Returns:
+        float: the seconds to wait.
+    """
+    return random.uniform(0, min(policy.max_backoff, policy.backoff * 2 ** (attempt - 1)))
+
+
+def retryable_error(error: Exception) -> bool:
+    """
+    Tells whether a failed call may be retried: the service was unreachable or timed out, rather than the gateway
+    refusing to call it.
+
+    Args:
+        error: the error raised by the call
+
+    Returns:
+        bool: True if the call may be retried.
+    """
+    return (isinstance(error, HTTPException)
+            and not isinstance(error, (CircuitOpenError, BulkheadFullError, ConcurrencyLimitError))
+            and error.status_code in RETRYABLE_STATUSES)
+
+
+async def retrying(service: Service,
+                   call: Callable[[], Awaitable[R]],
+                   retryable: Callable[[R], bool],
+                   budget: RetryBudget = retry_budget,
+                   ) -> R:
+    """
+    Executes a call, retrying it after a jittered backoff while it fails and the retry budget allows.
+
+    Args:
+        service: the requested service, whose retry policy applies
+        call: the call to the service
+        retryable: tells whether the call result may be retried
+        budget: the retry budget
+
+    Returns:
+        R: the result of the last attempt.
+    """
+    policy = service.retry
+    budget.deposit()
+
+    attempt = 1
+
+    while True:
+        try:
+            result = await call()
+        except HTTPException as error:
+            if attempt == policy.attempts or not retryable_error(error) or not spend(service, budget):
+                raise
+        else:
+            if attempt == policy.attempts or not retryable(result) or not spend(service, budget):
+                return result
+
+        await asyncio.sleep(backoff(policy, attempt))
+        attempt += 1
+        RETRIED_REQUESTS.labels(service=service.name, app_name=app_name).inc()
+        log.debug(f"Retrying request to {service.name}, attempt {attempt}")
+
+
+async def hedged(service: Service, call: Callable[[], Awaitable[R]], budget: RetryBudget = retry_budget) -> R:
+    """
+    Executes a call, sending a second copy of it when the first one is slower than usual, and returns whichever
+    completes first. The other one is cancelled.
+
+    Args:
+        service: the requested service, whose retry policy tells when to hedge
+        call: the call to the service
+        budget: the retry budget, which hedged copies draw from
+
+    Returns:
+        R: the result of the first call to complete, or of the last one to fail.
+    """
+    policy = service.retry
+    latencies = get_latency_window(service)
+
+    async def timed() -> R:
+        start = time.perf_counter()
+        result = await call()
+        latencies.record(time.perf_counter() - start)
+        return result
+
+    if not policy.hedge or len(latencies.samples) < policy.hedge_min_samples:
+        return await timed()
+
+    delay = latencies.percentile(policy.hedge_percentile)
+    pending = {asyncio.ensure_future(timed())}
+
+    try:
+        done, _ = await asyncio.wait(pending, timeout=delay)
+
+        if not done and spend(service, budget):
+            HEDGED_REQUESTS.labels(service=service.name, app_name=app_name).inc()
+            pending.add(asyncio.ensure_future(timed()))
+
+        error = None
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                if (error := task.exception()) is None:
+                    return task.result()
+
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def resilient(service: Service,
+                    method: str,
+                    call: Callable[[], Awaitable[R]],
+                    retryable: Callable[[R], bool],
+                    ) -> R:
+    """
+    Executes a call to an in-network service, hedging and retrying it according to the service policy if the
+    request method is idempotent.
+
+    Args:
+        service: the requested service
+        method: the request method
+        call: the call to the service
+        retryable: tells whether the call result may be retried
+
+    Returns:
+        R: the call result.
+    """
+    method = method.upper()
+
+    if method not in IDEMPOTENT_METHODS:
+        return await call()
+
+    if method in HEDGED_METHODS:
+        return await retrying(service=service, call=lambda: hedged(service=service, call=call), retryable=retryable)
+
+    return await retrying(service=service, call=call, retryable=retryable)
+
+
+def spend(service: Service, budget: RetryBudget) -> bool:
+    """
+    Withdraws a retry or hedged request from the budget.
+
+    Args:
+        service: the requested service
+        budget: the retry budget
+
+    Returns:
+        bool: True if the budget allows it.
+    """
+    if budget.withdraw():
+        return True
+
+    RETRY_BUDGET_EXHAUSTED.labels(service=service.name, app_name=app_name).inc()
+    return False
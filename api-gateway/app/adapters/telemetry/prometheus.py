@@ -64,6 +64,114 @@ OPTIONS_VOTED = Histogram(
     ["vote", "app_name"],
 )
 
+COALESCED_REQUESTS = Counter(
+    "gateway_coalesced_requests_total",
+    "Total count of requests which shared the response of an identical request in flight, by service",
+    ["service", "app_name"],
+)
+
+CIRCUIT_BREAKER_STATE = Gauge(
+    "gateway_circuit_breaker_state",
+    "State of the circuit breaker of each service: 0 closed, 1 half-open, 2 open",
+    ["service", "app_name"],
+)
+
+CIRCUIT_BREAKER_REJECTIONS = Counter(
+    "gateway_circuit_breaker_rejections_total",
+    "Total count of requests rejected by an open circuit breaker, by service",
+    ["service", "app_name"],
+)
+
+RETRIED_REQUESTS = Counter(
+    "gateway_retried_requests_total",
+    "Total count of request retries, by service",
+    ["service", "app_name"],
+)
+
+HEDGED_REQUESTS = Counter(
+    "gateway_hedged_requests_total",
+    "Total count of hedged copies of slow requests, by service",
+    ["service", "app_name"],
+)
+
+RETRY_BUDGET_EXHAUSTED = Counter(
+    "gateway_retry_budget_exhausted_total",
+    "Total count of retries and hedged requests denied by the retry budget, by service",
+    ["service", "app_name"],
+)
+
+ENDPOINT_IN_FLIGHT = Gauge(
+    "gateway_endpoint_in_flight_requests",
+    "Gauge of requests currently in flight, by service endpoint",
+    ["service", "endpoint", "app_name"],
+)
+
+ENDPOINT_LATENCY = Histogram(
+    "gateway_endpoint_request_duration_seconds",
+    "Histogram of requests processing time by service endpoint (in seconds)",
+    ["service", "endpoint", "app_name"],
+)
+
+BULKHEAD_IN_FLIGHT = Gauge(
+    "gateway_bulkhead_in_flight_requests",
+    "Gauge of requests holding a bulkhead slot, by service",
+    ["service", "app_name"],
+)
+
+BULKHEAD_QUEUE_DEPTH = Gauge(
+    "gateway_bulkhead_queue_depth",
+    "Gauge of requests waiting for a bulkhead slot, by service",
+    ["service", "app_name"],
+)
+
+BULKHEAD_QUEUE_WAIT = Histogram(
+    "gateway_bulkhead_queue_wait_seconds",
+    "Histogram of the time requests waited for a bulkhead slot, by service (in seconds)",
+    ["service", "app_name"],
+)
+
+BULKHEAD_REJECTIONS = Counter(
+    "gateway_bulkhead_rejections_total",
+    "Total count of requests shed by a bulkhead, by service and reason",
+    ["service", "reason", "app_name"],
+)
+
+CONCURRENCY_LIMIT = Gauge(
+    "gateway_concurrency_limit",
+    "Adaptive limit of the requests in flight, by service",
+    ["service", "app_name"],
+)
+
+CONCURRENCY_LIMIT_REJECTIONS = Counter(
+    "gateway_concurrency_limit_rejections_total",
+    "Total count of requests rejected by the adaptive concurrency limit, by service",
+    ["service", "app_name"],
+)
+
+CONTRACT_VIOLATIONS = Counter(
+    "gateway_contract_violations_total",
+    "Total count of sampled trusted service responses which did not match their model, by service",
+    ["service", "app_name"],
+)
+
+TOKEN_CACHE_LOOKUPS = Counter(
+    "gateway_token_cache_lookups_total",
+    "Total count of token introspection cache lookups, by cache tier and result",
+    ["tier", "result", "app_name"],
+)
+
+RATE_LIMIT_REJECTIONS = Counter(
+    "gateway_rate_limit_rejections_total",
+    "Total count of requests rejected by the rate limiter, by source: the limiter, or the blocked clients cache",
+    ["source", "app_name"],
+)
+
+RATE_LIMITER_FALLBACK = Gauge(
+    "gateway_rate_limiter_fallback",
+    "Whether the rate limiters fall back while redis is unavailable: 0 no, 1 yes",
+    ["app_name"],
+)
+
 
 def metrics(request: Request) -> Response:
     return Response(generate_latest(REGISTRY), headers={"Content-Type": CONTENT_TYPE_LATEST})
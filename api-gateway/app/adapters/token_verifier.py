@@ -0,0 +1,129 @@
+"""
+This module is responsible for verifying JSON Web Tokens locally, instead of asking the auth service to.
+
+Tokens are decoded with python-jose, as the auth service encodes them: HMAC tokens against the shared secret or a
+symmetric key of the key set, RSA tokens against a public key of the key set.
+"""
+from typing import Any
+
+from fastapi import HTTPException, status
+from jose import ExpiredSignatureError, JWTError, jwt
+from jose.exceptions import JWTClaimsError
+
+HMAC_ALGORITHMS = frozenset({"HS256", "HS384", "HS512"})
+RSA_ALGORITHMS = frozenset({"RS256", "RS384", "RS512"})
+# Algorithms a token may be signed with, whatever the settings ask for: never "none", nor any other family.
+ALLOWED_ALGORITHMS = HMAC_ALGORITHMS | RSA_ALGORITHMS
+
+
+class InvalidTokenError(HTTPException):
+    """
+    Raised when a token is malformed, is not signed by a known key, or is expired.
+    """
+
+    def __init__(self, reason: str):
+        super().__init__(status_code=status.HTTP_401_UNAUTHORIZED,
+                         detail=f"Invalid token: {reason}.",
+                         headers={"WWW-Authenticate": "Bearer"})
+
+
+class UnknownKeyError(InvalidTokenError):
+    """
+    Raised when a token is signed by a key missing from the key set, which may have been rotated since it was loaded.
+    """
+
+    def __init__(self, kid: str | None):
+        super().__init__(reason=f"unknown key {kid}")
+
+
+class TokenVerifier:
+    """
+    Verifies the signature and the validity period of JSON Web Tokens, which must tell when they expire.
+
+    Attributes:
+        secret (str | None): the shared secret of HMAC tokens.
+        keys (dict[str | None, dict[str, str]]): the JSON Web Keys, by key id.
+        algorithms (frozenset[str]): the accepted signature algorithms, among the allowed ones.
+        leeway (int): seconds a token is still accepted past its expiry, or before it is valid.
+    """
+
+    def __init__(self, secret: str | None = None, algorithms: list[str] | None = None, leeway: int = 0):
+        self.secret = secret
+        self.keys: dict[str | None, dict[str, str]] = dict()
+        self.algorithms = frozenset(algorithms or ["HS256"]) & ALLOWED_ALGORITHMS
+        self.leeway = leeway
+
+    def load_keys(self, key_set: dict[str, Any]) -> None:
+        """
+        Replaces the keys with those of a key set.
+
+        Args:
+            key_set (dict[str, Any]): the JSON Web Key Set
+        """
+        self.keys = {key.get("kid"): key for key in key_set.get("keys", [])}
+
+    def verify(self, token: str) -> dict[str, Any]:
+        """
+        Verifies a token.
+
+        Args:
+            token (str): the compact serialized token
+
+        Returns:
+            dict[str, Any]: the token claims.
+
+        Raises:
+            InvalidTokenError: if the token is malformed, badly signed, without expiry or out of its validity period.
+            UnknownKeyError: if the token is signed by a key which is not loaded.
+        """
+        try:
+            header = jwt.get_unverified_header(token)
+        except JWTError:
+            raise InvalidTokenError("malformed token") from None
+
+        if (algorithm := header.get("alg")) not in self.algorithms:
+            raise InvalidTokenError(f"unsupported algorithm {algorithm}")
+
+        try:
+            return jwt.decode(token,
+                              self.key(algorithm=algorithm, kid=header.get("kid")),
+                              algorithms=[algorithm],
+                              options={"require_exp": True, "verify_aud": False, "leeway": self.leeway})
+        except ExpiredSignatureError:
+            raise InvalidTokenError("expired token") from None
+        except JWTClaimsError as error:
+            raise InvalidTokenError(str(error).rstrip(".").lower()) from None
+        except JWTError:
+            raise InvalidTokenError("bad signature") from None
+
+    def key(self, algorithm: str, kid: str | None) -> str | dict[str, str]:
+        """
+        Finds the key a token is signed by: the shared secret for HMAC tokens without a key of the key set, else the
+        key of the key set, the only one when the token does not tell.
+
+        Args:
+            algorithm (str): the signature algorithm
+            kid (str | None): the id of the signing key
+
+        Returns:
+            str | dict[str, str]: the shared secret, or the JSON Web Key.
+
+        Raises:
+            InvalidTokenError: if the key does not match the algorithm family.
+            UnknownKeyError: if the key is not loaded.
+        """
+        if algorithm in HMAC_ALGORITHMS and self.secret and kid not in self.keys:
+            return self.secret
+
+        if kid in self.keys:
+            key = self.keys[kid]
+        elif kid is None and len(self.keys) == 1:
+            key = next(iter(self.keys.values()))
+        else:
+            raise UnknownKeyError(kid)
+
+        # A public key must never serve as an HMAC secret, nor a symmetric key as an RSA key.
+        if key.get("kty") != ("RSA" if algorithm in RSA_ALGORITHMS else "oct"):
+            raise InvalidTokenError("bad signature")
+
+        return key
@@ -1,20 +1,52 @@
 """Application implementation - ASGI."""
 
+import asyncio
 from contextlib import asynccontextmanager
 import logging
+import signal
 
 from fastapi import Depends, FastAPI
 from starlette.middleware.cors import CORSMiddleware
 
 from app.adapters.http_client import aio_http_client
 from app.adapters.telemetry.prometheus import metrics, setting_otlp
-from app.dependencies import get_redis
-from app.middleware import PrometheusMiddleware, rate_limiter_middleware
+from app.dependencies import get_approximate_rate_limiter, get_redis, get_services
+from app.middleware import PrometheusMiddleware, RateLimitHeadersMiddleware, rate_limiter_middleware
 from app.router import api_router_v1, root_router
+from app.service_layer.rate_limiter import redis_probe
+from app.service_layer.service_registry import ServiceRegistry
 from app.settings.app_settings import ApplicationSettings
+from app.settings.gateway_settings import GatewaySettings
+from app.utils.serializer import ModelResponse
 
 log = logging.getLogger(__name__)
 
+services_watcher: asyncio.Task | None = None
+rate_limit_syncer: asyncio.Task | None = None
+
+
+def watch_services(services: ServiceRegistry) -> asyncio.Task | None:
+    """
+    Reloads the services on SIGHUP, and whenever the services file changes if any.
+
+    Args:
+        services (ServiceRegistry): the service registry
+
+    Returns:
+        asyncio.Task | None: the task watching the services file, if any.
+    """
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, services.reload)
+    except (AttributeError, NotImplementedError, RuntimeError, ValueError):
+        log.warning("Services cannot be reloaded on SIGHUP on this platform.")
+
+    settings = GatewaySettings()
+
+    if not settings.SERVICES_FILE:
+        return None
+
+    return asyncio.create_task(services.watch(path=settings.SERVICES_FILE, interval=settings.SERVICES_WATCH_INTERVAL))
+
 
 async def on_startup():
     """
@@ -23,9 +55,24 @@ async def on_startup():
     Resources:
         1. https://fastapi.tiangolo.com/advanced/events/#startup-event
     """
+    global services_watcher, rate_limit_syncer
+
     log.debug("Execute FastAPI startup event handler.")
     aio_http_client.get_aiohttp_client()
-    get_redis()
+
+    services = get_services()
+
+    for service in services:
+        aio_http_client.get_aiohttp_client(service)
+
+    services_watcher = watch_services(services)
+
+    redis = get_redis()
+    settings = ApplicationSettings()
+
+    if settings.USE_LIMITER and settings.LIMITER_APPROXIMATE:
+        rate_limiter = get_approximate_rate_limiter(redis)
+        rate_limit_syncer = asyncio.create_task(rate_limiter.sync_forever(interval=settings.LIMITER_SYNC_INTERVAL))
 
 
 async def on_shutdown():
@@ -36,6 +83,15 @@ async def on_shutdown():
         1. https://fastapi.tiangolo.com/advanced/events/#shutdown-event
     """
     log.debug("Execute FastAPI shutdown event handler.")
+
+    if services_watcher is not None:
+        services_watcher.cancel()
+
+    if rate_limit_syncer is not None:
+        rate_limit_syncer.cancel()
+        await get_approximate_rate_limiter(get_redis()).sync()
+
+    redis_probe.stop()
     await aio_http_client.close_aiohttp_client()
     await get_redis().close()
 
@@ -107,9 +163,13 @@ def get_application() -> FastAPI:
         license_info=license_info,
         contact=contact,
         openapi_tags=tags_metadata,
-        dependencies=dependencies
+        dependencies=dependencies,
+        default_response_class=ModelResponse,
     )
 
+    if settings.USE_LIMITER:
+        app.add_middleware(RateLimitHeadersMiddleware)
+
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
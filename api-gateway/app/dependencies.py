@@ -3,23 +3,40 @@ FastAPI dependencies injection.
 """
 from typing import Annotated
 
-from fastapi import Depends
+from fastapi import Depends, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from app.adapters.http_client import AsyncHttpClient, aio_http_client
 from app.adapters.redis_connector import RedisClient, RedisClusterConnection, RedisConnector
-from app.domain.models import Service
-from app.service_layer.rate_limiter import RateLimiter, RedisRateLimiter
+from app.service_layer.authenticator import LocalAuthenticator
+from app.service_layer.rate_limiter import RATE_LIMITERS, DenyCachingRateLimiter, Fallback, \
+    PreAggregatedRateLimiter, QuotaRateLimiter, RateLimiter
+from app.service_layer.response_cache import RedisResponseCache, ResponseCache
+from app.service_layer.service_registry import ServiceRegistry
+from app.service_layer.token_cache import TokenCache
 from app.settings.app_settings import ApplicationSettings
+from app.settings.auth_settings import AuthSettings
 from app.settings.gateway_settings import GatewaySettings
 from app.settings.redis_config import RedisSettings
 
 redis_connector: RedisConnector | None = None
+service_registry: ServiceRegistry | None = None
+local_authenticator: LocalAuthenticator | None = None
+approximate_rate_limiter: PreAggregatedRateLimiter | None = None
+rate_limiter: RateLimiter | None = None
+quota_rate_limiter: QuotaRateLimiter | None = None
+token_cache: TokenCache | None = None
+response_caches: dict[int, ResponseCache] = dict()
 bearer_auth = HTTPBearer(scheme_name='JSON Web Token', description='Bearer JWT')
+optional_bearer_auth = HTTPBearer(scheme_name='JSON Web Token', description='Bearer JWT', auto_error=False)
 
 BearerTokenAuth = Annotated[HTTPAuthorizationCredentials, Depends(bearer_auth)]
+OptionalBearerTokenAuth = Annotated[HTTPAuthorizationCredentials | None, Depends(optional_bearer_auth)]
 
 app_settings = ApplicationSettings()
+auth_settings = AuthSettings()
+gateway_settings = GatewaySettings()
+redis_settings = RedisSettings()
 
 
 def get_async_http_client() -> AsyncHttpClient:
@@ -30,12 +47,35 @@ def get_async_http_client() -> AsyncHttpClient:
 AsyncHttpClientDependency = Annotated[AsyncHttpClient, Depends(get_async_http_client)]
 
 
-def get_services() -> list[Service]:
+def get_services() -> ServiceRegistry:
     """Get service provider."""
-    return GatewaySettings().SERVICES
 
+    global service_registry
 
-ServiceProvider = Annotated[list[Service], Depends(get_services)]
+    if service_registry is None:
+        service_registry = ServiceRegistry.from_settings(gateway_settings)
+
+    return service_registry
+
+
+ServiceProvider = Annotated[ServiceRegistry, Depends(get_services)]
+
+
+def get_authenticator() -> LocalAuthenticator | None:
+    """Get the local authenticator, unless tokens are verified by the auth service."""
+
+    global local_authenticator
+
+    if not auth_settings.verify_locally:
+        return None
+
+    if local_authenticator is None:
+        local_authenticator = LocalAuthenticator.from_settings(auth_settings)
+
+    return local_authenticator
+
+
+AuthenticatorDependency = Annotated[LocalAuthenticator | None, Depends(get_authenticator)]
 
 
 def get_redis() -> RedisConnector:
@@ -43,14 +83,12 @@ def get_redis() -> RedisConnector:
 
     global redis_connector
 
-    settings = RedisSettings()
-
-    host = settings.HOST
-    port = settings.PORT
+    host = redis_settings.HOST
+    port = redis_settings.PORT
 
     if redis_connector is None:
-        redis_connector = RedisClusterConnection(url=host, port=port) if settings.CLUSTER else RedisClient(url=host,
-                                                                                                           port=port)
+        redis_connector = RedisClusterConnection(url=host, port=port) if redis_settings.CLUSTER else RedisClient(
+            url=host, port=port)
 
     return redis_connector
 
@@ -60,12 +98,110 @@ RedisDependency = Annotated[RedisConnector, Depends(get_redis)]
 
 def get_rate_limiter(redis: RedisDependency) -> RateLimiter | None:
     """Get rate limiter."""
-    settings = ApplicationSettings()
 
-    if not settings.USE_LIMITER:
+    global rate_limiter
+
+    if not app_settings.USE_LIMITER:
         return None
 
-    return RedisRateLimiter(redis=redis, threshold=settings.LIMITER_THRESHOLD, time_to_live=settings.LIMITER_INTERVAL)
+    if app_settings.LIMITER_APPROXIMATE:
+        return get_approximate_rate_limiter(redis)
+
+    if rate_limiter is None:
+        rate_limiter = RATE_LIMITERS[app_settings.LIMITER_ALGORITHM](redis=redis,
+                                                                     threshold=app_settings.LIMITER_THRESHOLD,
+                                                                     time_to_live=app_settings.LIMITER_INTERVAL,
+                                                                     fallback=rate_limit_fallback(app_settings))
+
+        if app_settings.LIMITER_BLOCKED_CLIENTS > 0:
+            rate_limiter = DenyCachingRateLimiter(rate_limiter=rate_limiter,
+                                                  max_size=app_settings.LIMITER_BLOCKED_CLIENTS)
+
+    return rate_limiter
+
+
+def rate_limit_fallback(settings: ApplicationSettings) -> Fallback:
+    """Get how the rate limiters limit requests while redis is unavailable."""
+    return Fallback(mode=settings.LIMITER_FAILURE_MODE, probe_interval=settings.LIMITER_PROBE_INTERVAL)
+
+
+def get_approximate_rate_limiter(redis: RedisConnector) -> PreAggregatedRateLimiter:
+    """Get the rate limiter counting requests in process, shared by the requests so that it keeps their counts."""
+
+    global approximate_rate_limiter
+
+    if approximate_rate_limiter is None:
+        approximate_rate_limiter = PreAggregatedRateLimiter(redis=redis,
+                                                            threshold=app_settings.LIMITER_THRESHOLD,
+                                                            time_to_live=app_settings.LIMITER_INTERVAL,
+                                                            max_drift=app_settings.LIMITER_MAX_DRIFT,
+                                                            refresh_interval=app_settings.LIMITER_REFRESH_INTERVAL,
+                                                            probe_interval=app_settings.LIMITER_PROBE_INTERVAL)
+
+    return approximate_rate_limiter
 
 
 RateLimiterDependency = Annotated[RateLimiter | None, Depends(get_rate_limiter)]
+
+
+def get_quota_rate_limiter(redis: RedisDependency) -> QuotaRateLimiter | None:
+    """Get the rate limiter of the quota policy table, unless no quota is set."""
+
+    global quota_rate_limiter
+
+    if not app_settings.USE_LIMITER or not app_settings.LIMITER_QUOTAS:
+        return None
+
+    if quota_rate_limiter is None:
+        quota_rate_limiter = QuotaRateLimiter(redis=redis,
+                                              quotas=app_settings.LIMITER_QUOTAS,
+                                              threshold=app_settings.LIMITER_THRESHOLD,
+                                              time_to_live=app_settings.LIMITER_INTERVAL,
+                                              fallback=rate_limit_fallback(app_settings),
+                                              max_blocked=app_settings.LIMITER_BLOCKED_CLIENTS)
+
+    return quota_rate_limiter
+
+
+QuotaRateLimiterDependency = Annotated[QuotaRateLimiter | None, Depends(get_quota_rate_limiter)]
+
+
+def get_response_cache(request: Request, redis: RedisDependency) -> ResponseCache | None:
+    """Get the response cache of the requested route."""
+    route = request.scope.get("route")
+
+    return response_cache(redis=redis, ttl=gateway_settings.CACHE_TTLS.get(getattr(route, "path", request.url.path)))
+
+
+def response_cache(redis: RedisConnector, ttl: int | None) -> ResponseCache | None:
+    """Get a response cache, unless caching is disabled or the TTL is not positive."""
+    if not ttl or ttl <= 0 or not app_settings.USE_CACHE or not redis_settings.ACTIVE:
+        return None
+
+    if ttl not in response_caches:
+        response_caches[ttl] = RedisResponseCache(redis=redis, ttl=ttl)
+
+    return response_caches[ttl]
+
+
+ResponseCacheDependency = Annotated[ResponseCache | None, Depends(get_response_cache)]
+
+
+def get_token_cache(redis: RedisDependency) -> TokenCache | None:
+    """Get the token introspection cache, unless disabled."""
+
+    global token_cache
+
+    if auth_settings.TOKEN_CACHE_TTL <= 0:
+        return None
+
+    if token_cache is None:
+        token_cache = TokenCache(redis=redis if redis_settings.ACTIVE else None,
+                                 ttl=auth_settings.TOKEN_CACHE_TTL,
+                                 negative_ttl=auth_settings.TOKEN_CACHE_NEGATIVE_TTL,
+                                 max_size=auth_settings.TOKEN_CACHE_SIZE)
+
+    return token_cache
+
+
+TokenCacheDependency = Annotated[TokenCache | None, Depends(get_token_cache)]
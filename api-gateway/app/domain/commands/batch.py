@@ -0,0 +1,39 @@
+"""
+Commands that may be attempted in the gateway itself.
+"""
+from typing import Any
+
+from pydantic import Field, validator
+
+from app.domain.schemas import CamelCaseModel
+
+batch_path = "/api/v1/batch"
+
+
+class SubRequest(CamelCaseModel):
+    """
+    Command that represents one of the requests of a batch.
+    """
+    id: str | None = Field(description="An identifier, echoed in the response.", example="me")
+    method: str = Field(description="The HTTP method.", example="GET", default="GET")
+    path: str = Field(description="The gateway path, along with its query string.",
+                      example="/api/v1/users?users=johndoe")
+    headers: dict[str, str] = Field(description="Headers overriding the batch ones.", default_factory=dict)
+    body: Any | None = Field(description="The JSON body.", example={"username": "johndoe"})
+
+    @validator("method")
+    def method_upper(cls, v):
+        return v.upper()
+
+    @validator("path")
+    def path_in_api(cls, v):
+        if not v.startswith("/api/v1/") or v.startswith(batch_path):
+            raise ValueError("must be a path of the API, other than the batch one")
+        return v
+
+
+class RunBatch(CamelCaseModel):
+    """
+    Command that represents the intent to run several requests at once.
+    """
+    requests: list[SubRequest] = Field(description="The requests to run concurrently.", min_items=1)
@@ -3,7 +3,7 @@ Events related to actuator.
 """
 from pydantic import Field
 
-from app.domain.models import ServiceStatus
+from app.domain.models import CircuitState, ServiceStatus
 from app.domain.schemas import CamelCaseModel
 
 
@@ -14,6 +14,9 @@ class StatusChecked(CamelCaseModel):
 
     name: str = Field(description="The name of the service.", example="redis")
     status: ServiceStatus = Field(description="The status of the service.", example=ServiceStatus.ONLINE)
+    circuit: CircuitState | None = Field(description="The state of the service circuit breaker, if any.",
+                                         example=CircuitState.CLOSED,
+                                         default=None)
 
 
 class ReadinessChecked(CamelCaseModel):
@@ -0,0 +1,18 @@
+"""
+Events that may occur in the gateway itself.
+"""
+from typing import Any
+
+from pydantic import Field
+
+from app.domain.schemas import CamelCaseModel
+
+
+class SubRequestAnswered(CamelCaseModel):
+    """
+    Event that occurs when one of the requests of a batch is answered.
+    """
+    id: str | None = Field(description="The request identifier, if any.", example="me")
+    status: int = Field(description="The response status code.", example=200)
+    headers: dict[str, str] = Field(description="The response headers.", default_factory=dict)
+    body: Any | None = Field(description="The response body, parsed if JSON.", example={"data": []})
@@ -5,6 +5,7 @@ import datetime
 
 from pydantic import Field
 
+from app.domain.events.auth_service import UserRegistered
 from app.domain.schemas import CamelCaseModel
 
 
@@ -30,3 +31,13 @@ class MeetingScheduled(CamelCaseModel):
     date: datetime.datetime | None = Field(description="The meeting's date.", example="2021-01-01T09:30:00Z")
     guests: list[str] = Field(description="A list of guests.", example=["johndoe", "clarasmith"], default_factory=list)
     options: list[OptionVoted] = Field(description="A list of options.")
+
+
+class MeetingExpanded(MeetingScheduled):
+    """
+    A meeting which organizer and guests are embedded as user records, where expanded and registered.
+    """
+
+    organizer: UserRegistered | str = Field(description="Who scheduled the meeting.", example="johndoe")
+    guests: list[UserRegistered | str] = Field(description="A list of guests.", example=["johndoe", "clarasmith"],
+                                               default_factory=list)
@@ -2,8 +2,9 @@
 Business objects
 """
 from enum import Enum
+import hashlib
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, root_validator
 
 
 class Role(str, Enum):
@@ -15,6 +16,17 @@ class Role(str, Enum):
     USER = "user"
 
 
+class Expansion(str, Enum):
+    """Expansion enumeration.
+
+    Attributes:
+        ORGANIZER (str): The meeting organizer username is replaced by the user record.
+        GUESTS (str): The meeting guests usernames are replaced by the user records.
+    """
+    ORGANIZER = "organizer"
+    GUESTS = "guests"
+
+
 class ServiceStatus(str, Enum):
     """Service status enumeration.
 
@@ -27,14 +39,309 @@ class ServiceStatus(str, Enum):
     OFFLINE = "offline"
 
 
+class Balancer(str, Enum):
+    """Load balancing strategy enumeration.
+
+    Attributes:
+        ROUND_ROBIN (str): Endpoints are picked in turn.
+        LEAST_OUTSTANDING (str): The endpoint with the fewest requests in flight is picked.
+        PEAK_EWMA (str): The endpoint with the lowest peak-sensitive moving average latency, weighted by its
+            requests in flight, is picked.
+    """
+
+    ROUND_ROBIN = "round-robin"
+    LEAST_OUTSTANDING = "least-outstanding"
+    PEAK_EWMA = "peak-ewma"
+
+
+class LimitAlgorithm(str, Enum):
+    """Adaptive concurrency limit algorithm enumeration.
+
+    Attributes:
+        AIMD (str): The limit grows by one on success, and shrinks by a ratio on failure or high latency.
+        GRADIENT (str): The limit follows the ratio between the long-term and the current latency.
+    """
+
+    AIMD = "aimd"
+    GRADIENT = "gradient"
+
+
+class RateLimitAlgorithm(str, Enum):
+    """Rate limit algorithm enumeration.
+
+    Attributes:
+        FIXED_WINDOW (str): Counts the requests of fixed windows, letting bursts of twice the limit through across a
+            window boundary.
+        SLIDING_WINDOW (str): Weighs the count of the previous window by how much of it still overlaps the sliding one.
+        SLIDING_LOG (str): Logs the time of every request, and counts those within the sliding window.
+        GCRA (str): Spaces requests evenly over the window, letting bursts of the limit through, as a token bucket.
+    """
+
+    FIXED_WINDOW = "fixed-window"
+    SLIDING_WINDOW = "sliding-window"
+    SLIDING_LOG = "sliding-log"
+    GCRA = "gcra"
+
+
+class RateLimitFailureMode(str, Enum):
+    """Rate limiter failure mode enumeration, telling how requests are limited while redis is unavailable.
+
+    Attributes:
+        OPEN (str): Requests are counted in process, each gateway instance counting its own requests only.
+        CLOSED (str): Requests are rejected.
+    """
+
+    OPEN = "open"
+    CLOSED = "closed"
+
+
+class Quota(BaseModel):
+    """Rate limit of the requests matching a route, a user or a role.
+
+    A request counts against every quota it matches, and is rejected once it surpasses any of them. Each client has
+    quotas of its own: the authenticated user, or the client host of anonymous requests.
+
+    Attributes:
+        route (str | None): Path template of the limited route, e.g. /api/v1/schedules, None to match any route.
+        methods (list[str]): HTTP methods of the limited requests, empty to match any method.
+        username (str | None): Username of the limited user, None to match any user, or anonymous requests.
+        role (Role | None): Role of the limited users, None to match any role, or anonymous requests.
+        threshold (int): Requests, weighed by their cost, allowed in the interval.
+        interval (int): Interval in seconds.
+    """
+
+    route: str | None = None
+    methods: list[str] = Field(default_factory=list)
+    username: str | None = None
+    role: Role | None = None
+    threshold: int = Field(gt=0)
+    interval: int = Field(gt=0)
+
+    @property
+    def key(self) -> str:
+        """
+        Short digest of the quota, naming its counters so that editing a quota starts it over.
+        """
+        return hashlib.blake2b(self.json().encode(), digest_size=4).hexdigest()
+
+    def matches(self, route: str, method: str, username: str | None = None, role: Role | None = None) -> bool:
+        """
+        Whether a request counts against the quota.
+
+        Args:
+            route (str): Path template of the requested route.
+            method (str): HTTP method of the request.
+            username (str | None): Username of the authenticated user, None if anonymous.
+            role (Role | None): Role of the authenticated user, None if anonymous.
+
+        Returns:
+            bool: True if every criterion of the quota matches the request.
+        """
+        return ((self.route is None or self.route == route)
+                and (not self.methods or method.upper() in (allowed.upper() for allowed in self.methods))
+                and (self.username is None or self.username == username)
+                and (self.role is None or self.role == role))
+
+
+class CircuitState(str, Enum):
+    """Circuit breaker state enumeration.
+
+    Attributes:
+        CLOSED (str): Requests flow to the service.
+        OPEN (str): Requests are rejected without reaching the service.
+        HALF_OPEN (str): A few trial requests are let through to probe the service.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+
+class CircuitBreakerPolicy(BaseModel):
+    """Circuit breaker settings of a service.
+
+    Attributes:
+        enabled (bool): Whether requests to the service go through a circuit breaker.
+        window (int): Number of most recent calls the failure rate is computed over.
+        minimum_calls (int): Number of calls needed before the failure rate is considered.
+        failure_rate (float): Rate of failed calls, between 0 and 1, which opens the circuit.
+        slow_call_duration (float): Seconds after which a call counts as failed.
+        open_duration (float): Seconds the circuit stays open before probing the service again.
+        half_open_calls (int): Number of trial calls which must succeed to close the circuit again.
+    """
+
+    enabled: bool = True
+    window: int = 20
+    minimum_calls: int = 10
+    failure_rate: float = 0.5
+    slow_call_duration: float = 5.0
+    open_duration: float = 30.0
+    half_open_calls: int = 3
+
+
+class RetryPolicy(BaseModel):
+    """Retry and hedging settings of a service, applied to idempotent requests only.
+
+    Attributes:
+        attempts (int): Maximum number of attempts of a request, including the first one.
+        backoff (float): Base seconds to back off before retrying, doubled on every attempt and fully jittered.
+        max_backoff (float): Upper bound of the seconds to back off before retrying.
+        hedge (bool): Whether a second copy of a GET request is sent once it takes longer than usual.
+        hedge_percentile (float): Percentile of the observed latencies after which a request is hedged.
+        hedge_min_samples (int): Number of observed latencies needed before hedging.
+    """
+
+    attempts: int = 3
+    backoff: float = 0.05
+    max_backoff: float = 1.0
+    hedge: bool = False
+    hedge_percentile: float = 0.95
+    hedge_min_samples: int = 20
+
+
+class BulkheadPolicy(BaseModel):
+    """Concurrency limits of the requests to a service.
+
+    Attributes:
+        enabled (bool): Whether the requests to the service are limited.
+        max_concurrent (int): Number of requests to the service allowed in flight.
+        max_queued (int): Number of requests allowed to wait for a slot, further ones are shed.
+        queue_timeout (float): Seconds a request may wait for a slot before being shed.
+    """
+
+    enabled: bool = True
+    max_concurrent: int = 100
+    max_queued: int = 100
+    queue_timeout: float = 1.0
+
+
+class ConcurrencyLimitPolicy(BaseModel):
+    """Adaptive concurrency limit settings of a service.
+
+    Attributes:
+        enabled (bool): Whether the requests in flight to the service are adaptively limited.
+        algorithm (LimitAlgorithm): Algorithm adjusting the limit from the observed latencies.
+        initial_limit (int): Requests allowed in flight at first.
+        min_limit (int): Lower bound of the limit.
+        max_limit (int): Upper bound of the limit.
+        backoff_ratio (float): AIMD ratio the limit is multiplied by on failure or high latency.
+        latency_threshold (float): AIMD seconds after which a call counts as a sign of overload.
+        tolerance (float): Gradient ratio of the long-term latency the current one may reach before the limit shrinks.
+        smoothing (float): Gradient weight, between 0 and 1, of a new limit over the current one.
+    """
+
+    enabled: bool = True
+    algorithm: LimitAlgorithm = LimitAlgorithm.AIMD
+    initial_limit: int = 100
+    min_limit: int = 1
+    max_limit: int = 1000
+    backoff_ratio: float = 0.9
+    latency_threshold: float = 2.0
+    tolerance: float = 1.5
+    smoothing: float = 0.2
+
+
+class ContractPolicy(BaseModel):
+    """Response contract settings of a service.
+
+    Attributes:
+        trusted (bool): Whether the service responses are trusted to match their models, which are then built without
+            validation.
+        sample_rate (float): Ratio, between 0 and 1, of the responses of a trusted service which are validated still,
+            to detect contract drift.
+    """
+
+    trusted: bool = False
+    sample_rate: float = Field(default=0.01, ge=0, le=1)
+
+
+class ConnectionPool(BaseModel):
+    """Connection pool settings of a service.
+
+    Attributes:
+        size (int): Maximum number of simultaneous connections to the service.
+        keepalive_timeout (float): Seconds an idle connection is kept open for reuse.
+        connect_timeout (float): Seconds to wait for a connection to be established.
+        read_timeout (float): Seconds to wait for data between two reads.
+        dns_cache_ttl (int | None): Seconds a resolved address is cached, None caches it forever.
+        timeout (float): Total seconds a request may take, including reading its body.
+    """
+
+    size: int = 100
+    keepalive_timeout: float = 15.0
+    connect_timeout: float = 2.0
+    read_timeout: float = 10.0
+    dns_cache_ttl: int | None = 10
+    timeout: float = 60.0
+
+
 class Service(BaseModel):
     """Service business object.
 
     Attributes:
         name (str): Service name.
+        base_url (str): Service url, defaults to the first endpoint.
+        endpoints (list[str]): Urls of the service replicas, defaults to the base url.
+        balancer (Balancer): Strategy picking the replica each request is sent to.
+        readiness_url (str): Readiness check path.
+        health_url (str): Health check path.
+        pool (ConnectionPool): Connection pool settings.
+        circuit_breaker (CircuitBreakerPolicy): Circuit breaker settings.
+        retry (RetryPolicy): Retry and hedging settings.
+        bulkhead (BulkheadPolicy): Concurrency limits.
+        concurrency_limit (ConcurrencyLimitPolicy): Adaptive concurrency limit settings.
+        contract (ContractPolicy): Response contract settings.
     """
 
     name: str
-    base_url: str
+    base_url: str | None = None
+    endpoints: list[str] = Field(default_factory=list)
+    balancer: Balancer = Balancer.ROUND_ROBIN
     readiness_url: str = "/readiness"
     health_url: str = "/health"
+    pool: ConnectionPool = Field(default_factory=ConnectionPool)
+    circuit_breaker: CircuitBreakerPolicy = Field(default_factory=CircuitBreakerPolicy)
+    retry: RetryPolicy = Field(default_factory=RetryPolicy)
+    bulkhead: BulkheadPolicy = Field(default_factory=BulkheadPolicy)
+    concurrency_limit: ConcurrencyLimitPolicy = Field(default_factory=ConcurrencyLimitPolicy)
+    contract: ContractPolicy = Field(default_factory=ContractPolicy)
+
+    @root_validator(skip_on_failure=True)
+    def default_endpoints(cls, values: dict) -> dict:
+        """
+        Defaults the base url and the endpoints to one another, one of them being required.
+        """
+        if not values.get("base_url") and not values.get("endpoints"):
+            raise ValueError("Either base_url or endpoints must be set")
+
+        values["base_url"] = values.get("base_url") or values["endpoints"][0]
+        values["endpoints"] = values.get("endpoints") or [values["base_url"]]
+        return values
+
+
+class Route(BaseModel):
+    """Proxied route business object.
+
+    Attributes:
+        path (str): Gateway path template, relative to the API version prefix.
+        methods (list[str]): Proxied HTTP methods.
+        service (str): Name of the upstream service.
+        upstream_path (str | None): Upstream path template, defaults to the gateway path under the API version prefix.
+        auth (bool): Whether the route requires an authenticated user.
+        verify_remotely (bool): Whether the auth service verifies the user token, even when the gateway can.
+        cache_ttl (int | None): Seconds the responses to GET requests are cached for, None to not cache them.
+        timeout (float | None): Seconds the upstream request may take, defaults to the service pool timeout.
+        summary (str | None): Route summary, for the API documentation.
+        tags (list[str]): Route tags, for the API documentation.
+    """
+
+    path: str
+    methods: list[str] = Field(default_factory=lambda: ["GET"])
+    service: str
+    upstream_path: str | None = None
+    auth: bool = False
+    verify_remotely: bool = False
+    cache_ttl: int | None = None
+    timeout: float | None = None
+    summary: str | None = None
+    tags: list[str] = Field(default_factory=list)
@@ -9,12 +9,15 @@ By defining schemas for your data, you can ensure that the data is correctly val
 making your API more robust and reliable. Schemas can also be used to generate OpenAPI documentation automatically,
 which can help both developers and consumers of your API understand its capabilities.
 """
-from typing import Generic, TypeVar
+import inspect
+from typing import Any, Generic, TypeVar
 
 from pydantic import BaseConfig, BaseModel, Field
+from pydantic.fields import ModelField, SHAPE_LIST, SHAPE_SINGLETON
 from pydantic.generics import GenericModel
 
 from app.utils.formatter import to_camel
+from app.utils.serializer import dumps, loads
 
 
 class CamelCaseModel(BaseModel):
@@ -31,12 +34,50 @@ class CamelCaseModel(BaseModel):
         kwargs["by_alias"] = True
         return super().json(*args, **kwargs)
 
+    @classmethod
+    def construct_trusted(cls, **values):
+        """
+        Builds a model from trusted values, without validating them.
+
+        Unlike `construct`, the nested models are built too, so that the model reads the same as a validated one. Values
+        are kept as they are otherwise: dates, for instance, remain strings.
+        """
+        fields = {name: construct_field(field, values[key]) for name, field in cls.__fields__.items()
+                  if (key := field.alias if field.alias in values else name) in values}
+
+        return cls.construct(**fields)
+
     class Config(BaseConfig):
         alias_generator = to_camel
         allow_population_by_field_name = True
         allow_arbitrary_types = True
         use_enum_values = True
         anystr_strip_whitespace = True
+        json_dumps = dumps
+        json_loads = loads
+
+
+def construct_field(field: ModelField, value: Any) -> Any:
+    """
+    Builds the value of a field from a trusted one, without validating it.
+
+    Args:
+        field (ModelField): the model field
+        value (Any): the trusted value
+
+    Returns:
+        Any: the nested model, or the list of nested models, if the field holds any, the value as-is otherwise.
+    """
+    if not (inspect.isclass(field.type_) and issubclass(field.type_, CamelCaseModel)):
+        return value
+
+    if field.shape == SHAPE_SINGLETON and isinstance(value, dict):
+        return field.type_.construct_trusted(**value)
+
+    if field.shape == SHAPE_LIST and isinstance(value, list):
+        return [field.type_.construct_trusted(**item) if isinstance(item, dict) else item for item in value]
+
+    return value
 
 
 S = TypeVar("S", bound=CamelCaseModel)
@@ -2,12 +2,14 @@
 Actuator entrypoint
 """
 import asyncio
+from typing import Iterable
 
 import aiohttp
 from fastapi import APIRouter, HTTPException
 from starlette.responses import RedirectResponse
 from starlette.status import HTTP_200_OK, HTTP_301_MOVED_PERMANENTLY, HTTP_503_SERVICE_UNAVAILABLE
 
+from app.adapters.circuit_breaker import get_circuit_breaker
 from app.adapters.http_client import AsyncHttpClient
 from app.adapters.network import gateway
 from app.adapters.redis_connector import RedisConnector
@@ -72,6 +74,8 @@ async def check_service(service: Service, client: AsyncHttpClient) -> StatusChec
     """
     Checks if the service is up and running.
 
+    A service whose circuit is open is reported offline without being called.
+
     Args:
         service (Service): Service.
         client (AsyncHttpClient): Async http client.
@@ -82,16 +86,18 @@ async def check_service(service: Service, client: AsyncHttpClient) -> StatusChec
     try:
         _, status_code = await gateway(client=client,
                                        method="GET",
-                                       service_url=service.base_url,
+                                       service=service,
                                        path=service.readiness_url)
-        return StatusChecked(name=service.name,
-                             status=ServiceStatus.ONLINE
-                             if status_code == HTTP_200_OK else ServiceStatus.OFFLINE)
+        service_status = ServiceStatus.ONLINE if status_code == HTTP_200_OK else ServiceStatus.OFFLINE
     except (asyncio.TimeoutError, aiohttp.ClientError, HTTPException):
-        return StatusChecked(name=service.name, status=ServiceStatus.OFFLINE)
+        service_status = ServiceStatus.OFFLINE
+
+    return StatusChecked(name=service.name,
+                         status=service_status,
+                         circuit=get_circuit_breaker(service).state if service.circuit_breaker.enabled else None)
 
 
-async def check_services(services: list[Service],
+async def check_services(services: Iterable[Service],
                          client: AsyncHttpClient,
                          redis: RedisConnector | None = None,
                          ) -> list[StatusChecked]:
@@ -99,7 +105,7 @@ async def check_services(services: list[Service],
     Checks if the services are up and running.
 
     Args:
-        services (list[Service]): List of services.
+        services (Iterable[Service]): The services.
         client (AsyncHttpClient): Async http client.
         redis (RedisConnector | None): Redis connector. Defaults to None.
 
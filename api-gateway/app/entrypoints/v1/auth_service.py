@@ -4,16 +4,18 @@ Entry points for the Auth service.
 import logging
 from typing import Annotated
 
-from fastapi import APIRouter, Path, Query, Request, Response
+from fastapi import APIRouter, Query, Request, Response
 from starlette.status import HTTP_200_OK, HTTP_201_CREATED
 
 from app.adapters.network import gateway
-from app.dependencies import AsyncHttpClientDependency, ServiceProvider
+from app.dependencies import AsyncHttpClientDependency, ResponseCacheDependency, ServiceProvider
 from app.domain.commands.auth_service import AuthenticateUser, RegisterUser
 from app.domain.events.auth_service import TokenGenerated, UserAuthenticated, UserRegistered
 from app.domain.schemas import ResponseModel, ResponseModels
 from app.middleware import AuthMiddleware
-from app.service_layer.gateway import api_v1_url, get_service, get_users, verify_status
+from app.service_layer.gateway import api_v1_url, get_service, parse_response, stream_users, verify_status
+from app.service_layer.response_cache import cached
+from app.utils.serializer import ModelResponse
 
 router = APIRouter()
 
@@ -24,69 +26,47 @@ UsersQuery = Annotated[
 @router.get("/users",
             status_code=HTTP_200_OK,
             summary="Find all users",
-            tags=["Queries"]
+            tags=["Queries"],
+            response_model=ResponseModels[UserRegistered],
             )
 async def query_users(
         services: ServiceProvider,
         client: AsyncHttpClientDependency,
-        user_names: UsersQuery = None, ) -> ResponseModels[UserRegistered]:
+        request: Request,
+        cache: ResponseCacheDependency,
+        user_names: UsersQuery = None, ) -> Response:
     """
     Retrieves users from the Database.
-    """
-
-    service = await get_service(service_name="auth", services=services)
-
-    response, code = await get_users(users=user_names, service=service, client=client)
-
-    verify_status(response=response, status_code=code)
-
-    logging.info(f"Retrieved {len(response.get('data', []))} users.")
-
-    return ResponseModels[UserRegistered](**response)
-
 
-@router.get("/users/{username}",
-            status_code=HTTP_200_OK,
-            summary="Find user by username",
-            tags=["Queries"]
-            )
-async def query_user_by_username(
-        username: Annotated[str, Path(description="The user's username.", example="johndoe")],
-        services: ServiceProvider,
-        client: AsyncHttpClientDependency, ) -> ResponseModel[UserRegistered]:
-    """
-    Retrieves a specific user from the Database.
+    The auth service response is streamed back as-is.
     """
 
     service = await get_service(service_name="auth", services=services)
 
-    response, code = await gateway(service_url=service.base_url, path=f"{api_v1_url}/users/{username}/",
-                                   client=client, method="GET")
+    logging.info("Relaying users query.")
 
-    verify_status(response=response, status_code=code)
-
-    logging.info(f"Retrieved User(username={username}).")
-
-    return ResponseModel[UserRegistered](**response)
+    return await cached(request=request, cache=cache,
+                        fetch=lambda: stream_users(users=user_names, service=service, client=client))
 
 
 @router.post(
     "/users",
     status_code=HTTP_201_CREATED,
     summary="Command to register a new user",
-    tags=["Commands"]
+    tags=["Commands"],
+    response_model=ResponseModel[UserRegistered],
 )
 async def register(command: RegisterUser,
                    services: ServiceProvider,
                    client: AsyncHttpClientDependency,
-                   request: Request,
-                   response: Response):
+                   request: Request) -> ModelResponse:
     """
     Register a new user.
     """
+    service = await get_service(service_name="auth", services=services)
 
     service_response, status_code = await gateway(
-        service_url=(await get_service(service_name="auth", services=services)).base_url,
+        service=service,
         path=f"{api_v1_url}/users/",
         client=client,
         method="POST",
@@ -95,28 +75,31 @@ async def register(command: RegisterUser,
 
     verify_status(response=service_response, status_code=status_code, status_codes=[HTTP_201_CREATED])
 
-    response_body = ResponseModel[UserRegistered](**service_response)
+    response_body = parse_response(ResponseModel[UserRegistered], service_response, service)
 
     logging.info(f"Registered User(id={response_body.data.id},username={response_body.data.username}).")
 
-    response.headers["Location"] = f"{request.base_url}api/v1/users/{response_body.data.username}"
-    return response_body
+    return ModelResponse(content=response_body,
+                         status_code=HTTP_201_CREATED,
+                         headers={"Location": f"{request.base_url}api/v1/users/{response_body.data.username}"})
 
 
 @router.post("/auth/token",
              status_code=HTTP_200_OK,
              summary="Command to authenticate a user",
              tags=["Commands"],
+             response_model=ResponseModel[TokenGenerated],
              )
 async def authenticate(command: AuthenticateUser,
                        services: ServiceProvider,
-                       client: AsyncHttpClientDependency) -> ResponseModel[TokenGenerated]:
+                       client: AsyncHttpClientDependency) -> ModelResponse:
     """
     Attempts to log in.
     """
+    service = await get_service(service_name="auth", services=services)
 
     auth_response, status_code = await gateway(
-        service_url=(await get_service(service_name="auth", services=services)).base_url,
+        service=service,
         path=f"{api_v1_url}/auth/token",
         client=client,
         method="POST",
@@ -127,7 +110,7 @@ async def authenticate(command: AuthenticateUser,
 
     logging.info(f"Authenticated User(username={command.username}).")
 
-    return ResponseModel[TokenGenerated](**auth_response)
+    return ModelResponse(content=parse_response(ResponseModel[TokenGenerated], auth_response, service))
 
 
 @router.get("/auth/me",
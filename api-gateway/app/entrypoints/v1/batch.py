@@ -0,0 +1,49 @@
+"""
+Entry points for batches of requests.
+"""
+from fastapi import APIRouter, HTTPException, Request
+from starlette.status import HTTP_200_OK, HTTP_422_UNPROCESSABLE_ENTITY
+
+from app.dependencies import AsyncHttpClientDependency, AuthenticatorDependency, OptionalBearerTokenAuth, \
+    ServiceProvider, TokenCacheDependency, gateway_settings
+from app.domain.commands.batch import RunBatch
+from app.domain.events.batch import SubRequestAnswered
+from app.domain.schemas import ResponseModels
+from app.middleware import authenticate
+from app.service_layer.batch import run_batch
+
+router = APIRouter()
+
+
+@router.post("/batch",
+             status_code=HTTP_200_OK,
+             summary="Command to run several requests at once",
+             tags=["Commands"],
+             )
+async def batch(command: RunBatch,
+                request: Request,
+                token: OptionalBearerTokenAuth,
+                services: ServiceProvider,
+                client: AsyncHttpClientDependency,
+                authenticator: AuthenticatorDependency,
+                token_cache: TokenCacheDependency) -> ResponseModels[SubRequestAnswered]:
+    """
+    Runs the given requests concurrently, and answers all of their responses at once, in order.
+
+    The batch bearer token is authenticated once, and shared by the requests which do not override it.
+    """
+    if len(command.requests) > gateway_settings.BATCH_MAX_REQUESTS:
+        raise HTTPException(status_code=HTTP_422_UNPROCESSABLE_ENTITY,
+                            detail=f"A batch is limited to {gateway_settings.BATCH_MAX_REQUESTS} requests.")
+
+    users = {token.credentials: await authenticate(token=token, services=services, client=client,
+                                                   authenticator=authenticator,
+                                                   token_cache=token_cache)} if token else {}
+
+    responses = await run_batch(app=request.app,
+                                scope=request.scope,
+                                sub_requests=command.requests,
+                                concurrency=gateway_settings.BATCH_CONCURRENCY,
+                                users=users)
+
+    return ResponseModels[SubRequestAnswered](data=responses)
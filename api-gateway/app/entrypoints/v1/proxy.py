@@ -0,0 +1,95 @@
+"""
+Entry points proxied as-is to the services, after the gateway route table.
+"""
+from typing import Awaitable, Callable
+from urllib.parse import quote
+
+from fastapi import APIRouter, Depends, Request, Response
+
+from app.adapters.network import gateway_stream
+from app.dependencies import AsyncHttpClientDependency, RedisDependency, ServiceProvider, response_cache
+from app.domain.models import Route
+from app.middleware import auth_middleware, remote_auth_middleware
+from app.service_layer.gateway import api_v1_url, get_service
+from app.service_layer.response_cache import cached
+
+# Client request headers forwarded to the services.
+PROXIED_HEADERS = frozenset({"authorization", "accept", "accept-language", "content-type", "x-forwarded-for"})
+
+
+def proxy(route: Route) -> Callable[..., Awaitable[Response]]:
+    """
+    Builds the handler of a proxied route.
+
+    Everything which does not depend on the request is resolved beforehand, so that proxying only costs a service
+    lookup and the upstream path formatting on top of the upstream call.
+
+    Args:
+        route (Route): the proxied route
+
+    Returns:
+        Callable[..., Awaitable[Response]]: the route handler.
+    """
+    service_name = route.service
+    upstream_path = route.upstream_path or f"{api_v1_url}{route.path}"
+    cache_ttl = route.cache_ttl
+    timeout = route.timeout
+
+    async def handler(request: Request,
+                      services: ServiceProvider,
+                      client: AsyncHttpClientDependency,
+                      redis: RedisDependency) -> Response:
+        service = await get_service(service_name=service_name, services=services)
+        # Path parameters are decoded by then: a "/" or a "?" in one must not reach another upstream path.
+        path = upstream_path.format(**{name: quote(str(value), safe="") for name, value in request.path_params.items()})
+
+        # Not `request.url.query`: the url is rebuilt from the decoded path, so it would read one from such a parameter.
+        if query := request.scope["query_string"].decode("latin-1"):
+            path = f"{path}?{query}"
+
+        headers = {name: value for name, value in request.headers.items() if name in PROXIED_HEADERS}
+        body = await request.body()
+
+        async def fetch() -> Response:
+            return await gateway_stream(client=client,
+                                        method=request.method,
+                                        service=service,
+                                        path=path,
+                                        request_body=body,
+                                        headers=headers,
+                                        content_type=headers.get("content-type", "application/json"),
+                                        timeout=timeout)
+
+        if request.method != "GET":
+            return await fetch()
+
+        # The credentials are forwarded, so the response may be the user's own: it must not be served to others.
+        return await cached(request=request, cache=response_cache(redis=redis, ttl=cache_ttl), fetch=fetch,
+                            private=True)
+
+    return handler
+
+
+def compile_routes(routes: list[Route]) -> APIRouter:
+    """
+    Compiles the gateway route table into a router.
+
+    Args:
+        routes (list[Route]): the proxied routes
+
+    Returns:
+        APIRouter: the router of the proxied routes.
+    """
+    router = APIRouter()
+
+    for route in routes:
+        authentication = remote_auth_middleware if route.verify_remotely else auth_middleware
+        router.add_api_route(route.path,
+                             endpoint=proxy(route),
+                             methods=[method.upper() for method in route.methods],
+                             summary=route.summary,
+                             tags=route.tags,
+                             dependencies=[Depends(authentication)] if route.auth else None,
+                             response_class=Response)
+
+    return router
@@ -5,25 +5,34 @@ import datetime
 import logging
 from typing import Annotated
 
-from fastapi import APIRouter, Path, Request, Response
+from fastapi import APIRouter, Path, Query, Request, Response
 from starlette.status import HTTP_200_OK, HTTP_201_CREATED
 
 from app.adapters.http_client import AsyncHttpClient
-from app.adapters.network import gateway
+from app.adapters.network import gateway, gateway_stream
 from app.adapters.telemetry.prometheus import EVENTS_SCHEDULED, OPTIONS_VOTED
-from app.dependencies import AsyncHttpClientDependency, ServiceProvider, app_settings
+from app.dependencies import AsyncHttpClientDependency, ResponseCacheDependency, ServiceProvider, app_settings
 from app.domain.commands.scheduler_service import ForwardScheduleMeeting, ForwardToggleVoting, ForwardVoteOption, \
     JoinMeeting, \
     ScheduleMeeting, ToggleVoting, \
     VoteOption
-from app.domain.events.scheduler_service import MeetingScheduled
+from app.domain.events.scheduler_service import MeetingExpanded, MeetingScheduled
 from app.domain.models import Service
 from app.domain.schemas import ResponseModel, ResponseModels
 from app.middleware import AuthMiddleware
-from app.service_layer.gateway import api_v1_url, get_service, verify_status
+from app.service_layer.gateway import api_v1_url, as_ndjson, expand_meetings, get_service, parse_expansions, \
+    parse_response, verify_status
+from app.service_layer.response_cache import cached
+from app.service_layer.service_registry import ServiceRegistry
+from app.utils.ndjson import NDJSON_MEDIA_TYPE
+from app.utils.serializer import ModelResponse
 
 router = APIRouter()
 
+ExpandQuery = Annotated[
+    str | None, Query(description="A list of comma-separated fields to embed the user records of: organizer, guests.",
+                      example="organizer,guests")]
+
 
 ########################################################################################################################
 # Queries
@@ -32,52 +41,80 @@ router = APIRouter()
 @router.get("/schedules",
             status_code=HTTP_200_OK,
             summary="Finds all schedules",
-            tags=["Queries"]
+            tags=["Queries"],
+            response_model=ResponseModels[MeetingExpanded],
             )
 async def query_schedules(
         services: ServiceProvider,
         client: AsyncHttpClientDependency,
-) -> ResponseModels[MeetingScheduled]:
+        request: Request,
+        cache: ResponseCacheDependency,
+        expand: ExpandQuery = None,
+) -> Response:
     """
     Retrieves schedules from the Database.
+
+    The scheduler service response is streamed back as-is, unless users are expanded. Clients accepting
+    `application/x-ndjson` get one schedule per line instead, each emitted as soon as it is decoded.
     """
 
     service = await get_service(service_name="scheduler", services=services)
 
-    response, code = await gateway(service_url=service.base_url, path=f"{api_v1_url}/schedules",
-                                   client=client, method="GET")
+    if expansions := parse_expansions(expand):
+        auth_service = await get_service(service_name="auth", services=services)
 
-    verify_status(response=response, status_code=code)
+        async def fetch_expanded() -> ResponseModels[MeetingExpanded]:
+            meetings = await fetch_schedules(service=service, client=client)
+            return ResponseModels[MeetingExpanded](data=await expand_meetings(
+                meetings=meetings.data, expansions=expansions, service=auth_service, client=client))
+
+        return await cached(request=request, cache=cache, fetch=fetch_expanded)
 
-    logging.info(f"Retrieved {len(response['data'])} events.")
+    async def stream() -> Response:
+        return await gateway_stream(service=service, path=f"{api_v1_url}/schedules", client=client, method="GET")
 
-    return ResponseModels[MeetingScheduled](**response)
+    if NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        logging.info("Streaming schedules query.")
+        return as_ndjson(await stream())
+
+    logging.info("Relaying schedules query.")
+
+    return await cached(request=request, cache=cache, fetch=stream)
 
 
 @router.get("/schedules/{schedule_id}",
             status_code=HTTP_200_OK,
             summary="Finds schedule by id",
-            tags=["Queries"]
+            tags=["Queries"],
+            response_model=ResponseModel[MeetingExpanded],
             )
 async def query_schedule_by_id(
         schedule_id: Annotated[str, Path(description="The schedule's id.", example="b455f6t63t7")],
         services: ServiceProvider,
         client: AsyncHttpClientDependency,
-) -> ResponseModel[MeetingScheduled]:
+        request: Request,
+        cache: ResponseCacheDependency,
+        expand: ExpandQuery = None,
+) -> Response:
     """
     Retrieves a specific schedule from the Database.
     """
 
     service = await get_service(service_name="scheduler", services=services)
 
-    response, code = await gateway(service_url=service.base_url, path=f"{api_v1_url}/schedules/{schedule_id}",
-                                   client=client, method="GET")
+    if expansions := parse_expansions(expand):
+        auth_service = await get_service(service_name="auth", services=services)
 
-    verify_status(response=response, status_code=code)
+        async def fetch_expanded() -> ResponseModel[MeetingExpanded]:
+            meeting = await fetch_schedule(schedule_id=schedule_id, service=service, client=client)
+            [expanded] = await expand_meetings(meetings=[meeting.data], expansions=expansions, service=auth_service,
+                                               client=client)
+            return ResponseModel[MeetingExpanded](data=expanded)
 
-    logging.info(f"Retrieved event: {response['data']['id']}")
+        return await cached(request=request, cache=cache, fetch=fetch_expanded)
 
-    return ResponseModel[MeetingScheduled](**response)
+    return await cached(request=request, cache=cache,
+                        fetch=lambda: fetch_schedule(schedule_id=schedule_id, service=service, client=client))
 
 
 ########################################################################################################################
@@ -88,6 +125,7 @@ async def query_schedule_by_id(
              status_code=HTTP_201_CREATED,
              summary="Creates a schedule",
              tags=["Commands"],
+             response_model=ResponseModel[MeetingScheduled],
              )
 async def schedule(
         command: ScheduleMeeting,
@@ -95,16 +133,16 @@ async def schedule(
         services: ServiceProvider,
         client: AsyncHttpClientDependency,
         request: Request,
-        response: Response,
-) -> ResponseModel[MeetingScheduled]:
+) -> ModelResponse:
     """
     Schedules a meeting.
     """
 
     forwarded_command = ForwardScheduleMeeting(organizer=user.username, guests=set(), **command.dict())
+    service = await get_service(service_name="scheduler", services=services)
 
     service_response, status_code = await gateway(
-        service_url=(await get_service(service_name="scheduler", services=services)).base_url,
+        service=service,
         path=f"{api_v1_url}/schedules",
         client=client,
         method="POST",
@@ -115,19 +153,21 @@ async def schedule(
 
     EVENTS_SCHEDULED.labels(app_name=app_settings.get_app_name()).inc()
 
-    response_body = ResponseModel[MeetingScheduled](**service_response)
+    response_body = parse_response(ResponseModel[MeetingScheduled], service_response, service)
 
     logging.info(f"Event scheduled: {response_body.data.id}")
 
-    response.headers["Location"] = f"{request.base_url}api/v1/scheduler-service/schedules/{response_body.data.id}"
-
-    return response_body
+    return ModelResponse(
+        content=response_body,
+        status_code=HTTP_201_CREATED,
+        headers={"Location": f"{request.base_url}api/v1/scheduler-service/schedules/{response_body.data.id}"})
 
 
 @router.patch("/schedules/{schedule_id}/voting",
               status_code=HTTP_200_OK,
               summary="Toggles voting on a schedule",
               tags=["Commands"],
+              response_model=ResponseModel[MeetingScheduled],
               )
 async def toggle_voting(
         schedule_id: Annotated[str, Path(description="The schedule's id.", example="b455f6t63t7")],
@@ -135,14 +175,15 @@ async def toggle_voting(
         user: AuthMiddleware,
         services: ServiceProvider,
         client: AsyncHttpClientDependency,
-) -> ResponseModel[MeetingScheduled]:
+) -> ModelResponse:
     """
     Toggles voting on a schedule.
     """
     forwarded_command = ForwardToggleVoting(username=user.username, **command.dict())
+    service = await get_service(service_name="scheduler", services=services)
 
     service_response, status_code = await gateway(
-        service_url=(await get_service(service_name="scheduler", services=services)).base_url,
+        service=service,
         path=f"{api_v1_url}/schedules/{schedule_id}/voting",
         client=client,
         method="PATCH",
@@ -153,20 +194,21 @@ async def toggle_voting(
 
     logging.info(f"Voting toggled on event: {schedule_id}")
 
-    return ResponseModel[MeetingScheduled](**service_response)
+    return ModelResponse(content=parse_response(ResponseModel[MeetingScheduled], service_response, service))
 
 
 @router.patch("/schedules/{schedule_id}/relationships/guests",
               status_code=HTTP_200_OK,
               summary="Adds a guest to a schedule",
               tags=["Commands"],
+              response_model=ResponseModel[MeetingScheduled],
               )
 async def join_meeting(
         schedule_id: Annotated[str, Path(description="The schedule's id.", example="b455f6t63t7")],
         user: AuthMiddleware,
         services: ServiceProvider,
         client: AsyncHttpClientDependency,
-) -> ResponseModel[MeetingScheduled]:
+) -> ModelResponse:
     """
     Allows a valid user to join a meeting.
     """
@@ -181,13 +223,14 @@ async def join_meeting(
 
     logging.info(f"User(username={user.username}) joined Event(id={schedule_id}).")
 
-    return response
+    return ModelResponse(content=response)
 
 
 @router.patch("/schedules/{schedule_id}/options",
               status_code=HTTP_200_OK,
               summary="Votes for an option",
               tags=["Commands"],
+              response_model=ResponseModel[MeetingScheduled],
               )
 async def vote_for_option(
         schedule_id: Annotated[str, Path(description="The schedule's id.", example="b455f6t63t7")],
@@ -195,7 +238,7 @@ async def vote_for_option(
         command: VoteOption,
         services: ServiceProvider,
         client: AsyncHttpClientDependency,
-) -> ResponseModel[MeetingScheduled]:
+) -> ModelResponse:
     forwarded_command = ForwardVoteOption(username=user.username, **command.dict())
 
     response = await command_with_user_validation(
@@ -216,25 +259,56 @@ async def vote_for_option(
                          vote=datetime.datetime.combine(command.option.date, time)
                          ).observe(1)
 
-    return response
+    return ModelResponse(content=response)
 
 
 ########################################################################################################################
 # Helper functions
 ########################################################################################################################
 
+async def fetch_schedules(service: Service, client: AsyncHttpClient) -> ResponseModels[MeetingScheduled]:
+    """
+    Retrieves all schedules from the scheduler service.
+    """
+    response, code = await gateway(service=service, path=f"{api_v1_url}/schedules", client=client, method="GET")
+
+    verify_status(response=response, status_code=code)
+
+    return parse_response(ResponseModels[MeetingScheduled], response, service)
+
+
+async def fetch_schedule(
+        schedule_id: str,
+        service: Service,
+        client: AsyncHttpClient,
+) -> ResponseModel[MeetingScheduled]:
+    """
+    Retrieves a specific schedule from the scheduler service.
+    """
+    response, code = await gateway(service=service, path=f"{api_v1_url}/schedules/{schedule_id}",
+                                   client=client, method="GET")
+
+    verify_status(response=response, status_code=code)
+
+    logging.info(f"Retrieved event: {response['data']['id']}")
+
+    return parse_response(ResponseModel[MeetingScheduled], response, service)
+
+
 async def command_with_user_validation(
         path: str,
         command: JoinMeeting | ForwardVoteOption,
-        services: list[Service],
+        services: ServiceRegistry,
         client: AsyncHttpClient,
         method: str = "PATCH",
 ) -> ResponseModel[MeetingScheduled]:
     """
     Sends the command to the scheduler service.
     """
+    service = await get_service(service_name="scheduler", services=services)
+
     service_response, status_code = await gateway(
-        service_url=(await get_service(service_name="scheduler", services=services)).base_url,
+        service=service,
         client=client,
         path=f"{api_v1_url}/schedules/{path}",
         method=method,
@@ -243,4 +317,4 @@ async def command_with_user_validation(
 
     verify_status(response=service_response, status_code=status_code, status_codes=[HTTP_200_OK])
 
-    return ResponseModel[MeetingScheduled](**service_response)
+    return parse_response(ResponseModel[MeetingScheduled], service_response, service)
@@ -1,55 +1,282 @@
 """
 FastAPI middlewares
 """
+import logging
 from typing import Annotated
 
 from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
 from opentelemetry import trace
 from starlette.middleware.base import (BaseHTTPMiddleware,
                                        RequestResponseEndpoint)
+from starlette.datastructures import MutableHeaders
 from starlette.requests import Request
 from starlette.responses import Response
 from starlette.routing import Match
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import time
 
+from app.adapters.http_client import AsyncHttpClient
 from app.adapters.network import gateway
 from app.adapters.telemetry.prometheus import EXCEPTIONS, INFO, REQUESTS, REQUESTS_IN_PROGRESS, \
     REQUESTS_PROCESSING_TIME, RESPONSES
-from app.dependencies import AsyncHttpClientDependency, BearerTokenAuth, RateLimiterDependency, ServiceProvider
+from app.dependencies import AsyncHttpClientDependency, AuthenticatorDependency, BearerTokenAuth, \
+    OptionalBearerTokenAuth, QuotaRateLimiterDependency, RateLimiterDependency, ServiceProvider, TokenCacheDependency, \
+    app_settings
 from app.domain.events.auth_service import UserAuthenticated
+from app.service_layer.authenticator import LocalAuthenticator
 from app.service_layer.gateway import api_v1_url, get_service, verify_status
+from app.service_layer.rate_limiter import LocalRateLimiter, QuotaRateLimiter, RateLimit
+from app.service_layer.service_registry import ServiceRegistry
+from app.service_layer.token_cache import TokenCache, introspect
 
+log = logging.getLogger(__name__)
 
-async def rate_limiter_middleware(request: Request, rate_limiter: RateLimiterDependency):
+# Counts the failed authentications of each client host, while identifying the users of the quotas.
+failed_authentications = LocalRateLimiter()
+
+
+def too_many_requests(request: Request, rate_limit: RateLimit) -> HTTPException:
+    """
+    Keeps the rate limit a request surpassed in its state, and builds the error rejecting it.
+
+    Args:
+        request: the client request
+        rate_limit: the surpassed rate limit
+
+    Returns:
+        HTTPException: the too many requests error, telling when to retry
+    """
+    request.state.rate_limit = rate_limit
+
+    return HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                         detail=f"Surpassed rate limit.",
+                         headers=rate_limit.headers())
+
+
+async def rate_limited_user(request: Request,
+                            route: str,
+                            issuer: str,
+                            quota_limiter: QuotaRateLimiter,
+                            token: HTTPAuthorizationCredentials | None,
+                            services: ServiceRegistry,
+                            client: AsyncHttpClient,
+                            authenticator: LocalAuthenticator | None,
+                            token_cache: TokenCache | None) -> UserAuthenticated | None:
+    """
+    Identifies the user a request counts against the quotas of, on the routes which a quota of a user or a role
+    matches only.
+
+    The user is kept in the request state, for the authentication middleware not to authenticate it again. Requests
+    without a valid token are counted as anonymous, the authentication middleware rejecting them where it is required.
+    The failed authentications of a client host are limited by the default quota though, counted in process: past it,
+    the host is rejected without its tokens reaching the auth service, until the window resets.
+
+    Args:
+        request: the client request
+        route: the path template of the requested route
+        issuer: the client host
+        quota_limiter: the rate limiter of the quota policy table
+        token: Authorization credentials, if any
+        services: available service
+        client: HTTP client
+        authenticator: verifies tokens locally, None to have the auth service verify them
+        token_cache: caches the auth service answers, None not to cache them
+
+    Returns:
+        UserAuthenticated | None: User information, None if anonymous
+
+    Raises:
+        HTTPException: if the client host surpassed its failed authentications
+    """
+    if token is None or not quota_limiter.identifies(route=route, method=request.method):
+        return None
+
+    users = getattr(request.state, "users", {})
+
+    if user := users.get(token.credentials):
+        return user
+
+    failures = f"auth-{{host:{issuer}}}"
+
+    if not (rate_limit := failed_authentications.hit(failures, cost=1, quotas=[quota_limiter.default],
+                                                     dry_run=True)).allowed:
+        raise too_many_requests(request, rate_limit)
+
+    try:
+        user = await authenticate(token=token, services=services, client=client, authenticator=authenticator,
+                                  token_cache=token_cache)
+    except HTTPException as error:
+        failed_authentications.hit(failures, cost=1, quotas=[quota_limiter.default])
+        log.info("Request of %s counted as anonymous, its token failed to authenticate: %s", issuer, error.detail)
+        return None
+
+    request.state.users = {**users, token.credentials: user}
+
+    return user
+
+
+async def rate_limiter_middleware(request: Request,
+                                  rate_limiter: RateLimiterDependency,
+                                  quota_limiter: QuotaRateLimiterDependency,
+                                  token: OptionalBearerTokenAuth,
+                                  services: ServiceProvider,
+                                  client: AsyncHttpClientDependency,
+                                  authenticator: AuthenticatorDependency,
+                                  token_cache: TokenCacheDependency):
     """
     Rate limiter middleware.
 
-    Limits the number of requests per user per interval.
+    Limits the number of requests per client per interval, each request counting as the cost of its route. Once quotas
+    are set, requests count against the quotas they match, per user once authenticated, per client host otherwise. The
+    rate limit is kept in the request state, for the `RateLimitHeadersMiddleware` to tell it to the client.
     """
 
     if not rate_limiter:
         return
 
     issuer = request.headers.get("X-Forwarded-For") or request.client.host
+    route = getattr(request.scope.get("route"), "path", request.url.path)
+    cost = app_settings.LIMITER_COSTS.get(f"{request.method} {route}", 1)
+
+    if quota_limiter:
+        user = await rate_limited_user(request, route=route, issuer=issuer, quota_limiter=quota_limiter, token=token,
+                                       services=services, client=client, authenticator=authenticator,
+                                       token_cache=token_cache)
+        # The braces make the counters of a client a redis hash tag, for the quota script to update them on a cluster.
+        subject = f"user:{user.username}" if user else f"host:{issuer}"
+        rate_limit = await quota_limiter.hit(f"rate-{{{subject}}}",
+                                             cost=cost,
+                                             quotas=quota_limiter.match(route=route, method=request.method, user=user))
+    else:
+        rate_limit = await rate_limiter.hit(f"rate-{issuer}", cost=cost)
+
+    request.state.rate_limit = rate_limit
+
+    if not rate_limit.allowed:
+        raise too_many_requests(request, rate_limit)
+
+
+class RateLimitHeadersMiddleware:
+    """
+    Adds the `X-RateLimit-*` headers to the responses of rate limited requests.
+
+    Handlers return their responses directly, which drops the headers dependencies set on the injected response, so
+    the headers are added as the response starts instead.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state = scope.setdefault("state", {})
 
-    key = f"rate-{issuer}"
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start" and (rate_limit := state.get("rate_limit")):
+                headers = MutableHeaders(scope=message)
 
-    requests = await rate_limiter.increment(key)
+                for name, value in rate_limit.headers().items():
+                    headers[name] = value
 
-    if requests == 1:
-        await rate_limiter.timer(key)
+            await send(message)
 
-    if not await rate_limiter.is_allowed(requests):
-        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=f"Surpassed rate limit.")
+        await self.app(scope, receive, send_with_headers)
 
 
-async def auth_middleware(token: BearerTokenAuth,
+async def auth_middleware(request: Request,
+                          token: BearerTokenAuth,
                           services: ServiceProvider,
-                          client: AsyncHttpClientDependency) -> UserAuthenticated:
+                          client: AsyncHttpClientDependency,
+                          authenticator: AuthenticatorDependency,
+                          token_cache: TokenCacheDependency) -> UserAuthenticated:
     """
     Authentication middleware.
 
+    Requests of a batch reuse the users the batch already authenticated.
+
+    Args:
+        request: the client request
+        token: Authorization credentials
+        services: available service
+        client: HTTP client
+        authenticator: verifies tokens locally, None to have the auth service verify them
+        token_cache: caches the auth service answers, None not to cache them
+
+    Returns:
+        UserAuthenticated: User information
+
+    Raises:
+        HTTPException: if the token is invalid
+    """
+    if user := getattr(request.state, "users", {}).get(token.credentials):
+        return user
+
+    return await authenticate(token=token, services=services, client=client, authenticator=authenticator,
+                              token_cache=token_cache)
+
+
+async def remote_auth_middleware(token: BearerTokenAuth,
+                                 services: ServiceProvider,
+                                 client: AsyncHttpClientDependency) -> UserAuthenticated:
+    """
+    Authentication middleware of sensitive routes, which always asks the auth service.
+
+    Unlike a local verification or a cached answer, it rejects the tokens of users deactivated since their token was
+    issued.
+
+    Args:
+        token: Authorization credentials
+        services: available service
+        client: HTTP client
+
+    Returns:
+        UserAuthenticated: User information
+
+    Raises:
+        HTTPException: if the token is invalid
+    """
+    return await authenticate_remotely(token=token, services=services, client=client)
+
+
+async def authenticate(token: HTTPAuthorizationCredentials,
+                       services: ServiceRegistry,
+                       client: AsyncHttpClient,
+                       authenticator: LocalAuthenticator | None = None,
+                       token_cache: TokenCache | None = None) -> UserAuthenticated:
+    """
+    Authenticates a token, locally when the gateway can verify it, against the auth service otherwise.
+
+    Args:
+        token: Authorization credentials
+        services: available service
+        client: HTTP client
+        authenticator: verifies tokens locally, None to have the auth service verify them
+        token_cache: caches the auth service answers, None not to cache them
+
+    Returns:
+        UserAuthenticated: User information
+
+    Raises:
+        HTTPException: if the token is invalid
+    """
+    if authenticator is not None:
+        return await authenticator.authenticate(token=token.credentials, client=client)
+
+    return await introspect(token=token.credentials,
+                            cache=token_cache,
+                            fetch=lambda: authenticate_remotely(token=token, services=services, client=client))
+
+
+async def authenticate_remotely(token: HTTPAuthorizationCredentials,
+                                services: ServiceRegistry,
+                                client: AsyncHttpClient) -> UserAuthenticated:
+    """
+    Authenticates a token against the auth service.
+
     Args:
         token: Authorization credentials
         services: available service
@@ -62,7 +289,7 @@ async def auth_middleware(token: BearerTokenAuth,
         HTTPException: if the token is invalid
     """
     auth_response, status_code = await gateway(
-        service_url=(await get_service(service_name="auth", services=services)).base_url,
+        service=await get_service(service_name="auth", services=services),
         path=f"{api_v1_url}/auth/me",
         client=client,
         method="GET",
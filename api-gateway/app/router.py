@@ -7,7 +7,8 @@ Resources:
 from fastapi import APIRouter
 
 from app.entrypoints import actuator
-from app.entrypoints.v1 import auth_service, scheduler_service
+from app.entrypoints.v1 import auth_service, batch, proxy, scheduler_service
+from app.settings.gateway_settings import GatewaySettings
 
 root_router = APIRouter()
 api_router_v1 = APIRouter(prefix="/api/v1")
@@ -18,3 +19,5 @@ root_router.include_router(actuator.router)
 # API Routers
 api_router_v1.include_router(auth_service.router)
 api_router_v1.include_router(scheduler_service.router)
+api_router_v1.include_router(batch.router)
+api_router_v1.include_router(proxy.compile_routes(GatewaySettings().ROUTES))
@@ -0,0 +1,125 @@
+"""
+Local authentication service layer
+"""
+import asyncio
+import logging
+import time
+from typing import Callable
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from starlette.status import HTTP_200_OK
+
+from app.adapters.http_client import AsyncHttpClient
+from app.adapters.network import gateway
+from app.adapters.token_verifier import InvalidTokenError, TokenVerifier, UnknownKeyError
+from app.domain.events.auth_service import UserAuthenticated
+from app.settings.auth_settings import AuthSettings
+
+log = logging.getLogger(__name__)
+
+
+class LocalAuthenticator:
+    """
+    Authenticates users from their token claims, without a round trip to the auth service.
+
+    Attributes:
+        verifier (TokenVerifier): verifies the tokens.
+        jwks_url (str | None): url of the key set, if tokens are signed by its keys.
+        refresh_interval (float): seconds after which a token signed by an unknown key reloads the key set.
+        clock (Callable[[], float]): returns the current monotonic time.
+    """
+
+    def __init__(self,
+                 verifier: TokenVerifier,
+                 jwks_url: str | None = None,
+                 refresh_interval: float = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.verifier = verifier
+        self.jwks_url = jwks_url
+        self.refresh_interval = refresh_interval
+        self.clock = clock
+        self.refreshed_at: float | None = None
+        self.lock = asyncio.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: AuthSettings) -> "LocalAuthenticator":
+        """
+        Builds the authenticator after the authentication settings.
+
+        Args:
+            settings (AuthSettings): the authentication settings
+
+        Returns:
+            LocalAuthenticator: the authenticator.
+        """
+        verifier = TokenVerifier(secret=settings.JWT_SECRET, algorithms=settings.JWT_ALGORITHMS,
+                                 leeway=settings.JWT_LEEWAY)
+
+        return cls(verifier=verifier, jwks_url=settings.JWKS_URL, refresh_interval=settings.JWKS_REFRESH_INTERVAL)
+
+    async def authenticate(self, token: str, client: AsyncHttpClient) -> UserAuthenticated:
+        """
+        Authenticates the user of a token.
+
+        The key set is loaded on first use, and reloaded when a token is signed by a key it misses, at most once per
+        refresh interval, so that the auth service can rotate its keys.
+
+        Args:
+            token (str): the bearer token
+            client (AsyncHttpClient): the HTTP client fetching the key set
+
+        Returns:
+            UserAuthenticated: the user, after the token claims.
+
+        Raises:
+            InvalidTokenError: if the token is invalid.
+        """
+        if self.jwks_url and self.refreshed_at is None:
+            await self.refresh(client=client)
+
+        try:
+            claims = self.verifier.verify(token)
+        except UnknownKeyError:
+            if not await self.refresh(client=client):
+                raise
+            claims = self.verifier.verify(token)
+
+        try:
+            return UserAuthenticated(**claims)
+        except ValidationError:
+            raise InvalidTokenError("missing user claims") from None
+
+    async def refresh(self, client: AsyncHttpClient) -> bool:
+        """
+        Reloads the key set, unless it was loaded within the refresh interval.
+
+        Args:
+            client (AsyncHttpClient): the HTTP client fetching the key set
+
+        Returns:
+            bool: whether the key set was reloaded.
+        """
+        async with self.lock:
+            now = self.clock()
+
+            if not self.jwks_url or (self.refreshed_at is not None and
+                                     now - self.refreshed_at < self.refresh_interval):
+                return False
+
+            self.refreshed_at = now
+
+            try:
+                key_set, status_code = await gateway(service_url=self.jwks_url, path="", client=client, method="GET")
+            except HTTPException as e:
+                log.error("Key set could not be loaded from %s: %s.", self.jwks_url, e.detail)
+                return False
+
+            if status_code != HTTP_200_OK or not isinstance(key_set, dict):
+                log.error("Key set could not be loaded from %s: %s.", self.jwks_url, status_code)
+                return False
+
+            self.verifier.load_keys(key_set)
+            log.info("Loaded %s keys from %s.", len(self.verifier.keys), self.jwks_url)
+
+            return True
@@ -0,0 +1,162 @@
+"""
+Batch service layer
+"""
+import asyncio
+import logging
+from typing import Any
+
+from starlette.status import HTTP_500_INTERNAL_SERVER_ERROR
+from starlette.types import ASGIApp, Message, Scope
+
+from app.domain.commands.batch import SubRequest
+from app.domain.events.auth_service import UserAuthenticated
+from app.domain.events.batch import SubRequestAnswered
+from app.utils.serializer import dumpb, loads
+
+log = logging.getLogger(__name__)
+
+JSON_MEDIA_TYPE = "application/json"
+
+# Headers of the batch request which its sub-requests inherit, unless they override them.
+INHERITED_HEADERS = frozenset({"authorization", "x-forwarded-for", "user-agent", "accept-language"})
+
+
+def sub_scope(scope: Scope, sub_request: SubRequest, body: bytes, users: dict[str, UserAuthenticated]) -> Scope:
+    """
+    Builds the ASGI scope of a sub-request, after the one of its batch.
+
+    Args:
+        scope (Scope): the batch request scope
+        sub_request (SubRequest): the sub-request
+        body (bytes): the encoded sub-request body
+        users (dict[str, UserAuthenticated]): the users the batch authenticated, by token
+
+    Returns:
+        Scope: the sub-request scope.
+    """
+    path, _, query = sub_request.path.partition("?")
+
+    headers = {name.decode("latin-1"): value.decode("latin-1") for name, value in scope["headers"]
+               if name.decode("latin-1") in INHERITED_HEADERS}
+    headers.update({name.lower(): value for name, value in sub_request.headers.items()})
+
+    if body:
+        headers.setdefault("content-type", JSON_MEDIA_TYPE)
+        headers["content-length"] = str(len(body))
+
+    return {
+        "type": "http",
+        "asgi": scope.get("asgi", {"version": "3.0"}),
+        "http_version": scope.get("http_version", "1.1"),
+        "method": sub_request.method,
+        "scheme": scope.get("scheme", "http"),
+        "server": scope.get("server"),
+        "client": scope.get("client"),
+        "root_path": scope.get("root_path", ""),
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "headers": [(name.encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()],
+        "state": {"users": users},
+    }
+
+
+def parse_body(body: bytes, headers: dict[str, str]) -> Any:
+    """
+    Parses a sub-response body.
+
+    Args:
+        body (bytes): the sub-response body
+        headers (dict[str, str]): the sub-response headers
+
+    Returns:
+        Any: the decoded JSON body, or text otherwise.
+    """
+    if not body:
+        return None
+
+    if headers.get("content-type", "").startswith(JSON_MEDIA_TYPE):
+        return loads(body)
+
+    return body.decode(errors="replace")
+
+
+async def dispatch(app: ASGIApp,
+                   scope: Scope,
+                   sub_request: SubRequest,
+                   users: dict[str, UserAuthenticated]) -> SubRequestAnswered:
+    """
+    Runs a sub-request through the application, in process.
+
+    Args:
+        app (ASGIApp): the application
+        scope (Scope): the batch request scope
+        sub_request (SubRequest): the sub-request
+        users (dict[str, UserAuthenticated]): the users the batch authenticated, by token
+
+    Returns:
+        SubRequestAnswered: the sub-response.
+    """
+    body = dumpb(sub_request.body) if sub_request.body is not None else b""
+    status = HTTP_500_INTERNAL_SERVER_ERROR
+    headers: dict[str, str] = dict()
+    chunks: list[bytes] = list()
+    sent = False
+
+    async def receive() -> Message:
+        nonlocal sent
+
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        # the sub-request never disconnects, responses stop listening once sent
+        await asyncio.Event().wait()
+
+    async def send(message: Message) -> None:
+        nonlocal status, headers
+
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            headers = {name.decode("latin-1"): value.decode("latin-1") for name, value in message.get("headers", [])}
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await app(sub_scope(scope=scope, sub_request=sub_request, body=body, users=users), receive, send)
+        response_body = parse_body(b"".join(chunks), headers)
+    except Exception as e:
+        log.exception("Sub-request %s %s failed: %s", sub_request.method, sub_request.path, e)
+        return SubRequestAnswered(id=sub_request.id, status=HTTP_500_INTERNAL_SERVER_ERROR)
+
+    headers.pop("content-length", None)
+
+    return SubRequestAnswered(id=sub_request.id, status=status, headers=headers, body=response_body)
+
+
+async def run_batch(app: ASGIApp,
+                    scope: Scope,
+                    sub_requests: list[SubRequest],
+                    concurrency: int,
+                    users: dict[str, UserAuthenticated] | None = None,
+                    ) -> list[SubRequestAnswered]:
+    """
+    Runs the sub-requests of a batch concurrently, a bounded number at a time.
+
+    Args:
+        app (ASGIApp): the application
+        scope (Scope): the batch request scope
+        sub_requests (list[SubRequest]): the sub-requests
+        concurrency (int): the number of sub-requests run at once
+        users (dict[str, UserAuthenticated] | None): the users the batch authenticated, by token
+
+    Returns:
+        list[SubRequestAnswered]: the sub-responses, in the order of the sub-requests.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(sub_request: SubRequest) -> SubRequestAnswered:
+        async with semaphore:
+            return await dispatch(app=app, scope=scope, sub_request=sub_request, users=users or dict())
+
+    return list(await asyncio.gather(*[bounded(sub_request) for sub_request in sub_requests]))
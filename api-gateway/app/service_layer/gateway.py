@@ -2,19 +2,31 @@
 Gateway Service functions.
 """
 import logging
-from typing import Any
+import random
+from typing import Any, AsyncIterator, TypeVar
 
 from fastapi import HTTPException
-from starlette.status import HTTP_200_OK, HTTP_503_SERVICE_UNAVAILABLE
+from pydantic import ValidationError
+from starlette.responses import StreamingResponse
+from starlette.status import HTTP_200_OK, HTTP_422_UNPROCESSABLE_ENTITY, HTTP_503_SERVICE_UNAVAILABLE
 
 from app.adapters.http_client import AsyncHttpClient
-from app.adapters.network import gateway
+from app.adapters.network import gateway, gateway_stream
+from app.adapters.telemetry.prometheus import CONTRACT_VIOLATIONS
 from app.domain.events.auth_service import UserRegistered
-from app.domain.models import Service
-from app.domain.schemas import ResponseModel
+from app.domain.events.scheduler_service import MeetingExpanded, MeetingScheduled
+from app.domain.models import Expansion, Service
+from app.domain.schemas import CamelCaseModel, ResponseModel, ResponseModels
+from app.service_layer.service_registry import ServiceRegistry
+from app.settings.app_settings import ApplicationSettings
+from app.utils.ndjson import NDJSON_MEDIA_TYPE, InvalidStreamError, iter_items, ndjson
 
 api_v1_url = "/api/v1"
 
+app_name = ApplicationSettings().get_app_name()
+
+M = TypeVar("M", bound=CamelCaseModel)
+
 
 def verify_status(response: dict[str, Any],
                   status_code: int,
@@ -42,13 +54,47 @@ def verify_status(response: dict[str, Any],
         raise HTTPException(status_code=status_code, detail=response.get("detail", default_err_msg))
 
 
-async def get_service(service_name: str, services: list[Service]) -> Service:
+def parse_response(model: type[M], response: dict[str, Any], service: Service) -> M:
+    """
+    Builds the model of a service response.
+
+    The responses of a trusted service are built without validation, but for a sample of them, which are validated
+    to detect the service drifting from its contract. A sampled response which does not match its model is counted and
+    logged, and built without validation still, as trusted responses are.
+
+    Args:
+        model (type[M]): The response model.
+        response (dict[str, Any]): The service response.
+        service (Service): The service.
+
+    Returns:
+        M: The response model.
+
+    Raises:
+        ValidationError: If the service is not trusted, and the response does not match its model.
+    """
+    contract = service.contract
+
+    if not contract.trusted:
+        return model(**response)
+
+    if random.random() < contract.sample_rate:
+        try:
+            return model(**response)
+        except ValidationError as e:
+            CONTRACT_VIOLATIONS.labels(service=service.name, app_name=app_name).inc()
+            logging.error("%s service response does not match %s: %s", service.name, model.__name__, e)
+
+    return model.construct_trusted(**response)
+
+
+async def get_service(service_name: str, services: ServiceRegistry) -> Service:
     """
     Get user service.
 
     Args:
         service_name (str): The name of the service.
-        services (list[Service]): The list of services.
+        services (ServiceRegistry): The registered services.
 
     Returns:
         Service: The service.
@@ -56,15 +102,62 @@ async def get_service(service_name: str, services: list[Service]) -> Service:
     Raises:
         HTTPException: If the service is not found.
     """
-    [service] = [service for service in services if service.name.lower() == service_name.lower()]
+    service = services.get(service_name)
 
-    if not service:
+    if service is None:
         logging.error("%s service unavailable.", service_name)
         raise HTTPException(status_code=HTTP_503_SERVICE_UNAVAILABLE, detail=f"{service_name} service unavailable.")
 
     return service
 
 
+def users_query_params(users: str | None) -> dict[str, str] | None:
+    """
+    Translates a users filter into the auth service query params.
+
+    Args:
+        users (str | None): The comma-separated usernames for filtering.
+
+    Returns:
+        dict[str, str] | None: The query params, if any.
+    """
+    return {"usernames": users.strip()} if users else None
+
+
+def as_ndjson(response: StreamingResponse) -> StreamingResponse:
+    """
+    Re-encodes a streamed collection response as newline-delimited JSON, one item per line.
+
+    The items are emitted as they are decoded from the service response, which is never held whole, and which is
+    re-encoded in place, so that it still releases what it holds once sent. Error responses are relayed as-is. A service response turning out invalid is logged, and cuts the stream short, for the client to
+    tell it from a complete one.
+
+    Args:
+        response (StreamingResponse): The service response, wrapping the items in its data member.
+
+    Returns:
+        StreamingResponse: The service response, as newline-delimited JSON.
+    """
+    if response.status_code != HTTP_200_OK:
+        return response
+
+    body = response.body_iterator
+
+    async def lines() -> AsyncIterator[bytes]:
+        try:
+            async for line in ndjson(iter_items(body)):
+                yield line
+        except InvalidStreamError as e:
+            logging.error("Service response could not be relayed as NDJSON: %s", e)
+            raise
+
+    response.body_iterator = lines()
+    del response.headers["content-length"]
+    response.headers["content-type"] = NDJSON_MEDIA_TYPE
+
+    return response
+
+
 async def get_users(users: str, service: Service, client: AsyncHttpClient) -> tuple[dict[str, Any], int]:
     """
     Get users.
@@ -77,10 +170,100 @@ async def get_users(users: str, service: Service, client: AsyncHttpClient) -> tu
     Returns:
         tuple[dict[str, Any], int]: The response and the status code.
     """
-    params = {"usernames": users.strip()} if users else None
+    return await gateway(service=service, path=f"{api_v1_url}/users",
+                         query_params=users_query_params(users), client=client, method="GET")
+
+
+async def stream_users(users: str | None, service: Service, client: AsyncHttpClient) -> StreamingResponse:
+    """
+    Get users, relaying the auth service response as-is.
+
+    Args:
+        users (str | None): The usernames for filtering.
+        service (Service): The service.
+        client (AsyncHttpClient): The Async HTTP Client.
+
+    Returns:
+        StreamingResponse: The auth service response.
+    """
+    return await gateway_stream(service=service, path=f"{api_v1_url}/users",
+                                query_params=users_query_params(users), client=client, method="GET")
+
+
+def parse_expansions(expand: str | None) -> set[Expansion]:
+    """
+    Parses the fields to expand in a query response.
+
+    Args:
+        expand (str | None): The comma-separated fields to expand.
+
+    Returns:
+        set[Expansion]: The fields to expand.
+
+    Raises:
+        HTTPException: If a field cannot be expanded.
+    """
+    if not expand:
+        return set()
+
+    fields = {field.strip().lower() for field in expand.split(",") if field.strip()}
+
+    if unknown := fields - {expansion.value for expansion in Expansion}:
+        raise HTTPException(status_code=HTTP_422_UNPROCESSABLE_ENTITY,
+                            detail=f"Cannot expand: {', '.join(sorted(unknown))}.")
+
+    return {Expansion(field) for field in fields}
+
+
+async def expand_meetings(meetings: list[MeetingScheduled],
+                          expansions: set[Expansion],
+                          service: Service,
+                          client: AsyncHttpClient) -> list[MeetingExpanded]:
+    """
+    Embeds the user records of the organizers and guests of meetings.
+
+    The usernames of every meeting are resolved at once, with a single users query. Usernames the auth service does
+    not know are left as-is, and so are all of them if the auth service fails, as the meetings are still worth
+    returning.
+
+    Args:
+        meetings (list[MeetingScheduled]): The meetings.
+        expansions (set[Expansion]): The fields to expand.
+        service (Service): The auth service.
+        client (AsyncHttpClient): The Async HTTP Client.
+
+    Returns:
+        list[MeetingExpanded]: The expanded meetings.
+    """
+    usernames: set[str] = set()
+
+    for meeting in meetings:
+        if Expansion.ORGANIZER in expansions:
+            usernames.add(meeting.organizer)
+        if Expansion.GUESTS in expansions:
+            usernames.update(meeting.guests)
+
+    users: dict[str, UserRegistered] = dict()
+
+    if usernames:
+        try:
+            response, code = await get_users(users=",".join(sorted(usernames)), service=service, client=client)
+            verify_status(response=response, status_code=code)
+            users = {user.username: user
+                     for user in parse_response(ResponseModels[UserRegistered], response, service).data}
+        except HTTPException as e:
+            logging.warning("Users not expanded: %s", e.detail)
+
+    expanded = list()
+
+    for meeting in meetings:
+        organizer = users.get(meeting.organizer, meeting.organizer) \
+            if Expansion.ORGANIZER in expansions else meeting.organizer
+        guests = [users.get(guest, guest) for guest in meeting.guests] \
+            if Expansion.GUESTS in expansions else meeting.guests
+        expanded.append(MeetingExpanded(**{**meeting.dict(), "organizer": organizer, "guests": guests}))
 
-    return await gateway(service_url=service.base_url, path=f"{api_v1_url}/users", query_params=params,
-                         client=client, method="GET")
+    return expanded
 
 
 async def verify_user_existence(username: str,
@@ -101,7 +284,7 @@ async def verify_user_existence(username: str,
         HTTPException: If the user does not exist, or service error.
     """
     response, code = await gateway(
-        service_url=service.base_url,
+        service=service,
         path=f"{api_v1_url}/users/{username}",
         client=client,
         method="GET"
@@ -109,6 +292,6 @@ async def verify_user_existence(username: str,
 
     verify_status(response=response, status_code=code)
 
-    response_event = ResponseModel[UserRegistered](**response)
+    response_event = parse_response(ResponseModel[UserRegistered], response, service)
 
     return response_event.data
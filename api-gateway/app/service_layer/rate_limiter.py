@@ -2,8 +2,200 @@
 Rate limiter service layer
 """
 import abc
+import asyncio
+from collections import OrderedDict
+import hashlib
+import itertools
+import logging
+import math
+import time
+from typing import Callable
 
-from app.adapters.redis_connector import RedisConnector
+from pydantic import BaseModel
+
+from app.adapters.redis_connector import RedisConnectionError, RedisConnector, RedisNoScriptError
+from app.adapters.telemetry.prometheus import RATE_LIMIT_REJECTIONS, RATE_LIMITER_FALLBACK
+from app.domain.events.auth_service import UserAuthenticated
+from app.domain.models import Quota, RateLimitAlgorithm, RateLimitFailureMode
+from app.settings.app_settings import ApplicationSettings
+
+log = logging.getLogger(__name__)
+
+app_name = ApplicationSettings().get_app_name()
+
+# Every script counts a request against the limit of KEYS[1], in a single round trip which redis runs atomically, and
+# returns the count, including the request, along with the milliseconds until the client is given new requests, or
+# until it may retry when the count surpasses the limit. ARGV[1] is the window in milliseconds, ARGV[2] the limit, and
+# ARGV[3] the cost of the request, the number of requests it counts as. A request costing more than the limit is never
+# allowed. Scripts but the fixed window one read the time of the redis server, so that the gateway instances share a
+# clock.
+
+# Counts a request and starts the window on the first one, so that a counter never outlives its window. Keys left
+# without a TTL are given one too.
+FIXED_WINDOW_SCRIPT = """
+local count = redis.call('INCRBY', KEYS[1], ARGV[3])
+local ttl = redis.call('PTTL', KEYS[1])
+if ttl < 0 then
+    ttl = tonumber(ARGV[1])
+    redis.call('PEXPIRE', KEYS[1], ttl)
+end
+return {count, ttl}
+"""
+
+# Keeps the count of the current and previous windows in a hash, and weighs the previous count by the part of the
+# previous window the sliding one still overlaps. Rejected requests are not counted.
+SLIDING_WINDOW_SCRIPT = """
+local time = redis.call('TIME')
+local now = time[1] * 1000 + math.floor(time[2] / 1000)
+local window, limit, cost = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local current = math.floor(now / window)
+local left = window - now % window
+local previous = tonumber(redis.call('HGET', KEYS[1], current - 1) or '0')
+local count = tonumber(redis.call('HGET', KEYS[1], current) or '0')
+local weighted = previous * left / window + count
+if weighted + cost > limit then
+    local retry
+    if cost > limit then
+        retry = window
+    elseif count + cost <= limit then
+        retry = left - (limit - cost - count) * window / previous
+    else
+        retry = left + window * (1 - (limit - cost) / count)
+    end
+    return {limit + 1, math.ceil(retry)}
+end
+count = redis.call('HINCRBY', KEYS[1], current, cost)
+redis.call('HDEL', KEYS[1], current - 2)
+redis.call('PEXPIRE', KEYS[1], 2 * window)
+return {math.floor(previous * left / window + count), left}
+"""
+
+# Logs the time of each request in a sorted set, once per unit of its cost, and counts the entries within the sliding
+# window. Rejected requests are not logged.
+SLIDING_LOG_SCRIPT = """
+local time = redis.call('TIME')
+local now = time[1] * 1000 + math.floor(time[2] / 1000)
+local window, limit, cost = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+local count = redis.call('ZCARD', KEYS[1])
+if count + cost > limit then
+    if cost > limit then
+        return {limit + 1, window}
+    end
+    local index = count + cost - limit - 1
+    local oldest = redis.call('ZRANGE', KEYS[1], index, index, 'WITHSCORES')
+    return {limit + 1, tonumber(oldest[2]) + window - now}
+end
+for unit = 1, cost do
+    redis.call('ZADD', KEYS[1], now, time[1] .. time[2] .. ':' .. count .. ':' .. unit)
+end
+redis.call('PEXPIRE', KEYS[1], window)
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+return {count + cost, tonumber(oldest[2]) + window - now}
+"""
+
+# Generic cell rate algorithm: keeps the theoretical arrival time of the next request, which each request pushes back
+# by the emission interval times its cost, and rejects requests arriving earlier than a window before it.
+GCRA_SCRIPT = """
+local time = redis.call('TIME')
+local now = time[1] * 1000 + math.floor(time[2] / 1000)
+local window, limit, cost = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local interval = window / limit
+local tat = math.max(tonumber(redis.call('GET', KEYS[1]) or '0'), now)
+local next_tat = tat + interval * cost
+if next_tat - window > now then
+    return {limit + 1, math.ceil(next_tat - window - now)}
+end
+redis.call('SET', KEYS[1], next_tat, 'PX', math.ceil(next_tat - now))
+return {limit - math.floor((window - (next_tat - now)) / interval), math.ceil(next_tat - now)}
+"""
+
+# Counts a request against several fixed window quotas, KEYS[i] counting the requests of the i-th one, ARGV[1] being
+# the cost of the request, ARGV[2 * i] and ARGV[2 * i + 1] the window in milliseconds and the limit of the i-th quota.
+# The request is counted against none of them unless it is within all of them. Returns the index of the binding quota,
+# the one surpassed whose client may retry last, or else the one with the fewest requests left, with its count, limit
+# and milliseconds until it resets.
+QUOTAS_SCRIPT = """
+local cost = tonumber(ARGV[1])
+local rejected
+for i, key in ipairs(KEYS) do
+    local window, limit = tonumber(ARGV[2 * i]), tonumber(ARGV[2 * i + 1])
+    local count = tonumber(redis.call('GET', key) or '0')
+    if count + cost > limit then
+        local ttl = redis.call('PTTL', key)
+        if ttl < 0 then
+            ttl = window
+        end
+        if not rejected or ttl > rejected[4] then
+            rejected = {i, limit + 1, limit, ttl}
+        end
+    end
+end
+if rejected then
+    return rejected
+end
+local binding
+for i, key in ipairs(KEYS) do
+    local window, limit = tonumber(ARGV[2 * i]), tonumber(ARGV[2 * i + 1])
+    local count = redis.call('INCRBY', key, cost)
+    local ttl = redis.call('PTTL', key)
+    if ttl < 0 then
+        ttl = window
+        redis.call('PEXPIRE', key, ttl)
+    end
+    if not binding or limit - count < binding[3] - binding[2] then
+        binding = {i, count, limit, ttl}
+    end
+end
+return binding
+"""
+
+
+class RateLimit(BaseModel):
+    """
+    The rate limit of a client, once its request was counted.
+
+    Attributes:
+        limit (int): the number of requests allowed in a window
+        count (int): the number of requests counted in the current window
+        reset_after (float): seconds until the client is given new requests, or may retry once the limit is surpassed
+    """
+    limit: int
+    count: int
+    reset_after: float
+
+    @property
+    def allowed(self) -> bool:
+        """
+        Whether the request is within the limit.
+        """
+        return self.count <= self.limit
+
+    @property
+    def remaining(self) -> int:
+        """
+        The number of requests left in the current window.
+        """
+        return max(self.limit - self.count, 0)
+
+    def headers(self) -> dict[str, str]:
+        """
+        Builds the rate limit response headers, with Retry-After once the limit is surpassed.
+
+        Returns:
+            dict[str, str]: the response headers.
+        """
+        reset_after = str(math.ceil(self.reset_after))
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": reset_after,
+        }
+
+        if not self.allowed:
+            headers["Retry-After"] = reset_after
+
+        return headers
 
 
 class RateLimiter(abc.ABC):
@@ -12,61 +204,668 @@ class RateLimiter(abc.ABC):
     """
 
     @abc.abstractmethod
-    async def increment(self, identifier: str) -> int:
+    async def hit(self, identifier: str, cost: int = 1) -> RateLimit:
         """
-        Increment the number of requests for the given key
+        Counts a request for the given key
 
         Args:
-            identifier (str): the key to increment the number of requests for
+            identifier (str): the key to count the request for
+            cost (int): the number of requests the request counts as
 
         Returns:
-             int: the total number of requests for the given key
+             RateLimit: the rate limit of the given key, including this request
         """
         raise NotImplementedError
 
-    @abc.abstractmethod
-    async def is_allowed(self, request_number: int) -> bool:
+
+class RedisProbe:
+    """
+    Tracks whether redis is available to the rate limiters. Once a command fails, the rate limiters fall back without
+    waiting for redis, and a background task pings it until it answers, to restore them.
+
+    Attributes:
+        task (asyncio.Task | None): the task pinging redis, None while redis is available
+    """
+
+    def __init__(self):
+        self.task: asyncio.Task | None = None
+
+    @property
+    def available(self) -> bool:
         """
-        Check if the given key is allowed to make a request
+        Whether the rate limiters count requests in redis.
         """
-        raise NotImplementedError
+        return self.task is None
 
-    @abc.abstractmethod
-    async def timer(self, identifier: str) -> bool:
+    def start(self, redis: RedisConnector, interval: float) -> None:
         """
-        Times to reset the number of requests for the given key.
+        Marks redis unavailable, and pings it every `interval` seconds until it answers, unless it already does.
 
         Args:
-            identifier (str): the key to reset the number of requests for
+            redis (RedisConnector): the redis connector of the rate limiters
+            interval (float): seconds between two pings
+        """
+        if self.task is not None:
+            return
+
+        log.warning("Redis is unavailable, rate limiters fall back until it answers a ping.")
+        RATE_LIMITER_FALLBACK.labels(app_name=app_name).set(1)
+        self.task = asyncio.create_task(self.probe(redis, interval=interval))
+
+    async def probe(self, redis: RedisConnector, interval: float) -> None:
+        """
+        Pings redis every `interval` seconds, and marks it available once it answers.
+
+        Args:
+            redis (RedisConnector): the redis connector of the rate limiters
+            interval (float): seconds between two pings
+        """
+        while True:
+            await asyncio.sleep(interval)
+
+            try:
+                if await redis.ping():
+                    break
+            except RedisConnectionError:
+                pass
+
+        log.info("Redis is available again, rate limiters count requests in redis.")
+        RATE_LIMITER_FALLBACK.labels(app_name=app_name).set(0)
+        self.task = None
+
+    def stop(self) -> None:
+        """
+        Stops pinging redis, marking it available.
+        """
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+            RATE_LIMITER_FALLBACK.labels(app_name=app_name).set(0)
+
+
+redis_probe = RedisProbe()
+
+
+class LocalRateLimiter:
+    """
+    Counts requests against quotas in fixed windows in process, each gateway instance counting its own requests only.
+
+    Attributes:
+        max_size (int): the number of keys counted in process at most, the least recently counted being forgotten
+        clock (Callable[[], float]): returns the current epoch time
+        counts (OrderedDict[str, tuple[int, int]]): the requests counted, by key, with the index of their window,
+            least recently counted first
+    """
+
+    def __init__(self, max_size: int = 10000, clock: Callable[[], float] = time.time):
+        self.max_size = max_size
+        self.clock = clock
+        self.counts: OrderedDict[str, tuple[int, int]] = OrderedDict()
+
+    def hit(self, identifier: str, cost: int, quotas: list[Quota], dry_run: bool = False) -> RateLimit:
+        """
+        Counts a request for the given key against every given quota, unless it surpasses one of them.
+
+        Args:
+            identifier (str): the key to count the request for
+            cost (int): the number of requests the request counts as
+            quotas (list[Quota]): the quotas to count the request against
+            dry_run (bool): tell the rate limit the request would get, without counting it
 
         Returns:
-            bool: True if the key was given the timer to reset, False otherwise
+             RateLimit: the rate limit of the binding quota, including this request
         """
-        raise NotImplementedError
+        now = self.clock()
+        windows: dict[str, int] = dict()
+        rate_limits: dict[str, RateLimit] = dict()
+
+        for quota in quotas:
+            key, window = f"{identifier}:{quota.key}", int(now // quota.interval)
+            counted_window, count = self.counts.get(key, (window, 0))
+            windows[key] = window
+            rate_limits[key] = RateLimit(limit=quota.threshold,
+                                         count=(count if counted_window == window else 0) + cost,
+                                         reset_after=(window + 1) * quota.interval - now)
+
+        if rejected := [rate_limit for rate_limit in rate_limits.values() if not rate_limit.allowed]:
+            rate_limit = max(rejected, key=lambda rejection: rejection.reset_after)
+            return RateLimit(limit=rate_limit.limit, count=rate_limit.limit + 1, reset_after=rate_limit.reset_after)
+
+        if dry_run:
+            return min(rate_limits.values(), key=lambda rate_limit: rate_limit.remaining)
+
+        for key, rate_limit in rate_limits.items():
+            self.counts[key] = (windows[key], rate_limit.count)
+            self.counts.move_to_end(key)
+
+        while len(self.counts) > self.max_size:
+            self.counts.popitem(last=False)
+
+        return min(rate_limits.values(), key=lambda rate_limit: rate_limit.remaining)
+
+
+class Fallback:
+    """
+    How the redis rate limiters limit requests while redis is unavailable, from the first failed command until it
+    answers a ping again, without waiting for redis meanwhile.
+
+    Failing open, the requests of each quota are counted in fixed windows in process, each gateway instance counting
+    its own requests only, so that a client may get through the threshold once per instance. Failing closed, requests
+    are rejected, and told to retry once redis is pinged again.
+
+    Attributes:
+        mode (RateLimitFailureMode): how requests are limited while redis is unavailable
+        probe_interval (float): seconds between two pings of redis while it is unavailable
+        local (LocalRateLimiter): counts the requests in process when failing open
+    """
+
+    def __init__(self,
+                 mode: RateLimitFailureMode = RateLimitFailureMode.OPEN,
+                 probe_interval: float = 1.0,
+                 max_size: int = 10000,
+                 clock: Callable[[], float] = time.time):
+        self.mode = mode
+        self.probe_interval = probe_interval
+        self.local = LocalRateLimiter(max_size=max_size, clock=clock)
+
+    def hit(self, identifier: str, cost: int, quotas: list[Quota]) -> RateLimit:
+        """
+        Limits a request for the given key, counting it against every given quota unless it surpasses one of them.
+
+        Args:
+            identifier (str): the key to count the request for
+            cost (int): the number of requests the request counts as
+            quotas (list[Quota]): the quotas to count the request against
+
+        Returns:
+             RateLimit: the rate limit of the binding quota, including this request
+        """
+        if self.mode is RateLimitFailureMode.CLOSED:
+            limit = min(quota.threshold for quota in quotas)
+            return RateLimit(limit=limit, count=limit + 1, reset_after=self.probe_interval)
+
+        return self.local.hit(identifier, cost=cost, quotas=quotas)
+
+
+def blocked_rate_limit(blocked_clients: OrderedDict[str, tuple[float, int]],
+                       identifier: str,
+                       now: float) -> RateLimit | None:
+    """
+    Finds whether a client is blocked, forgetting it once it may retry.
+
+    Args:
+        blocked_clients (OrderedDict[str, tuple[float, int]]): the blocked clients, with the epoch time they may retry
+            at and their limit, least recently rejected first
+        identifier (str): the key the requests of the client are counted for
+        now (float): the current epoch time
+
+    Returns:
+        RateLimit | None: the rate limit of the client while it is blocked, None otherwise
+    """
+    if (blocked := blocked_clients.get(identifier)) is None:
+        return None
+
+    retry_at, limit = blocked
+
+    if retry_at <= now:
+        del blocked_clients[identifier]
+        return None
+
+    blocked_clients.move_to_end(identifier)
+    RATE_LIMIT_REJECTIONS.labels(source="deny-cache", app_name=app_name).inc()
+
+    return RateLimit(limit=limit, count=limit + 1, reset_after=retry_at - now)
+
+
+def block(blocked_clients: OrderedDict[str, tuple[float, int]],
+          identifier: str,
+          rate_limit: RateLimit,
+          now: float,
+          max_size: int) -> None:
+    """
+    Blocks a client which surpassed its rate limit until it may retry.
+
+    Args:
+        blocked_clients (OrderedDict[str, tuple[float, int]]): the blocked clients, with the epoch time they may retry
+            at and their limit, least recently rejected first
+        identifier (str): the key the requests of the client are counted for
+        rate_limit (RateLimit): the rate limit the client surpassed
+        now (float): the current epoch time
+        max_size (int): the number of blocked clients remembered at most, the least recently rejected being forgotten
+    """
+    blocked_clients[identifier] = (now + rate_limit.reset_after, rate_limit.limit)
+    blocked_clients.move_to_end(identifier)
+
+    while len(blocked_clients) > max_size:
+        blocked_clients.popitem(last=False)
 
 
 class RedisRateLimiter(RateLimiter):
     """
-    Rate limiter implementation using redis
+    Rate limiter implementation using redis.
+
+    A request is counted in a single round trip, by a script which redis runs atomically. The script is run by its
+    digest, and loaded only when redis misses it. While redis is unavailable, requests are limited by the fallback, if
+    any.
+
+    Attributes:
+        script (str): the Lua script counting a request
+        sha (str): the SHA1 digest of the script
     """
 
-    def __init__(self, redis: RedisConnector, time_to_live: int, threshold: int):
+    script: str
+    sha: str
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.sha = hashlib.sha1(cls.script.encode()).hexdigest()
+
+    def __init__(self, redis: RedisConnector, time_to_live: int, threshold: int, fallback: Fallback | None = None):
         """
 
         Args:
             redis: A redis connector
-            time_to_live: time in seconds to reset the number of requests for the given key
-            threshold: the maximum number of requests allowed for any key
+            time_to_live: time in seconds of the window the requests are limited over
+            threshold: the maximum number of requests allowed for any key in a window
+            fallback: limits requests while redis is unavailable, None to raise its connection errors
         """
         self.redis = redis
         self.time_to_live = time_to_live
         self.threshold = threshold
+        self.fallback = fallback
+        self.default = Quota(threshold=threshold, interval=time_to_live)
+
+    async def hit(self, identifier: str, cost: int = 1) -> RateLimit:
+        return await self.limit(identifier, cost=cost, quotas=[self.default])
 
-    async def increment(self, identifier: str) -> int:
-        return await self.redis.incr(identifier)
+    async def limit(self, identifier: str, cost: int, quotas: list[Quota]) -> RateLimit:
+        """
+        Counts a request for the given key in redis, or limits it with the fallback while redis is unavailable.
+
+        Args:
+            identifier (str): the key to count the request for
+            cost (int): the number of requests the request counts as
+            quotas (list[Quota]): the quotas to count the request against
+
+        Returns:
+             RateLimit: the rate limit of the binding quota, including this request
+        """
+        if self.fallback is None:
+            return await self.count(identifier, cost=cost, quotas=quotas)
+
+        if redis_probe.available:
+            try:
+                return await self.count(identifier, cost=cost, quotas=quotas)
+            except RedisConnectionError:
+                redis_probe.start(self.redis, interval=self.fallback.probe_interval)
+
+        return self.fallback.hit(identifier, cost=cost, quotas=quotas)
+
+    async def count(self, identifier: str, cost: int, quotas: list[Quota]) -> RateLimit:
+        """
+        Counts a request for the given key in redis, with the script of the rate limiter.
+
+        Args:
+            identifier (str): the key to count the request for
+            cost (int): the number of requests the request counts as
+            quotas (list[Quota]): the quota to count the request against
+
+        Returns:
+             RateLimit: the rate limit of the quota, including this request
+        """
+        (quota,) = quotas
+        count, reset_after = await self.run(keys=[identifier], args=[quota.interval * 1000, quota.threshold, cost])
 
-    async def is_allowed(self, request_number: int) -> bool:
-        return request_number <= self.threshold
+        return RateLimit(limit=quota.threshold, count=count, reset_after=reset_after / 1000)
+
+    async def run(self, keys: list[str], args: list[str | int | float]) -> list:
+        """
+        Runs the script by its digest.
+
+        Args:
+            keys (list[str]): the keys the script reads and writes
+            args (list[str | int | float]): the script arguments
+
+        Returns:
+            list: the script result
+        """
+        try:
+            return await self.redis.evalsha(self.sha, keys=keys, args=args)
+        except RedisNoScriptError:
+            # The script cache is empty after a redis restart or failover: load it once, then run it by digest again.
+            await self.redis.script_load(self.script)
+            return await self.redis.evalsha(self.sha, keys=keys, args=args)
+
+
+class FixedWindowRateLimiter(RedisRateLimiter):
+    """
+    Rate limiter counting the requests of fixed windows.
+    """
+    script = FIXED_WINDOW_SCRIPT
+
+
+class SlidingWindowRateLimiter(RedisRateLimiter):
+    """
+    Rate limiter approximating a sliding window from the counts of the current and previous fixed windows.
+    """
+    script = SLIDING_WINDOW_SCRIPT
+
+
+class SlidingLogRateLimiter(RedisRateLimiter):
+    """
+    Rate limiter counting the requests of a sliding window exactly, from the log of their times.
+    """
+    script = SLIDING_LOG_SCRIPT
+
+
+class GcraRateLimiter(RedisRateLimiter):
+    """
+    Rate limiter spacing requests evenly over the window, with the generic cell rate algorithm.
+    """
+    script = GCRA_SCRIPT
+
+
+RATE_LIMITERS: dict[RateLimitAlgorithm, type[RedisRateLimiter]] = {
+    RateLimitAlgorithm.FIXED_WINDOW: FixedWindowRateLimiter,
+    RateLimitAlgorithm.SLIDING_WINDOW: SlidingWindowRateLimiter,
+    RateLimitAlgorithm.SLIDING_LOG: SlidingLogRateLimiter,
+    RateLimitAlgorithm.GCRA: GcraRateLimiter,
+}
+
+
+class QuotaRateLimiter(RedisRateLimiter):
+    """
+    Rate limiter counting a request against every quota of the policy table it matches, each one a fixed window of its
+    own, in a single round trip. A request surpassing any of them is counted against none.
+
+    The counters of a client share a redis hash tag, so that the script may update them all on a cluster too. A client
+    surpassing a quota is blocked in process until it may retry, as `DenyCachingRateLimiter` does, its requests counting
+    against that quota being rejected meanwhile without reaching redis.
+
+    Attributes:
+        quotas (list[Quota]): the quota policy table
+        max_blocked (int): the number of blocked clients remembered at most, 0 not to remember any
+        clock (Callable[[], float]): returns the current epoch time
+        blocked (OrderedDict[str, tuple[float, int]]): the blocked clients, by key of their quota, with the epoch time
+            they may retry at and their limit, least recently rejected first
+    """
+    script = QUOTAS_SCRIPT
+
+    def __init__(self,
+                 redis: RedisConnector,
+                 quotas: list[Quota],
+                 time_to_live: int,
+                 threshold: int,
+                 fallback: Fallback | None = None,
+                 max_blocked: int = 10000,
+                 clock: Callable[[], float] = time.time):
+        """
+
+        Args:
+            redis: A redis connector
+            quotas: the quota policy table
+            time_to_live: time in seconds of the window of the requests matching no quota
+            threshold: the maximum number of requests matching no quota allowed for any key in a window
+            fallback: limits requests while redis is unavailable, None to raise its connection errors
+            max_blocked: the number of blocked clients remembered at most, 0 not to remember any
+            clock: returns the current epoch time
+        """
+        super().__init__(redis=redis, time_to_live=time_to_live, threshold=threshold, fallback=fallback)
+        self.quotas = quotas
+        self.max_blocked = max_blocked
+        self.clock = clock
+        self.blocked: OrderedDict[str, tuple[float, int]] = OrderedDict()
+
+    def identifies(self, route: str, method: str) -> bool:
+        """
+        Whether the requests of a route may count against a quota of a user or a role, which their user is needed for.
+
+        Args:
+            route (str): the path template of the requested route
+            method (str): the HTTP method of the request
+
+        Returns:
+            bool: True if a quota naming a user or a role matches the route.
+        """
+        return any(quota.matches(route=route, method=method, username=quota.username, role=quota.role)
+                   for quota in self.quotas if quota.username is not None or quota.role is not None)
+
+    def match(self, route: str, method: str, user: UserAuthenticated | None = None) -> list[Quota]:
+        """
+        Finds the quotas a request counts against.
+
+        Args:
+            route (str): the path template of the requested route
+            method (str): the HTTP method of the request
+            user (UserAuthenticated | None): the user the request is authenticated as, None if anonymous
+
+        Returns:
+            list[Quota]: the matching quotas, or the default quota of the limiter when none matches
+        """
+        username, role = (user.username, user.role) if user else (None, None)
+
+        return [quota for quota in self.quotas if quota.matches(route=route, method=method, username=username,
+                                                                 role=role)] or [self.default]
+
+    async def hit(self, identifier: str, cost: int = 1, quotas: list[Quota] | None = None) -> RateLimit:
+        """
+        Counts a request for the given key against the given quotas
+
+        Args:
+            identifier (str): the key to count the request for
+            cost (int): the number of requests the request counts as
+            quotas (list[Quota] | None): the quotas to count the request against, None for the default quota
+
+        Returns:
+             RateLimit: the rate limit of the binding quota, including this request
+        """
+        quotas = quotas or [self.default]
+        now = self.clock()
+
+        for quota in quotas:
+            if (rate_limit := blocked_rate_limit(self.blocked, f"{identifier}:{quota.key}", now=now)) is not None:
+                return rate_limit
+
+        return await self.limit(identifier, cost=cost, quotas=quotas)
+
+    async def count(self, identifier: str, cost: int, quotas: list[Quota]) -> RateLimit:
+        keys = [f"{identifier}:{quota.key}" for quota in quotas]
+        args = [cost, *itertools.chain.from_iterable((quota.interval * 1000, quota.threshold) for quota in quotas)]
+
+        binding, count, limit, reset_after = await self.run(keys=keys, args=args)
+        rate_limit = RateLimit(limit=limit, count=count, reset_after=reset_after / 1000)
+
+        if not rate_limit.allowed:
+            RATE_LIMIT_REJECTIONS.labels(source="limiter", app_name=app_name).inc()
+
+            if self.max_blocked > 0:
+                # Lua indexes start at 1.
+                block(self.blocked, keys[binding - 1], rate_limit, now=self.clock(), max_size=self.max_blocked)
+
+        return rate_limit
+
+
+class DenyCachingRateLimiter(RateLimiter):
+    """
+    Rate limiter rejecting the clients which surpassed their rate limit in process, until they may retry, instead of
+    counting their requests again. A flood of rejected requests is thus absorbed without reaching redis.
+
+    Attributes:
+        rate_limiter (RateLimiter): the rate limiter counting the requests of the clients not blocked
+        max_size (int): the number of blocked clients remembered at most, the least recently rejected being forgotten
+        clock (Callable[[], float]): returns the current epoch time
+        blocked (OrderedDict[str, tuple[float, int]]): the blocked clients, with the epoch time they may retry at and
+            their limit, least recently rejected first
+    """
+
+    def __init__(self, rate_limiter: RateLimiter, max_size: int = 10000, clock: Callable[[], float] = time.time):
+        self.rate_limiter = rate_limiter
+        self.max_size = max_size
+        self.clock = clock
+        self.blocked: OrderedDict[str, tuple[float, int]] = OrderedDict()
+
+    async def hit(self, identifier: str, cost: int = 1) -> RateLimit:
+        now = self.clock()
+
+        if (rate_limit := blocked_rate_limit(self.blocked, identifier, now=now)) is not None:
+            return rate_limit
+
+        rate_limit = await self.rate_limiter.hit(identifier, cost=cost)
+
+        if not rate_limit.allowed:
+            RATE_LIMIT_REJECTIONS.labels(source="limiter", app_name=app_name).inc()
+            block(self.blocked, identifier, rate_limit, now=now, max_size=self.max_size)
+
+        return rate_limit
+
+
+class WindowCount:
+    """
+    The requests of a client in a fixed window, as last counted by every gateway instance, and since by this one.
+
+    Attributes:
+        window (int): the index of the window, since the epoch
+        synced (int): the count of the window in redis, when this instance last synced it
+        pending (int): the requests this instance counted since, not synced yet
+    """
+
+    __slots__ = ("window", "synced", "pending")
+
+    def __init__(self, window: int):
+        self.window = window
+        self.synced = 0
+        self.pending = 0
+
+
+class PreAggregatedRateLimiter(RateLimiter):
+    """
+    Approximate rate limiter, counting the requests of fixed windows in process, and syncing the counts with redis in
+    batches, so that redis is off the path of the requests.
+
+    Requests are allowed after the count of their window when it was last synced, plus the requests counted since by
+    this instance. A client may thus get through about `max_drift` requests more than the threshold, per gateway
+    instance: a request reaching that many requests not synced yet wakes the syncer up, rather than waiting for a sync.
+
+    Syncs only add the counts of the clients with requests since the last sync, so that redis load follows the
+    request volume. The counts of the other clients are read back every `refresh_interval` seconds only, for the
+    requests the other instances counted.
+
+    Once a sync fails to reach redis, the limiter stops syncing until `redis_probe` finds it available again, counting
+    requests in process meanwhile, so that requests do not wait for a redis timeout. The counts of past windows are
+    forgotten rather than synced then, so that they do not grow with the outage.
+
+    Attributes:
+        max_drift (int): the number of requests of a client an instance counts at most before syncing them
+        refresh_interval (float): seconds between two reads of the counts without requests since the last sync
+        probe_interval (float): seconds between two pings of redis while it is unavailable
+        clock (Callable[[], float]): returns the current epoch time
+        drifted (asyncio.Event): set once a client reached `max_drift` requests not synced yet, to sync them early
+    """
+
+    def __init__(self,
+                 redis: RedisConnector,
+                 time_to_live: int,
+                 threshold: int,
+                 max_drift: int = 10,
+                 refresh_interval: float = 1.0,
+                 probe_interval: float = 1.0,
+                 clock: Callable[[], float] = time.time):
+        """
+
+        Args:
+            redis: A redis connector
+            time_to_live: time in seconds of the window the requests are limited over
+            threshold: the maximum number of requests allowed for any key in a window
+            max_drift: the number of requests of a key counted at most before syncing them
+            refresh_interval: seconds between two reads of the counts of keys without requests since the last sync
+            probe_interval: seconds between two pings of redis while it is unavailable
+            clock: returns the current epoch time
+        """
+        self.redis = redis
+        self.time_to_live = time_to_live
+        self.threshold = threshold
+        self.max_drift = max_drift
+        self.refresh_interval = refresh_interval
+        self.probe_interval = probe_interval
+        self.clock = clock
+        self.counts: dict[str, WindowCount] = dict()
+        self.lock = asyncio.Lock()
+        self.drifted = asyncio.Event()
+        self.refreshed = -math.inf
+
+    async def hit(self, identifier: str, cost: int = 1) -> RateLimit:
+        now = self.clock()
+        window = int(now // self.time_to_live)
+        key = f"{identifier}:{window}"
+
+        if (count := self.counts.get(key)) is None:
+            count = self.counts[key] = WindowCount(window)
+
+        count.pending += cost
+
+        # While redis is unavailable, the drift is left unbounded rather than having syncs wait for a timeout.
+        if count.pending >= self.max_drift and redis_probe.available:
+            self.drifted.set()
+
+        return RateLimit(limit=self.threshold,
+                         count=count.synced + count.pending,
+                         reset_after=(window + 1) * self.time_to_live - now)
+
+    async def sync(self) -> None:
+        """
+        Adds the requests counted since the last sync to the counts in redis, in one pipelined round trip, and reads
+        back their totals, including the requests counted by the other gateway instances. The totals of the keys
+        without requests since are read along, once every `refresh_interval` seconds.
+
+        The counts of the current window are kept in process when redis is unavailable, to be synced once it is
+        available again. The counts of past windows are forgotten once a sync was attempted, whether it reached redis
+        or not.
+        """
+        async with self.lock:
+            now = self.clock()
+            window = int(now // self.time_to_live)
+
+            if not redis_probe.available:
+                self.counts = {key: count for key, count in self.counts.items() if count.window >= window}
+                return
+
+            self.counts = {key: count for key, count in self.counts.items() if count.window >= window or count.pending}
+
+            if refresh := now - self.refreshed >= self.refresh_interval:
+                self.refreshed = now
+
+            # Keys of the current window are synced once in a while even without requests of their own, to read the
+            # requests of the other instances.
+            deltas = {key: count.pending for key, count in self.counts.items() if count.pending or refresh}
+
+            if not deltas:
+                return
+
+            try:
+                totals = await self.redis.incrby_many(deltas, expire=self.time_to_live)
+            except RedisConnectionError:
+                log.warning("Rate limit counts could not be synced, %s keys are counted in process.", len(deltas))
+                redis_probe.start(self.redis, interval=self.probe_interval)
+                self.counts = {key: count for key, count in self.counts.items() if count.window >= window}
+                return
+
+            for (key, delta), total in zip(deltas.items(), totals):
+                count = self.counts[key]
+                count.pending -= delta
+                count.synced = total
+
+    async def sync_forever(self, interval: float) -> None:
+        """
+        Syncs the counts with redis periodically, and as soon as a client drifted.
+
+        Args:
+            interval (float): seconds between two syncs
+        """
+        while True:
+            try:
+                await asyncio.wait_for(self.drifted.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
 
-    async def timer(self, identifier: str) -> bool:
-        return await self.redis.expire(identifier, self.time_to_live)
+            self.drifted.clear()
+            await self.sync()
@@ -0,0 +1,265 @@
+"""
+Response cache service layer
+"""
+import abc
+import hashlib
+import logging
+from typing import AsyncIterator, Awaitable, Callable
+
+from pydantic import BaseModel
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.status import HTTP_200_OK, HTTP_304_NOT_MODIFIED
+
+from app.adapters.redis_connector import RedisConnectionError, RedisConnector
+from app.domain.schemas import CamelCaseModel
+from app.utils.serializer import ModelResponse
+
+log = logging.getLogger(__name__)
+
+JSON_MEDIA_TYPE = "application/json"
+# Bodies larger than this are relayed without being cached, so that a large streamed response is never held whole.
+MAX_CACHED_BODY_SIZE = 1024 * 1024
+
+
+class CachedResponse(BaseModel):
+    """
+    A cached response body, along with its entity tag.
+    """
+    etag: str
+    media_type: str = JSON_MEDIA_TYPE
+    body: str
+
+    @classmethod
+    def from_body(cls, body: bytes, media_type: str | None = None) -> "CachedResponse":
+        """
+        Creates a cache entry for a response body.
+
+        Args:
+            body (bytes): the response body
+            media_type (str | None): the response media type
+
+        Returns:
+            CachedResponse: the cache entry, tagged after its content.
+        """
+        etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        return cls(etag=etag, media_type=media_type or JSON_MEDIA_TYPE, body=body.decode())
+
+    def matches(self, if_none_match: str | None) -> bool:
+        """
+        Checks whether the client already holds this response.
+
+        Args:
+            if_none_match (str | None): the If-None-Match request header
+
+        Returns:
+            bool: True if any of the given entity tags matches this response.
+        """
+        if not if_none_match:
+            return False
+
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or self.etag in tags
+
+    def to_response(self, request: Request) -> Response:
+        """
+        Builds the response to a request, which is Not Modified if the client already holds it.
+
+        Args:
+            request (Request): the client request
+
+        Returns:
+            Response: the cached response, or an empty Not Modified one.
+        """
+        headers = {"ETag": self.etag}
+
+        if self.matches(request.headers.get("If-None-Match")):
+            return Response(status_code=HTTP_304_NOT_MODIFIED, headers=headers)
+
+        return Response(content=self.body, media_type=self.media_type, headers=headers)
+
+
+class ResponseCache(abc.ABC):
+    """
+    Response cache interface
+
+    Attributes:
+        ttl (int): seconds a response is cached for
+    """
+
+    ttl: int
+
+    @abc.abstractmethod
+    async def get(self, key: str) -> CachedResponse | None:
+        """
+        Get the cached response for the given key
+
+        Args:
+            key (str): the cache key
+
+        Returns:
+            CachedResponse | None: the cached response, None if not cached
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def set(self, key: str, response: CachedResponse) -> None:
+        """
+        Caches a response for the given key
+
+        Args:
+            key (str): the cache key
+            response (CachedResponse): the response to cache
+        """
+        raise NotImplementedError
+
+
+class RedisResponseCache(ResponseCache):
+    """
+    Response cache implementation using redis
+    """
+
+    def __init__(self, redis: RedisConnector, ttl: int, prefix: str = "cache-"):
+        """
+
+        Args:
+            redis: A redis connector
+            ttl: time in seconds a response is cached for
+            prefix: the prefix of every cache key
+        """
+        self.redis = redis
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def get(self, key: str) -> CachedResponse | None:
+        try:
+            value = await self.redis.get(f"{self.prefix}{key}")
+        except RedisConnectionError:
+            log.warning("Response cache unavailable, skipping lookup of %s.", key)
+            return None
+
+        return CachedResponse.parse_raw(value) if value else None
+
+    async def set(self, key: str, response: CachedResponse) -> None:
+        try:
+            await self.redis.set(f"{self.prefix}{key}", response.json(), expire=self.ttl)
+        except RedisConnectionError:
+            log.warning("Response cache unavailable, %s was not cached.", key)
+
+
+def cache_key(request: Request, private: bool = False) -> str:
+    """
+    Computes the cache key of a request.
+
+    Args:
+        request (Request): the client request
+        private (bool): whether the response depends on the client credentials, which then are part of the key
+
+    Returns:
+        str: the request method and url, followed by a hash of the credentials of private requests which have any.
+    """
+    key = f"{request.method}:{request.url.path}?{request.url.query}"
+
+    if private and (authorization := request.headers.get("authorization")):
+        key = f"{key}#{hashlib.sha256(authorization.encode()).hexdigest()}"
+
+    return key
+
+
+async def read_body(response: Response, max_size: int) -> bytes | None:
+    """
+    Reads a response whole body, draining it if streamed, unless it is larger than `max_size` bytes.
+
+    A streamed body is read until it proves larger, the response then being left to stream the chunks already read,
+    followed by the rest, so that a large body is never held whole.
+
+    Args:
+        response (Response): the response to read
+        max_size (int): the number of bytes read at most
+
+    Returns:
+        bytes | None: the response body, None if larger than `max_size` bytes.
+    """
+    if not hasattr(response, "body_iterator"):
+        return response.body if len(response.body) <= max_size else None
+
+    chunks, size = [], 0
+    body_iterator = response.body_iterator
+
+    async for chunk in body_iterator:
+        chunks.append(chunk if isinstance(chunk, bytes) else chunk.encode(response.charset))
+        size += len(chunks[-1])
+
+        if size > max_size:
+            response.body_iterator = rewound(chunks, body_iterator)
+            return None
+
+    return b"".join(chunks)
+
+
+async def rewound(chunks: list[bytes], rest: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Streams a partly read body from its start: the chunks already read, followed by the rest of it.
+
+    Args:
+        chunks (list[bytes]): the chunks already read
+        rest (AsyncIterator[bytes]): the rest of the body
+
+    Yields:
+        bytes: the next body chunk.
+    """
+    for chunk in chunks:
+        yield chunk
+
+    async for chunk in rest:
+        yield chunk
+
+
+async def cached(request: Request,
+                 cache: ResponseCache | None,
+                 fetch: Callable[[], Awaitable[Response | CamelCaseModel]],
+                 max_size: int = MAX_CACHED_BODY_SIZE,
+                 private: bool = False,
+                 ) -> Response:
+    """
+    Serves a query from the cache, fetching and caching it on a miss.
+
+    Clients sending a matching If-None-Match header get a Not Modified response. Errors, and bodies larger than
+    `max_size` bytes, are relayed as fetched without being cached.
+
+    Args:
+        request (Request): the client request
+        cache (ResponseCache | None): the response cache, None when caching is disabled
+        fetch (Callable[[], Awaitable[Response | CamelCaseModel]]): fetches the response from the service
+        max_size (int): the size in bytes of the largest body cached
+        private (bool): whether the response depends on the client credentials, so that it is cached per client
+
+    Returns:
+        Response: the cached response, or the fetched one when caching is disabled or it is not cacheable.
+    """
+    if cache is None:
+        response = await fetch()
+        return ModelResponse(content=response) if isinstance(response, CamelCaseModel) else response
+
+    key = cache_key(request, private=private)
+
+    if hit := await cache.get(key):
+        log.debug("Response cache hit for %s.", key)
+        return hit.to_response(request)
+
+    response = await fetch()
+
+    if isinstance(response, CamelCaseModel):
+        response = ModelResponse(content=response)
+
+    if response.status_code != HTTP_200_OK:
+        return response
+
+    if (body := await read_body(response, max_size=max_size)) is None:
+        log.debug("Response to %s is larger than %s bytes, it was not cached.", key, max_size)
+        return response
+
+    entry = CachedResponse.from_body(body, media_type=response.headers.get("content-type"))
+    await cache.set(key, entry)
+
+    return entry.to_response(request)
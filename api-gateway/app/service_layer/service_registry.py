@@ -0,0 +1,128 @@
+"""
+Service registry service layer
+"""
+import asyncio
+import logging
+import os
+from typing import Iterable, Iterator
+
+from pydantic import ValidationError, parse_file_as
+
+from app.domain.models import Service
+from app.settings.gateway_settings import GatewaySettings
+
+log = logging.getLogger(__name__)
+
+
+class ServiceRegistry:
+    """
+    The in-network services, indexed by normalized name.
+
+    The index is replaced as a whole on reload, so that concurrent lookups see either the previous services or the
+    new ones, never a mix of both.
+
+    Attributes:
+        index (dict[str, Service]): the services, by lower-cased name.
+    """
+
+    def __init__(self, services: Iterable[Service] = ()):
+        self.index: dict[str, Service] = self.compile(services)
+
+    @staticmethod
+    def compile(services: Iterable[Service]) -> dict[str, Service]:
+        """
+        Indexes services by normalized name.
+
+        Args:
+            services (Iterable[Service]): the services
+
+        Returns:
+            dict[str, Service]: the services, by lower-cased name.
+        """
+        return {service.name.lower(): service for service in services}
+
+    @staticmethod
+    def load(settings: GatewaySettings) -> list[Service]:
+        """
+        Loads the configured services, from the services file if any.
+
+        Args:
+            settings (GatewaySettings): the gateway settings
+
+        Returns:
+            list[Service]: the services.
+        """
+        if settings.SERVICES_FILE:
+            return parse_file_as(list[Service], settings.SERVICES_FILE)
+
+        return settings.SERVICES
+
+    @classmethod
+    def from_settings(cls, settings: GatewaySettings) -> "ServiceRegistry":
+        """
+        Creates the registry of the configured services.
+
+        Args:
+            settings (GatewaySettings): the gateway settings
+
+        Returns:
+            ServiceRegistry: the registry.
+        """
+        return cls(cls.load(settings))
+
+    def get(self, name: str) -> Service | None:
+        """
+        Get a service by name, case-insensitively.
+
+        Args:
+            name (str): the service name
+
+        Returns:
+            Service | None: the service, None if not registered.
+        """
+        return self.index.get(name.lower())
+
+    def __iter__(self) -> Iterator[Service]:
+        return iter(self.index.values())
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def reload(self) -> bool:
+        """
+        Reloads the configured services, keeping the current ones if the configuration is invalid.
+
+        Returns:
+            bool: True if the services were reloaded.
+        """
+        try:
+            index = self.compile(self.load(GatewaySettings()))
+        except (OSError, ValueError, ValidationError) as e:
+            log.error("Services could not be reloaded, keeping the current ones. %s", e)
+            return False
+
+        self.index = index
+        log.info("Services reloaded: %s", ", ".join(self.index))
+        return True
+
+    async def watch(self, path: str, interval: float) -> None:
+        """
+        Reloads the services whenever the services file changes.
+
+        Args:
+            path (str): the services file
+            interval (float): seconds between two checks of the file
+        """
+        modified_at = os.stat(path).st_mtime if os.path.exists(path) else None
+
+        while True:
+            await asyncio.sleep(interval)
+
+            try:
+                current = os.stat(path).st_mtime
+            except OSError:
+                continue
+
+            if current != modified_at:
+                modified_at = current
+                self.reload()
@@ -0,0 +1,208 @@
+"""
+Token introspection cache service layer
+"""
+from collections import OrderedDict
+import hashlib
+import logging
+import math
+import time
+from typing import Any, Awaitable, Callable
+
+from fastapi import HTTPException
+from pydantic import Field
+from starlette.status import HTTP_401_UNAUTHORIZED, HTTP_403_FORBIDDEN
+
+from app.adapters.redis_connector import RedisConnectionError, RedisConnector
+from app.adapters.telemetry.prometheus import TOKEN_CACHE_LOOKUPS
+from app.domain.events.auth_service import UserAuthenticated
+from app.domain.schemas import CamelCaseModel
+from app.settings.app_settings import ApplicationSettings
+
+log = logging.getLogger(__name__)
+
+app_name = ApplicationSettings().get_app_name()
+
+# Status codes of the auth service answers which tell a token is invalid, as opposed to the auth service failing.
+REJECTION_STATUS_CODES = (HTTP_401_UNAUTHORIZED, HTTP_403_FORBIDDEN)
+
+class CachedIdentity(CamelCaseModel):
+    """
+    The outcome of a token introspection: the user the token authenticates, or the reason it was rejected for.
+    """
+    user: UserAuthenticated | None = Field(description="The authenticated user, None if the token was rejected.")
+    status_code: int | None = Field(description="The status code the token was rejected with.")
+    detail: Any = Field(description="The reason the token was rejected for, as the auth service told it.")
+    expires_at: float = Field(description="The epoch time the outcome expires at.")
+
+    def resolve(self) -> UserAuthenticated:
+        """
+        Replays the introspection outcome.
+
+        Returns:
+            UserAuthenticated: the authenticated user.
+
+        Raises:
+            HTTPException: if the token was rejected.
+        """
+        if self.user is None:
+            raise HTTPException(status_code=self.status_code, detail=self.detail)
+
+        return self.user
+
+
+class TokenCache:
+    """
+    Two-tier cache of token introspections: an in-process LRU in front of redis, shared by the gateway instances.
+
+    Tokens are keyed by their hash, so that neither tier holds a usable credential.
+
+    Attributes:
+        redis (RedisConnector | None): the shared tier, None to cache in process only.
+        ttl (int): seconds a user is cached for, at most until its token expires.
+        negative_ttl (int): seconds a rejected token is cached for.
+        max_size (int): number of tokens the in-process tier holds at most.
+        clock (Callable[[], float]): returns the current epoch time.
+        identities (OrderedDict[str, CachedIdentity]): the in-process tier, by token hash, least recently used first.
+    """
+
+    def __init__(self,
+                 redis: RedisConnector | None,
+                 ttl: int,
+                 negative_ttl: int = 5,
+                 max_size: int = 10000,
+                 clock: Callable[[], float] = time.time,
+                 prefix: str = "auth-"):
+        self.redis = redis
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_size = max_size
+        self.clock = clock
+        self.prefix = prefix
+        self.identities: OrderedDict[str, CachedIdentity] = OrderedDict()
+
+    @staticmethod
+    def key(token: str) -> str:
+        """
+        Computes the cache key of a token.
+        """
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    async def get(self, token: str) -> CachedIdentity | None:
+        """
+        Looks a token up, in process first, then in redis.
+
+        Args:
+            token (str): the bearer token
+
+        Returns:
+            CachedIdentity | None: the introspection outcome, None if not cached or expired.
+        """
+        key = self.key(token)
+        now = self.clock()
+
+        if (identity := self.identities.get(key)) and identity.expires_at > now:
+            self.identities.move_to_end(key)
+            TOKEN_CACHE_LOOKUPS.labels(tier="memory", result="hit", app_name=app_name).inc()
+            return identity
+
+        self.identities.pop(key, None)
+        TOKEN_CACHE_LOOKUPS.labels(tier="memory", result="miss", app_name=app_name).inc()
+
+        if self.redis is None:
+            return None
+
+        try:
+            value = await self.redis.get(f"{self.prefix}{key}")
+        except RedisConnectionError:
+            log.warning("Token cache unavailable, skipping lookup.")
+            return None
+
+        if not value or (identity := CachedIdentity.parse_raw(value)).expires_at <= now:
+            TOKEN_CACHE_LOOKUPS.labels(tier="redis", result="miss", app_name=app_name).inc()
+            return None
+
+        TOKEN_CACHE_LOOKUPS.labels(tier="redis", result="hit", app_name=app_name).inc()
+        self.remember(key, identity)
+
+        return identity
+
+    async def set(self, token: str, user: UserAuthenticated | None = None,
+                  rejection: HTTPException | None = None) -> None:
+        """
+        Caches the user a token authenticates, until its token expires, or the rejection of an invalid token.
+
+        Args:
+            token (str): the bearer token
+            user (UserAuthenticated | None): the authenticated user
+            rejection (HTTPException | None): the error the token was rejected with
+        """
+        now = self.clock()
+        ttl = self.ttl if user else self.negative_ttl
+
+        if user and user.exp:
+            ttl = min(ttl, user.exp.timestamp() - now)
+
+        if ttl <= 0:
+            return
+
+        identity = CachedIdentity(user=user,
+                                  status_code=rejection.status_code if rejection else None,
+                                  detail=rejection.detail if rejection else None,
+                                  expires_at=now + ttl)
+        key = self.key(token)
+        self.remember(key, identity)
+
+        if self.redis is None:
+            return
+
+        try:
+            await self.redis.set(f"{self.prefix}{key}", identity.json(), expire=math.ceil(ttl))
+        except RedisConnectionError:
+            log.warning("Token cache unavailable, token was cached in process only.")
+
+    def remember(self, key: str, identity: CachedIdentity) -> None:
+        """
+        Caches an introspection outcome in process, evicting the least recently used ones beyond the maximum size.
+        """
+        self.identities[key] = identity
+        self.identities.move_to_end(key)
+
+        while len(self.identities) > self.max_size:
+            self.identities.popitem(last=False)
+
+
+async def introspect(token: str,
+                     cache: TokenCache | None,
+                     fetch: Callable[[], Awaitable[UserAuthenticated]]) -> UserAuthenticated:
+    """
+    Authenticates a token from the cache, asking the auth service and caching its answer on a miss.
+
+    Only the answers telling a token is invalid are cached as rejections: failures of the auth service are not.
+
+    Args:
+        token (str): the bearer token
+        cache (TokenCache | None): the token cache, None when caching is disabled
+        fetch (Callable[[], Awaitable[UserAuthenticated]]): asks the auth service
+
+    Returns:
+        UserAuthenticated: the authenticated user.
+
+    Raises:
+        HTTPException: if the token is invalid, or the auth service failed.
+    """
+    if cache is None:
+        return await fetch()
+
+    if identity := await cache.get(token):
+        return identity.resolve()
+
+    try:
+        user = await fetch()
+    except HTTPException as e:
+        if e.status_code in REJECTION_STATUS_CODES:
+            await cache.set(token, rejection=e)
+        raise
+
+    await cache.set(token, user=user)
+
+    return user
@@ -2,8 +2,9 @@
 Application settings module.
 """
 
-from pydantic import BaseSettings
+from pydantic import BaseSettings, root_validator
 
+from app.domain.models import Quota, RateLimitAlgorithm, RateLimitFailureMode
 from app.version import __version__
 
 
@@ -19,6 +20,17 @@ class ApplicationSettings(BaseSettings):
         * FASTAPI_PROJECT_NAME
         * FASTAPI_PROJECT_DESCRIPTION
         * FASTAPI_USE_LIMITER
+        * FASTAPI_LIMITER_ALGORITHM
+        * FASTAPI_LIMITER_APPROXIMATE
+        * FASTAPI_LIMITER_SYNC_INTERVAL
+        * FASTAPI_LIMITER_MAX_DRIFT
+        * FASTAPI_LIMITER_REFRESH_INTERVAL
+        * FASTAPI_LIMITER_BLOCKED_CLIENTS
+        * FASTAPI_LIMITER_QUOTAS
+        * FASTAPI_LIMITER_COSTS
+        * FASTAPI_LIMITER_FAILURE_MODE
+        * FASTAPI_LIMITER_PROBE_INTERVAL
+        * FASTAPI_USE_CACHE
         * FASTAPI_VERSION
         * FASTAPI_DOCS_URL
 
@@ -30,6 +42,24 @@ class ApplicationSettings(BaseSettings):
         USE_LIMITER (bool): Enable rate limiter.
         LIMITER_THRESHOLD (int): Number of requests allowed in the interval.
         LIMITER_INTERVAL (int): Interval in seconds.
+        LIMITER_ALGORITHM (RateLimitAlgorithm): Algorithm the requests of the interval are counted with.
+        LIMITER_APPROXIMATE (bool): Count requests in process and sync the counts with redis in batches, instead of
+            counting every request in redis.
+        LIMITER_SYNC_INTERVAL (float): Seconds between two syncs of the approximate counts.
+        LIMITER_MAX_DRIFT (int): Requests of a client an instance counts at most before syncing them, bounding how
+            many requests over the threshold each instance may let through.
+        LIMITER_REFRESH_INTERVAL (float): Seconds between two reads of the approximate counts of the clients without
+            requests since the last sync, which other instances may have counted requests of.
+        LIMITER_BLOCKED_CLIENTS (int): Clients which surpassed their rate limit remembered in process at most, to be
+            rejected without counting their requests until they may retry, 0 not to remember any.
+        LIMITER_QUOTAS (list[Quota]): Quotas of the requests matching a route, a user or a role, counted in fixed
+            windows, per user once authenticated. Requests matching none are limited by the threshold and interval.
+            Quotas are counted exactly, and cannot be set along approximate counting or another algorithm.
+        LIMITER_COSTS (dict[str, int]): Requests each request counts as, by method and route path template, e.g.
+            "POST /api/v1/schedules", 1 for the routes not listed.
+        LIMITER_FAILURE_MODE (RateLimitFailureMode): How requests are limited while redis is unavailable.
+        LIMITER_PROBE_INTERVAL (float): Seconds between two pings of redis while it is unavailable.
+        USE_CACHE (bool): Enable the query response cache.
         VERSION (str): Application version.
         DOCS_URL (str): Path where swagger ui will be served at.
     """
@@ -40,6 +70,17 @@ class ApplicationSettings(BaseSettings):
     USE_LIMITER: bool = False
     LIMITER_THRESHOLD: int = 10
     LIMITER_INTERVAL: int = 60
+    LIMITER_ALGORITHM: RateLimitAlgorithm = RateLimitAlgorithm.FIXED_WINDOW
+    LIMITER_APPROXIMATE: bool = False
+    LIMITER_SYNC_INTERVAL: float = 0.1
+    LIMITER_MAX_DRIFT: int = 10
+    LIMITER_REFRESH_INTERVAL: float = 1.0
+    LIMITER_BLOCKED_CLIENTS: int = 10000
+    LIMITER_QUOTAS: list[Quota] = []
+    LIMITER_COSTS: dict[str, int] = {}
+    LIMITER_FAILURE_MODE: RateLimitFailureMode = RateLimitFailureMode.OPEN
+    LIMITER_PROBE_INTERVAL: float = 1.0
+    USE_CACHE: bool = False
     VERSION: str = __version__
     DOCS_URL: str = "/docs"
     OTLP_GRPC_ENDPOINT: str = "localhost:4317"
@@ -48,6 +89,18 @@ class ApplicationSettings(BaseSettings):
     # All your additional application configuration should go either here or in
     # separate file in this submodule.
 
+    @root_validator(skip_on_failure=True)
+    def quotas_count_fixed_windows(cls, values: dict) -> dict:
+        """
+        Rejects quotas along the settings they cannot honor, rather than ignoring those.
+        """
+        if values.get("LIMITER_QUOTAS") and (values.get("LIMITER_APPROXIMATE")
+                                             or values.get("LIMITER_ALGORITHM") is not RateLimitAlgorithm.FIXED_WINDOW):
+            raise ValueError("LIMITER_QUOTAS are counted exactly in fixed windows, and cannot be set along "
+                             "LIMITER_APPROXIMATE or another LIMITER_ALGORITHM")
+
+        return values
+
     def get_app_name(self):
         return self.PROJECT_NAME.lower().replace(" ", "-").strip()
 
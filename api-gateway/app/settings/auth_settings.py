@@ -0,0 +1,66 @@
+"""Application configuration - Authentication."""
+
+from pydantic import BaseSettings
+
+
+class AuthSettings(BaseSettings):
+    """Define authentication configuration model.
+
+    Constructor will attempt to determine the values of any fields not passed
+    as keyword arguments by reading from the environment. Default values will
+    still be used if the matching environment variable is not set.
+
+    Tokens are verified by the gateway itself when it is given the secret or the key set they are signed with, and by
+    the auth service otherwise.
+
+    Environment variables:
+        * AUTH_JWT_SECRET
+        * AUTH_JWKS_URL
+        * AUTH_JWKS_REFRESH_INTERVAL
+        * AUTH_JWT_ALGORITHMS
+        * AUTH_JWT_LEEWAY
+        * AUTH_TOKEN_CACHE_TTL
+        * AUTH_TOKEN_CACHE_NEGATIVE_TTL
+        * AUTH_TOKEN_CACHE_SIZE
+
+    Attributes:
+        JWT_SECRET (str | None): Secret the auth service signs HMAC tokens with.
+        JWKS_URL (str | None): Url of the key set the auth service signs tokens with.
+        JWKS_REFRESH_INTERVAL (float): Seconds after which a token signed by an unknown key reloads the key set.
+        JWT_ALGORITHMS (list[str]): Accepted token signature algorithms, among HS256, HS384, HS512, RS256, RS384 and
+            RS512.
+        JWT_LEEWAY (int): Seconds a token is still accepted past its expiry, for clock skew.
+        TOKEN_CACHE_TTL (int): Seconds the auth service answer for a token is cached for, 0 not to cache it.
+        TOKEN_CACHE_NEGATIVE_TTL (int): Seconds the rejection of an invalid token is cached for.
+        TOKEN_CACHE_SIZE (int): Number of tokens cached in process at most.
+    """
+
+    JWT_SECRET: str | None = None
+    JWKS_URL: str | None = None
+    JWKS_REFRESH_INTERVAL: float = 300.0
+    JWT_ALGORITHMS: list[str] = ["HS256"]
+    JWT_LEEWAY: int = 0
+    TOKEN_CACHE_TTL: int = 0
+    TOKEN_CACHE_NEGATIVE_TTL: int = 5
+    TOKEN_CACHE_SIZE: int = 10000
+
+    @property
+    def verify_locally(self) -> bool:
+        """
+        Whether tokens are verified by the gateway.
+        """
+        return bool(self.JWT_SECRET or self.JWKS_URL)
+
+    class Config:
+        """Config subclass needed to customize BaseSettings settings.
+
+        Attributes:
+            case_sensitive (bool): When case_sensitive is True, the environment
+                variable names must match field names (optionally with a prefix)
+            env_prefix (str): The prefix for environment variable.
+
+        Resources:
+            https://pydantic-docs.helpmanual.io/usage/settings/
+        """
+        case_sensitive = True
+        env_prefix = "AUTH_"
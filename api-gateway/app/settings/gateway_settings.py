@@ -4,7 +4,7 @@ Gateway settings module.
 
 from pydantic import BaseConfig, BaseSettings
 
-from app.domain.models import Service
+from app.domain.models import Route, Service
 
 
 class GatewaySettings(BaseSettings):
@@ -16,15 +16,48 @@ class GatewaySettings(BaseSettings):
 
     Environment variables:
         * GATEWAY_SERVICES
+        * GATEWAY_SERVICES_FILE
+        * GATEWAY_SERVICES_WATCH_INTERVAL
         * GATEWAY_TIMEOUT
+        * GATEWAY_CACHE_TTLS
+        * GATEWAY_ROUTES
+        * GATEWAY_RETRY_BUDGET_RATIO
+        * GATEWAY_RETRY_BUDGET_MIN_PER_SECOND
+        * GATEWAY_BATCH_MAX_REQUESTS
+        * GATEWAY_BATCH_CONCURRENCY
 
     Attributes:
         SERVICES (Service): List of services to be proxied.
+        SERVICES_FILE (str | None): JSON file listing the services to be proxied instead, watched for changes.
+        SERVICES_WATCH_INTERVAL (float): Seconds between two checks of the services file.
         TIMEOUT (int): Timeout for requests.
+        CACHE_TTLS (dict[str, int]): Seconds the responses of each route are cached for, by route path.
+        ROUTES (list[Route]): Routes proxied as-is to the services, without a handler of their own.
+        RETRY_BUDGET_RATIO (float): Retries and hedged requests allowed per request, across every service.
+        RETRY_BUDGET_MIN_PER_SECOND (float): Retries and hedged requests allowed per second, whatever the traffic.
+        BATCH_MAX_REQUESTS (int): Requests allowed in a batch.
+        BATCH_CONCURRENCY (int): Requests of a batch run concurrently.
     """
     SERVICES: list[Service] = [Service(name="Auth",
                                        base_url="http://localhost:8000")]
+    SERVICES_FILE: str | None = None
+    SERVICES_WATCH_INTERVAL: float = 5.0
     TIMEOUT: int = 59
+    CACHE_TTLS: dict[str, int] = {
+        "/api/v1/schedules": 5,
+        "/api/v1/schedules/{schedule_id}": 5,
+        "/api/v1/users": 30,
+    }
+    ROUTES: list[Route] = [Route(path="/users/{username}",
+                                 service="auth",
+                                 upstream_path="/api/v1/users/{username}/",
+                                 cache_ttl=30,
+                                 summary="Find user by username",
+                                 tags=["Queries"])]
+    RETRY_BUDGET_RATIO: float = 0.2
+    RETRY_BUDGET_MIN_PER_SECOND: float = 10.0
+    BATCH_MAX_REQUESTS: int = 20
+    BATCH_CONCURRENCY: int = 5
 
     class Config(BaseConfig):
         """Config subclass needed to customize BaseSettings settings.
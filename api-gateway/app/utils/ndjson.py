@@ -0,0 +1,241 @@
+"""
+Streaming JSON decoding and newline-delimited JSON encoding.
+"""
+import codecs
+import json
+import re
+from typing import Any, AsyncIterable, AsyncIterator
+
+from app.utils.serializer import dumpb
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+WHITESPACE = " \t\n\r"
+# Values which raw_decode may decode from a prefix of theirs, and which are hence complete only once followed by more.
+DELIMITED = "\"{["
+# The characters which may end a delimited value, inside a string and outside of one.
+STRING_SPECIAL = re.compile(r'["\\]')
+STRUCTURAL = re.compile(r'["{}\[\]]')
+# The characters which may end a number or a literal.
+TOKEN_END = re.compile(r'[\s,\]}]')
+
+decoder = json.JSONDecoder()
+
+
+class InvalidStreamError(ValueError):
+    """
+    Raised when a streamed JSON document turns out invalid or truncated, possibly after some of its items were relayed.
+    """
+
+
+def skip_whitespace(buffer: str, position: int) -> int:
+    """
+    Finds the first position past the whitespaces at a position.
+
+    Args:
+        buffer (str): the text
+        position (int): the position to start from
+
+    Returns:
+        int: the position of the next non-whitespace character, or the buffer length.
+    """
+    while position < len(buffer) and buffer[position] in WHITESPACE:
+        position += 1
+
+    return position
+
+
+def expect(buffer: str, position: int, char: str) -> int:
+    """
+    Checks the character at a position.
+
+    Args:
+        buffer (str): the text
+        position (int): the position of the character
+        char (str): the expected character
+
+    Returns:
+        int: the position past the character.
+
+    Raises:
+        InvalidStreamError: if the character is not the expected one.
+    """
+    if buffer[position] != char:
+        raise InvalidStreamError(f"Expected '{char}' at '{buffer[position:position + 20]}'.")
+
+    return position + 1
+
+
+class ValueScanner:
+    """
+    Finds where a string, object or array ends as its text arrives, scanning each character once, so that the value
+    is decoded once it was received whole, rather than every time a chunk of it arrives.
+
+    Attributes:
+        scanned (int): the number of characters of the value scanned so far
+        depth (int): the number of objects and arrays open at the scanned position
+        in_string (bool): whether the scanned position is within a string
+    """
+
+    __slots__ = ("scanned", "depth", "in_string")
+
+    def __init__(self):
+        self.scanned = 0
+        self.depth = 0
+        self.in_string = False
+
+    def end(self, buffer: str, start: int) -> int | None:
+        """
+        Scans the characters of a value received since the last scan.
+
+        Args:
+            buffer (str): the text received so far
+            start (int): the position of the value
+
+        Returns:
+            int | None: the position past the value, None while it is incomplete.
+        """
+        position = start + self.scanned
+
+        while match := (STRING_SPECIAL if self.in_string else STRUCTURAL).search(buffer, position):
+            char, position = match.group(), match.end()
+
+            if char == "\\":
+                if position == len(buffer):
+                    # The escaped character is yet to arrive: scan the backslash again along with it.
+                    position -= 1
+                    break
+                position += 1
+            elif char == '"':
+                self.in_string = not self.in_string
+            else:
+                self.depth += 1 if char in "{[" else -1
+
+            if not self.in_string and self.depth == 0:
+                self.scanned = 0
+                return position
+        else:
+            position = len(buffer)
+
+        self.scanned = position - start
+        return None
+
+
+def decode_value(buffer: str, position: int, scanner: ValueScanner) -> tuple[Any, int] | None:
+    """
+    Decodes the JSON value at a position, if it was received whole.
+
+    Strings, objects and arrays are decoded once the scanner found their end, numbers and literals, which are short,
+    once a character which may end them follows them.
+
+    Args:
+        buffer (str): the text received so far
+        position (int): the position of the value
+        scanner (ValueScanner): the scanner of the value, kept from the previous chunks
+
+    Returns:
+        tuple[Any, int] | None: the value and the position past it, None while it is incomplete.
+
+    Raises:
+        InvalidStreamError: if the value is not valid JSON.
+    """
+    delimited = buffer[position] in DELIMITED
+
+    if delimited and scanner.end(buffer, position) is None:
+        return None
+
+    # A number or a literal was received whole once a character ending it arrived, which raw_decode needs not: it
+    # decodes "1" out of "1.", whose decimals are yet to arrive.
+    received = delimited or TOKEN_END.search(buffer, position) is not None
+
+    try:
+        value, end = decoder.raw_decode(buffer, position)
+    except json.JSONDecodeError as error:
+        if not received:
+            return None
+        raise InvalidStreamError(f"Invalid JSON value at '{buffer[position:position + 20]}'.") from error
+
+    if not delimited and not TOKEN_END.match(buffer, end):
+        if not received:
+            return None
+        raise InvalidStreamError(f"Invalid JSON value at '{buffer[position:position + 20]}'.")
+
+    return value, end
+
+
+async def iter_items(chunks: AsyncIterable[bytes], key: str = "data") -> AsyncIterator[Any]:
+    """
+    Decodes the items of the array under a key of a JSON object, as the chunks of the object arrive.
+
+    Only the item being decoded is buffered, so that the memory used does not grow with the array length, and the
+    first item is available as soon as it is received. The other members of the object are skipped.
+
+    Args:
+        chunks (AsyncIterable[bytes]): the UTF-8 encoded chunks of the JSON object
+        key (str): the key of the array
+
+    Yields:
+        Any: the next decoded item.
+
+    Raises:
+        InvalidStreamError: if the chunks are not a JSON object, or if it is truncated.
+    """
+    text = codecs.getincrementaldecoder("utf-8")()
+    scanner = ValueScanner()
+    buffer = ""
+    position = 0
+    state = "object"
+    member = None
+
+    async for chunk in chunks:
+        buffer = buffer[position:] + text.decode(chunk)
+        position = 0
+
+        while (position := skip_whitespace(buffer, position)) < len(buffer) and state != "done":
+            char = buffer[position]
+
+            if state == "object":
+                position = expect(buffer, position, "{")
+                state = "member"
+            elif state == "colon":
+                position = expect(buffer, position, ":")
+                state = "array" if member == key else "value"
+            elif state == "array":
+                position = expect(buffer, position, "[")
+                state = "item"
+            elif char == "," and state in ("member", "item"):
+                position += 1
+            elif char == "}" and state == "member":
+                position += 1
+                state = "done"
+            elif char == "]" and state == "item":
+                position += 1
+                state = "member"
+            elif (decoded := decode_value(buffer, position, scanner)) is None:
+                break
+            elif state == "member":
+                member, position = decoded
+                state = "colon"
+            elif state == "value":
+                position = decoded[1]
+                state = "member"
+            else:
+                item, position = decoded
+                yield item
+
+    if state != "done":
+        raise InvalidStreamError("Truncated JSON object.")
+
+
+async def ndjson(items: AsyncIterable[Any]) -> AsyncIterator[bytes]:
+    """
+    Encodes items as newline-delimited JSON, one line per item.
+
+    Args:
+        items (AsyncIterable[Any]): the JSON-encode-able items
+
+    Yields:
+        bytes: the next line.
+    """
+    async for item in items:
+        yield dumpb(item) + b"\n"
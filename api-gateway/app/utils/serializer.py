@@ -0,0 +1,85 @@
+"""
+JSON serialization, with orjson when it is installed and the standard library otherwise.
+"""
+import json
+from typing import Any, Callable
+
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def dumps(value: Any, *, default: Callable[[Any], Any] | None = None, **kwargs) -> str:
+    """
+    Encodes a value to JSON.
+
+    Matches the signature of `json.dumps`, so that it can be plugged as the pydantic `json_dumps`. The output is
+    compact whichever library encodes it. Formatting options are only supported by the standard library, which encodes
+    the value whenever some are given.
+
+    Args:
+        value (Any): the value to encode
+        default (Callable[[Any], Any] | None): encodes the values JSON does not support natively
+        **kwargs: `json.dumps` formatting options
+
+    Returns:
+        str: the encoded value.
+    """
+    return dumpb(value, default=default, **kwargs).decode()
+
+
+def dumpb(value: Any, *, default: Callable[[Any], Any] | None = None, **kwargs) -> bytes:
+    """
+    Encodes a value to UTF-8 encoded JSON, sparing the string round trip of `dumps` to responses.
+
+    Args:
+        value (Any): the value to encode
+        default (Callable[[Any], Any] | None): encodes the values JSON does not support natively
+        **kwargs: `json.dumps` formatting options
+
+    Returns:
+        bytes: the encoded value.
+    """
+    if kwargs:
+        return json.dumps(value, default=default, **kwargs).encode()
+
+    if orjson is None:
+        return json.dumps(value, default=default, separators=(",", ":"), ensure_ascii=False).encode()
+
+    return orjson.dumps(value, default=default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def loads(value: str | bytes) -> Any:
+    """
+    Decodes a JSON value.
+
+    Args:
+        value (str | bytes): the JSON value
+
+    Returns:
+        Any: the decoded value.
+    """
+    if orjson is None:
+        return json.loads(value)
+
+    return orjson.loads(value)
+
+
+class ModelResponse(JSONResponse):
+    """
+    JSON response, encoding models straight away.
+
+    Models are encoded by their own `json`, which applies the camel case aliases and leaves out unset optional members
+    of `CamelCaseModel`. Returned from an endpoint, it spares FastAPI validating the model again against the response
+    model, and walking it to make it JSON encode-able before encoding it.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.json().encode()
+
+        return dumpb(content)
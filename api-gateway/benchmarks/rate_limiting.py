@@ -0,0 +1,126 @@
+"""
+Benchmarks the rate limiting algorithms against a redis server.
+
+For each algorithm, measures the latency of counting a request, the round trips and the redis commands it takes, read
+from the server command statistics, and how many requests a burst straddling a window boundary gets through. The
+approximate mode, counting requests in process, is measured last, syncing every `--max-drift` requests of a client.
+
+The redis server is configured with the REDIS_* environment variables, and its keys prefixed with "bench-" are
+overwritten.
+
+Usage:
+    python -m benchmarks.rate_limiting [--requests 2000] [--threshold 100] [--window 1] [--max-drift 10]
+"""
+import argparse
+import asyncio
+import itertools
+import statistics
+import time
+from typing import Any
+
+from app.adapters.redis_connector import RedisClient
+from app.domain.models import RateLimitAlgorithm
+from app.service_layer.rate_limiter import RATE_LIMITERS, PreAggregatedRateLimiter, RateLimiter
+from app.settings.redis_config import RedisSettings
+
+
+class CountingRedis(RedisClient):
+    """
+    Redis client counting its round trips.
+    """
+
+    round_trips = 0
+
+    async def evalsha(self, sha: str, keys: list[str], args: list[str | int | float]) -> Any:
+        self.round_trips += 1
+        return await super().evalsha(sha, keys=keys, args=args)
+
+    async def script_load(self, script: str) -> str:
+        self.round_trips += 1
+        return await super().script_load(script)
+
+    async def incrby_many(self, increments: dict[str, int], expire: int) -> list[int]:
+        self.round_trips += 1
+        return await super().incrby_many(increments, expire=expire)
+
+
+async def commands(redis: RedisClient) -> int:
+    stats = await redis.redis_client.info("commandstats")
+    return sum(stat["calls"] for name, stat in stats.items() if name not in ("cmdstat_info", "cmdstat_evalsha"))
+
+
+async def latency(limiter: RateLimiter, redis: CountingRedis, requests: int) -> dict[str, float]:
+    keys = itertools.cycle([f"bench-{type(limiter).__name__}-{i}" for i in range(10)])
+    await limiter.hit(next(keys))
+    redis.round_trips, before = 0, await commands(redis)
+    samples = []
+
+    for _ in range(requests):
+        start = time.perf_counter()
+        await limiter.hit(next(keys))
+        samples.append(time.perf_counter() - start)
+
+    quantiles = statistics.quantiles(samples, n=100)
+
+    return {
+        "p50": quantiles[49] * 1000,
+        "p99": quantiles[98] * 1000,
+        "round trips": redis.round_trips / requests,
+        "commands": (await commands(redis) - before) / requests,
+    }
+
+
+async def boundary_burst(limiter: RateLimiter, window: int, threshold: int) -> int:
+    """
+    Starts a window, then bursts twice the threshold right before its end and again right after it.
+    """
+    key = f"bench-{type(limiter).__name__}-{time.time_ns()}"
+    await limiter.hit(key)
+    await asyncio.sleep(window * 0.9)
+    admitted = [(await limiter.hit(key)).allowed for _ in range(2 * threshold)]
+    await asyncio.sleep(window * 0.15)
+    admitted += [(await limiter.hit(key)).allowed for _ in range(2 * threshold)]
+
+    return sum(admitted)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threshold", type=int, default=100)
+    parser.add_argument("--window", type=int, default=1)
+    parser.add_argument("--max-drift", type=int, default=10)
+    parser.add_argument("--sync-interval", type=float, default=0.1)
+    args = parser.parse_args()
+
+    settings = RedisSettings()
+    redis = CountingRedis(url=settings.HOST, port=settings.PORT, username=settings.USERNAME,
+                          password=settings.PASSWORD)
+
+    print(f"Counting {args.requests} requests, limited to {args.threshold} per {args.window} s:")
+    print(f"  {'algorithm':<16} {'p50':>9} {'p99':>9} {'round trips':>12} {'commands':>9} {'burst admitted':>15}")
+
+    limiters: dict[str, RateLimiter] = {
+        algorithm.value: RATE_LIMITERS[algorithm](redis=redis, time_to_live=args.window, threshold=args.threshold)
+        for algorithm in RateLimitAlgorithm
+    }
+    limiters["approximate"] = PreAggregatedRateLimiter(redis=redis, time_to_live=args.window, threshold=args.threshold,
+                                                       max_drift=args.max_drift)
+
+    for name, limiter in limiters.items():
+        if isinstance(limiter, PreAggregatedRateLimiter):
+            syncer = asyncio.create_task(limiter.sync_forever(interval=args.sync_interval))
+
+        stats = await latency(limiter, redis=redis, requests=args.requests)
+        admitted = await boundary_burst(limiter, window=args.window, threshold=args.threshold)
+
+        if isinstance(limiter, PreAggregatedRateLimiter):
+            syncer.cancel()
+        print(f"  {name:<16} {stats['p50']:6.3f} ms {stats['p99']:6.3f} ms {stats['round trips']:12.2f} "
+              f"{stats['commands']:9.2f} {admitted:>15}")
+
+    await redis.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
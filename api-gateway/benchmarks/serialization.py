@@ -0,0 +1,96 @@
+"""
+Benchmarks the encoding of large schedule lists into responses.
+
+Compares FastAPI encoding a returned model against its response model, the way every endpoint did, with the gateway
+ModelResponse encoding the model straight away, with orjson and with the standard library.
+
+Usage:
+    python -m benchmarks.serialization [--meetings 1000] [--repeat 20]
+"""
+import argparse
+import asyncio
+import datetime
+import time
+from typing import Callable
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.domain.events.scheduler_service import MeetingScheduled, OptionVoted
+from app.domain.schemas import ResponseModels
+from app.utils import serializer
+from app.utils.serializer import ModelResponse
+
+
+def meetings(count: int) -> ResponseModels[MeetingScheduled]:
+    date = datetime.datetime(2023, 5, 3, 9, 30, tzinfo=datetime.timezone.utc)
+
+    return ResponseModels[MeetingScheduled](data=[
+        MeetingScheduled(id=str(i), organizer="johndoe", voting=True, title="Sprint Planning",
+                         description="Planning the next sprint.", location="Room 1", date=date,
+                         guests=[f"guest{j}" for j in range(10)],
+                         options=[OptionVoted(date=date + datetime.timedelta(hours=j), votes=["johndoe", "clarasmith"])
+                                  for j in range(5)])
+        for i in range(count)
+    ])
+
+
+def fastapi_encoding(model: ResponseModels[MeetingScheduled]) -> Callable[[], bytes]:
+    field = create_response_field(name="response", type_=ResponseModels[MeetingScheduled])
+
+    def encode() -> bytes:
+        content = asyncio.run(serialize_response(field=field, response_content=model, is_coroutine=True))
+        return JSONResponse(content=content).body
+
+    return encode
+
+
+def model_response_encoding(model: ResponseModels[MeetingScheduled], engine) -> Callable[[], bytes]:
+    def encode() -> bytes:
+        serializer.orjson = engine
+        return ModelResponse(content=model).body
+
+    return encode
+
+
+def measure(encode: Callable[[], bytes], repeat: int) -> float:
+    encode()
+    start = time.process_time()
+
+    for _ in range(repeat):
+        encode()
+
+    return (time.process_time() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--meetings", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    model = meetings(args.meetings)
+    orjson = serializer.orjson
+    encoders = {
+        "FastAPI response model": fastapi_encoding(model),
+        "ModelResponse, standard library": model_response_encoding(model, engine=None),
+        "ModelResponse, orjson": model_response_encoding(model, engine=orjson),
+    }
+
+    if orjson is None:
+        del encoders["ModelResponse, orjson"]
+
+    baseline = None
+    print(f"Encoding {args.meetings} meetings, CPU time per response:")
+
+    for name, encode in encoders.items():
+        seconds = measure(encode, repeat=args.repeat)
+        baseline = baseline or seconds
+        print(f"  {name:<32} {seconds * 1000:8.2f} ms  {baseline / seconds:5.1f}x")
+
+    serializer.orjson = orjson
+
+
+if __name__ == "__main__":
+    main()
@@ -7,9 +7,16 @@ import pytest
 import pytest_asyncio
 from starlette.testclient import TestClient
 
+from app.adapters.bulkhead import bulkheads
+from app.adapters.circuit_breaker import circuit_breakers
+from app.adapters.concurrency_limiter import concurrency_limiters
 from app.adapters.http_client import AiohttpClient, AsyncHttpClient
+from app.adapters.load_balancer import load_balancers
 from app.adapters.redis_connector import RedisClient
+from app.adapters.retry import latency_windows
+from app import dependencies, middleware
 from app.main import app
+from app.service_layer.rate_limiter import LocalRateLimiter, redis_probe
 
 
 class DependencyOverrider:
@@ -83,3 +90,21 @@ def fixture_headers() -> dict[str, str]:
     Create a dict with headers.
     """
     return {"Authorization": "Bearer eyThisIsAFakeToken"}
+
+
+@pytest.fixture(autouse=True)
+def reset_service_state() -> typing.Iterator[None]:
+    """
+    Forget the state kept for each service, so that a test does not leak into the next.
+    """
+    yield
+    bulkheads.clear()
+    circuit_breakers.clear()
+    concurrency_limiters.clear()
+    load_balancers.clear()
+    latency_windows.clear()
+    middleware.failed_authentications = LocalRateLimiter()
+    redis_probe.stop()
+    dependencies.rate_limiter = dependencies.quota_rate_limiter = dependencies.approximate_rate_limiter = None
+    dependencies.token_cache = None
+    dependencies.response_caches.clear()
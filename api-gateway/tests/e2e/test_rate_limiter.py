@@ -0,0 +1,200 @@
+"""
+Tests for the rate limited routes.
+"""
+from unittest import mock
+
+import pytest
+from fastapi import Depends, FastAPI
+from starlette.status import HTTP_200_OK, HTTP_429_TOO_MANY_REQUESTS
+from starlette.testclient import TestClient
+
+from app.adapters.token_verifier import TokenVerifier
+from app.dependencies import app_settings, get_authenticator, get_quota_rate_limiter, get_rate_limiter
+from app.domain.models import Quota, Role
+from app.middleware import RateLimitHeadersMiddleware, rate_limiter_middleware
+from app.service_layer.authenticator import LocalAuthenticator
+from app.service_layer.rate_limiter import QuotaRateLimiter, RateLimit, RateLimiter
+from app.utils.serializer import ModelResponse
+from tests.mocks import token_factory
+
+
+class FakeRateLimiter(RateLimiter):
+
+    def __init__(self, threshold: int):
+        self.threshold = threshold
+        self.counts: dict[str, int] = dict()
+
+    async def hit(self, identifier: str, cost: int = 1) -> RateLimit:
+        self.counts[identifier] = self.counts.get(identifier, 0) + cost
+        return RateLimit(limit=self.threshold, count=self.counts[identifier], reset_after=42.5)
+
+
+class FakeQuotaRateLimiter(QuotaRateLimiter):
+
+    def __init__(self, quotas: list[Quota]):
+        super().__init__(redis=None, quotas=quotas, time_to_live=60, threshold=100)
+        self.counts: dict[str, int] = dict()
+
+    async def hit(self, identifier: str, cost: int = 1, quotas: list[Quota] | None = None) -> RateLimit:
+        rate_limits = []
+
+        for quota in quotas or [self.default]:
+            key = f"{identifier}:{quota.key}"
+            self.counts[key] = self.counts.get(key, 0) + cost
+            rate_limits.append(RateLimit(limit=quota.threshold, count=self.counts[key], reset_after=quota.interval))
+
+        return min(rate_limits, key=lambda rate_limit: rate_limit.limit - rate_limit.count)
+
+
+class TestRateLimiter:
+    """
+    Tests for the rate limiter middleware.
+    """
+
+    @pytest.fixture
+    def limited_client(self):
+        app = FastAPI(dependencies=[Depends(rate_limiter_middleware)])
+        app.add_middleware(RateLimitHeadersMiddleware)
+        app.add_api_route("/ping", lambda: ModelResponse(content={"ping": "pong"}))
+        rate_limiter = FakeRateLimiter(threshold=2)
+        app.dependency_overrides = {get_rate_limiter: lambda: rate_limiter}
+        return TestClient(app)
+
+    def test_allowed_requests_tell_their_rate_limit(self, limited_client):
+        """
+        GIVEN a rate limited route
+        WHEN it is requested within the limit
+        THEN the response tells the remaining requests and when the window resets
+        """
+        # when
+        response = limited_client.get("/ping")
+
+        # then
+        assert response.status_code == HTTP_200_OK
+        assert response.headers["X-RateLimit-Limit"] == "2"
+        assert response.headers["X-RateLimit-Remaining"] == "1"
+        assert response.headers["X-RateLimit-Reset"] == "43"
+        assert "Retry-After" not in response.headers
+
+    def test_requests_beyond_limit_tell_when_to_retry(self, limited_client):
+        """
+        GIVEN a rate limited route
+        WHEN it is requested beyond the limit
+        THEN it is rejected, telling when to retry
+        """
+        # when
+        responses = [limited_client.get("/ping") for _ in range(3)]
+
+        # then
+        assert [response.status_code for response in responses] == [HTTP_200_OK, HTTP_200_OK,
+                                                                     HTTP_429_TOO_MANY_REQUESTS]
+        assert responses[-1].headers["Retry-After"] == "43"
+        assert responses[-1].headers["X-RateLimit-Remaining"] == "0"
+
+
+class TestQuotas:
+    """
+    Tests for the quotas of the rate limiter middleware.
+    """
+
+    @pytest.fixture
+    def quota_limiter(self) -> FakeQuotaRateLimiter:
+        return FakeQuotaRateLimiter(quotas=[Quota(role=Role.USER, route="/ping", threshold=1, interval=60),
+                                            Quota(route="/ping", methods=["POST"], threshold=2, interval=60)])
+
+    @pytest.fixture
+    def authenticator(self) -> LocalAuthenticator:
+        authenticator = LocalAuthenticator(verifier=TokenVerifier(secret="fake-secret"))
+        authenticator.authenticate = mock.AsyncMock(wraps=authenticator.authenticate)
+        return authenticator
+
+    @pytest.fixture
+    def limited_client(self, quota_limiter, authenticator, monkeypatch):
+        monkeypatch.setattr(app_settings, "LIMITER_COSTS", {"POST /ping": 2})
+        app = FastAPI(dependencies=[Depends(rate_limiter_middleware)])
+        app.add_middleware(RateLimitHeadersMiddleware)
+        app.add_api_route("/ping", lambda: ModelResponse(content={"ping": "pong"}), methods=["GET", "POST"])
+        app.add_api_route("/health", lambda: ModelResponse(content={"status": "UP"}))
+        app.dependency_overrides = {get_rate_limiter: lambda: FakeRateLimiter(threshold=100),
+                                    get_quota_rate_limiter: lambda: quota_limiter,
+                                    get_authenticator: lambda: authenticator}
+        return TestClient(app)
+
+    def test_users_of_one_host_have_quotas_of_their_own(self, limited_client):
+        """
+        GIVEN a quota of one request per user
+        WHEN two users behind the same host make a request each, and the first one another
+        THEN each user is allowed one request
+        """
+        # given
+        john, jane = ({"Authorization": f"Bearer {token_factory('fake-secret', username=username)}"}
+                      for username in ("johndoe", "janedoe"))
+
+        # when
+        responses = [limited_client.get("/ping", headers=headers) for headers in (john, jane, john)]
+
+        # then
+        assert [response.status_code for response in responses] == [HTTP_200_OK, HTTP_200_OK,
+                                                                     HTTP_429_TOO_MANY_REQUESTS]
+        assert responses[-1].headers["X-RateLimit-Limit"] == "1"
+
+    def test_heavy_route_consumes_more_quota(self, limited_client, quota_limiter):
+        """
+        GIVEN a route costing two requests, limited to two requests
+        WHEN an anonymous client requests it twice
+        THEN the second request is rejected
+        """
+        # when
+        responses = [limited_client.post("/ping") for _ in range(2)]
+
+        # then
+        assert [response.status_code for response in responses] == [HTTP_200_OK, HTTP_429_TOO_MANY_REQUESTS]
+        assert responses[0].headers["X-RateLimit-Remaining"] == "0"
+        assert all(key.startswith("rate-{host:") for key in quota_limiter.counts)
+
+    def test_invalid_token_is_counted_as_anonymous(self, limited_client, quota_limiter):
+        """
+        GIVEN a route not requiring authentication
+        WHEN it is requested with a forged token
+        THEN the request is counted against the quotas of its host
+        """
+        # when
+        response = limited_client.get("/ping", headers={"Authorization": f"Bearer {token_factory('forged-secret')}"})
+
+        # then
+        assert response.status_code == HTTP_200_OK
+        assert response.headers["X-RateLimit-Limit"] == "100"
+        assert all(key.startswith("rate-{host:") for key in quota_limiter.counts)
+
+    def test_route_without_user_quota_is_not_authenticated(self, limited_client, authenticator, quota_limiter):
+        """
+        GIVEN a route which no quota of a user or a role matches
+        WHEN it is requested with a token
+        THEN the token is not authenticated, the request counting against the quotas of its host
+        """
+        # when
+        response = limited_client.get("/health", headers={"Authorization": f"Bearer {token_factory('fake-secret')}"})
+
+        # then
+        assert response.status_code == HTTP_200_OK
+        authenticator.authenticate.assert_not_awaited()
+        assert all(key.startswith("rate-{host:") for key in quota_limiter.counts)
+
+    def test_forged_tokens_are_rejected_before_authentication(self, limited_client, authenticator, quota_limiter):
+        """
+        GIVEN a host allowed two requests by the default quota
+        WHEN it sends three requests with forged tokens
+        THEN the third one is rejected without its token being authenticated
+        """
+        # given
+        quota_limiter.default = Quota(threshold=2, interval=60)
+        headers = {"Authorization": f"Bearer {token_factory('forged-secret')}"}
+
+        # when
+        responses = [limited_client.get("/ping", headers=headers) for _ in range(3)]
+
+        # then
+        assert [response.status_code for response in responses] == [HTTP_200_OK, HTTP_200_OK,
+                                                                     HTTP_429_TOO_MANY_REQUESTS]
+        assert authenticator.authenticate.await_count == 2
+        assert "Retry-After" in responses[-1].headers
@@ -18,6 +18,7 @@ from app.domain.commands.auth_service import AuthenticateUser, RegisterUser
 from app.domain.events.auth_service import TokenGenerated, UserRegistered
 from app.domain.models import Service
 from app.domain.schemas import ResponseModel, ResponseModels
+from app.service_layer.service_registry import ServiceRegistry
 from tests.conftest import DependencyOverrider
 
 fake_auth_base_url = "http://fake-auth:8000"
@@ -48,7 +49,7 @@ class TestAuthServiceGateway:
             yield mock
 
     overrides: dict[Callable, Callable] = {
-        get_services: lambda: [Service(name="auth", base_url=fake_auth_base_url)],
+        get_services: lambda: ServiceRegistry([Service(name="auth", base_url=fake_auth_base_url)]),
     }
 
 
@@ -108,7 +109,7 @@ class TestAuthQueries(TestAuthServiceGateway):
         # given
         username = "johndoe"
         fake_web.get(f"{fake_auth_base_url}/api/v1/users/{username}/", status=error_status,
-                     payload=dict())
+                     payload=dict(), repeat=True)
         self.overrides[get_async_http_client] = lambda: aio_http_client
 
         with DependencyOverrider(self.overrides):
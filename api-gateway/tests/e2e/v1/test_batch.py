@@ -0,0 +1,109 @@
+"""
+Tests for the batch entrypoint.
+"""
+from typing import Callable
+
+import pytest
+from aioresponses import aioresponses
+from starlette.status import HTTP_200_OK, HTTP_404_NOT_FOUND, HTTP_422_UNPROCESSABLE_ENTITY
+
+from app.dependencies import get_async_http_client, get_services
+from app.domain.models import Service
+from app.service_layer.service_registry import ServiceRegistry
+from app.utils.formatter import to_jsonable_dict
+from tests.conftest import DependencyOverrider
+from tests.e2e.v1.test_scheduler_service import fake_schedule_response
+from tests.mocks import user_registered_factory
+
+FAKE_SCHEDULER_URL = "http://fake-scheduler-service:8001"
+FAKE_AUTH_URL = "http://fake-auth-service:8002"
+
+
+class TestBatch:
+    """
+    Tests for the batch entrypoint.
+    """
+
+    BATCH_PATH = "/api/v1/batch"
+
+    @pytest.fixture
+    def fake_web(self):
+        with aioresponses() as mock:
+            yield mock
+
+    overrides: dict[Callable, Callable] = {
+        get_services: lambda: ServiceRegistry([Service(name="scheduler", base_url=FAKE_SCHEDULER_URL),
+                                               Service(name="auth", base_url=FAKE_AUTH_URL),
+                                               ]),
+    }
+
+    def test_sub_requests_are_answered_in_order(self, test_client, fake_web, aio_http_client):
+        """
+        GIVEN a batch of queries to different services
+        WHEN the batch is run
+        THEN every response is answered, in the order of the requests
+        """
+        # given
+        fake_web.get(f"{FAKE_SCHEDULER_URL}/api/v1/schedules", status=HTTP_200_OK, payload={"data": []})
+        fake_web.get(f"{FAKE_AUTH_URL}/api/v1/users/nobody/", status=HTTP_404_NOT_FOUND,
+                     payload={"detail": "User not found."})
+        batch = {"requests": [
+            {"id": "schedules", "path": "/api/v1/schedules"},
+            {"id": "user", "path": "/api/v1/users/nobody"},
+        ]}
+
+        with DependencyOverrider({**self.overrides, get_async_http_client: lambda: aio_http_client}):
+            # when
+            response = test_client.post(self.BATCH_PATH, json=batch)
+
+        # then
+        assert response.status_code == HTTP_200_OK
+        assert response.json()["data"] == [
+            {"id": "schedules", "status": HTTP_200_OK, "headers": {"content-type": "application/json"},
+             "body": {"data": []}},
+            {"id": "user", "status": HTTP_404_NOT_FOUND, "headers": {"content-type": "application/json"},
+             "body": {"detail": "User not found."}},
+        ]
+
+    def test_token_is_authenticated_once(self, test_client, fake_web, aio_http_client, auth_headers):
+        """
+        GIVEN a batch of commands requiring authentication
+        WHEN the batch is run with a bearer token
+        THEN the token is authenticated once, for every command
+        """
+        # given
+        fake_web.get(f"{FAKE_AUTH_URL}/api/v1/auth/me",
+                     payload={"data": to_jsonable_dict(user_registered_factory(username="johndoe"))})
+        for meeting_id in ("1", "2"):
+            fake_web.patch(f"{FAKE_SCHEDULER_URL}/api/v1/schedules/{meeting_id}/voting",
+                           payload=fake_schedule_response(meeting_id=meeting_id))
+        batch = {"requests": [
+            {"method": "patch", "path": f"/api/v1/schedules/{meeting_id}/voting", "body": {"voting": True}}
+            for meeting_id in ("1", "2")
+        ]}
+
+        with DependencyOverrider({**self.overrides, get_async_http_client: lambda: aio_http_client}):
+            # when
+            response = test_client.post(self.BATCH_PATH, json=batch, headers=auth_headers)
+
+        # then
+        assert response.status_code == HTTP_200_OK
+        assert [sub_response["status"] for sub_response in response.json()["data"]] == [HTTP_200_OK] * 2
+        assert [sub_response["body"]["data"]["id"] for sub_response in response.json()["data"]] == ["1", "2"]
+
+    @pytest.mark.parametrize("batch", [
+        {"requests": []},
+        {"requests": [{"path": "/api/v1/batch"}]},
+        {"requests": [{"path": "/api/v1/schedules"}] * 21},
+    ])
+    def test_invalid_batch_is_rejected(self, test_client, batch):
+        """
+        GIVEN an empty batch, a nested batch, or a batch too large
+        WHEN the batch is run
+        THEN it is rejected
+        """
+        # when
+        response = test_client.post(self.BATCH_PATH, json=batch)
+
+        # then
+        assert response.status_code == HTTP_422_UNPROCESSABLE_ENTITY
@@ -0,0 +1,149 @@
+"""
+Tests for the proxied routes.
+"""
+import pytest
+from aioresponses import CallbackResult, aioresponses
+from fastapi import APIRouter, FastAPI
+from starlette.status import HTTP_200_OK, HTTP_201_CREATED, HTTP_403_FORBIDDEN
+from starlette.testclient import TestClient
+from yarl import URL
+
+from app.dependencies import app_settings, get_async_http_client, get_redis, get_services
+from app.domain.models import Route, Service
+from app.entrypoints.v1.proxy import compile_routes
+from app.service_layer.service_registry import ServiceRegistry
+from app.utils.formatter import to_jsonable_dict
+from tests.mocks import FakeRedis, user_registered_factory
+
+FAKE_SCHEDULER_URL = "http://fake-scheduler-service:8001"
+FAKE_AUTH_URL = "http://fake-auth-service:8002"
+
+
+class TestProxy:
+    """
+    Tests for the routes compiled from the gateway route table.
+    """
+
+    ROUTES = [
+        Route(path="/meetings/{meeting_id}/notes", service="scheduler", upstream_path="/api/v1/notes/{meeting_id}"),
+        Route(path="/meetings/{meeting_id}/notes", methods=["post"], service="scheduler", auth=True),
+        Route(path="/meetings/{meeting_id}/drafts", service="scheduler", auth=True, cache_ttl=60),
+    ]
+
+    @pytest.fixture
+    def fake_web(self):
+        with aioresponses() as mock:
+            yield mock
+
+    @pytest.fixture
+    def proxy_client(self, aio_http_client):
+        redis = FakeRedis()
+        api = APIRouter(prefix="/api/v1")
+        api.include_router(compile_routes(self.ROUTES))
+        app = FastAPI()
+        app.include_router(api)
+        app.dependency_overrides = {
+            get_services: lambda: ServiceRegistry([Service(name="scheduler", base_url=FAKE_SCHEDULER_URL),
+                                                   Service(name="auth", base_url=FAKE_AUTH_URL),
+                                                   ]),
+            get_async_http_client: lambda: aio_http_client,
+            get_redis: lambda: redis,
+        }
+        return TestClient(app)
+
+    def test_query_is_relayed_to_upstream_path(self, proxy_client, fake_web):
+        """
+        GIVEN a proxied route with an upstream path template
+        WHEN it is requested with path and query parameters
+        THEN the upstream path is requested with them, and its response relayed as-is
+        """
+        # given
+        fake_web.get(f"{FAKE_SCHEDULER_URL}/api/v1/notes/1?page=2", payload={"data": ["note"]})
+
+        # when
+        response = proxy_client.get("/api/v1/meetings/1/notes", params={"page": 2})
+
+        # then
+        assert response.status_code == HTTP_200_OK
+        assert response.json() == {"data": ["note"]}
+
+    def test_path_parameters_are_quoted_upstream(self, proxy_client, fake_web):
+        """
+        GIVEN a proxied route with an upstream path template
+        WHEN it is requested with a path parameter holding an encoded question mark and fragment
+        THEN the parameter is requested upstream still encoded, rather than as a query
+        """
+        # given
+        fake_web.get(f"{FAKE_SCHEDULER_URL}/api/v1/notes/1%3Fadmin%231", payload={"data": ["note"]})
+
+        # when
+        response = proxy_client.get("/api/v1/meetings/1%3Fadmin%231/notes")
+
+        # then
+        assert response.status_code == HTTP_200_OK
+        [(method, url)] = fake_web.requests
+        assert url.raw_path == "/api/v1/notes/1%3Fadmin%231"
+        assert not url.query
+
+    def test_authenticated_route_relays_the_body(self, proxy_client, fake_web, auth_headers):
+        """
+        GIVEN a proxied route requiring authentication
+        WHEN it is requested with a valid token and a body
+        THEN the body is relayed to the same path upstream
+        """
+        # given
+        fake_web.get(f"{FAKE_AUTH_URL}/api/v1/auth/me",
+                     payload={"data": to_jsonable_dict(user_registered_factory(username="johndoe"))})
+        fake_web.post(f"{FAKE_SCHEDULER_URL}/api/v1/meetings/1/notes", status=HTTP_201_CREATED,
+                      payload={"data": "created"})
+
+        # when
+        response = proxy_client.post("/api/v1/meetings/1/notes", json={"text": "note"}, headers=auth_headers)
+
+        # then
+        assert response.status_code == HTTP_201_CREATED
+        [call] = fake_web.requests[("POST", URL(f"{FAKE_SCHEDULER_URL}/api/v1/meetings/1/notes"))]
+        assert call.kwargs["data"] == b'{"text": "note"}'
+
+    def test_authenticated_route_rejects_anonymous_requests(self, proxy_client, fake_web):
+        """
+        GIVEN a proxied route requiring authentication
+        WHEN it is requested without a token
+        THEN it is rejected, without reaching the service
+        """
+        # when
+        response = proxy_client.post("/api/v1/meetings/1/notes", json={"text": "note"})
+
+        # then
+        assert response.status_code == HTTP_403_FORBIDDEN
+        assert not fake_web.requests
+
+    def test_cached_authenticated_route_is_cached_per_user(self, proxy_client, fake_web, monkeypatch):
+        """
+        GIVEN a cached proxied route requiring authentication, whose responses depend on the user
+        WHEN two users request it, then the first one again
+        THEN each user gets their own response, the first one from the cache
+        """
+        # given
+        monkeypatch.setattr(app_settings, "USE_CACHE", True)
+        users = {"Bearer johns-token": "johndoe", "Bearer janes-token": "janedoe"}
+
+        def me(url, headers, **kwargs) -> CallbackResult:
+            user = user_registered_factory(username=users[headers["Authorization"]])
+            return CallbackResult(payload={"data": to_jsonable_dict(user)})
+
+        def drafts(url, headers, **kwargs) -> CallbackResult:
+            return CallbackResult(payload={"data": [f"{users[headers['authorization']]}'s draft"]})
+
+        fake_web.get(f"{FAKE_AUTH_URL}/api/v1/auth/me", callback=me, repeat=True)
+        fake_web.get(f"{FAKE_SCHEDULER_URL}/api/v1/meetings/1/drafts", callback=drafts, repeat=True)
+
+        # when
+        responses = [proxy_client.get("/api/v1/meetings/1/drafts", headers={"Authorization": authorization})
+                     for authorization in ["Bearer johns-token", "Bearer janes-token", "Bearer johns-token"]]
+
+        # then
+        assert [response.json()["data"] for response in responses] == [["johndoe's draft"], ["janedoe's draft"],
+                                                                        ["johndoe's draft"]]
+        [calls] = [calls for (method, url), calls in fake_web.requests.items() if url.path.endswith("/drafts")]
+        assert len(calls) == 2
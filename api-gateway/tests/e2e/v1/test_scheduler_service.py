@@ -2,20 +2,26 @@
 Tests for the scheduler service gateway.
 """
 import datetime
+import json
 from typing import Any, Callable
 import uuid
 
 from aioresponses import aioresponses
 import pytest
 from starlette.status import HTTP_200_OK, HTTP_201_CREATED, HTTP_401_UNAUTHORIZED, HTTP_403_FORBIDDEN, \
-    HTTP_404_NOT_FOUND, HTTP_503_SERVICE_UNAVAILABLE
+    HTTP_304_NOT_MODIFIED, HTTP_404_NOT_FOUND, HTTP_422_UNPROCESSABLE_ENTITY, HTTP_503_SERVICE_UNAVAILABLE
 
-from app.dependencies import get_async_http_client, get_services
+from app.adapters.token_verifier import TokenVerifier
+from app.dependencies import app_settings, get_async_http_client, get_authenticator, get_redis, get_services, \
+    get_token_cache
 from app.domain.commands.scheduler_service import ProposeOption, ToggleVoting, VoteOption
 from app.domain.models import Service
+from app.service_layer.authenticator import LocalAuthenticator
+from app.service_layer.service_registry import ServiceRegistry
+from app.service_layer.token_cache import TokenCache
 from app.utils.formatter import to_jsonable_dict
 from tests.conftest import DependencyOverrider
-from tests.mocks import schedule_command_factory, user_registered_factory
+from tests.mocks import FakeRedis, schedule_command_factory, token_factory, user_registered_factory
 
 FAKE_SCHEDULER_URL = "http://fake-scheduler-service:8001"
 FAKE_AUTH_URL = "http://fake-auth-service:8002"
@@ -58,9 +64,9 @@ class TestSchedulerServiceGateway:
             yield mock
 
     overrides: dict[Callable, Callable] = {
-        get_services: lambda: [Service(name="scheduler", base_url=FAKE_SCHEDULER_URL),
-                               Service(name="auth", base_url=FAKE_AUTH_URL),
-                               ],
+        get_services: lambda: ServiceRegistry([Service(name="scheduler", base_url=FAKE_SCHEDULER_URL),
+                                               Service(name="auth", base_url=FAKE_AUTH_URL),
+                                               ]),
     }
 
 
@@ -81,6 +87,64 @@ class TestSchedulerQueries(TestSchedulerServiceGateway):
             # then
             assert response.status_code == HTTP_200_OK
 
+    def test_get_schedules_relays_service_body(self, test_client, fake_web, aio_http_client):
+        """
+        GIVEN a request to get all schedules, and a working service
+        WHEN the request is made
+        THEN the service body is relayed untouched.
+        """
+        body = fake_schedule_response(meeting_id="1")
+        fake_web.get(f"{FAKE_SCHEDULER_URL}/api/v1/schedules", payload={"data": [body["data"]]}, status=HTTP_200_OK)
+        self.overrides[get_async_http_client] = lambda: aio_http_client
+
+        with DependencyOverrider(self.overrides):
+            # when
+            response = test_client.get("/api/v1/schedules")
+            # then
+            assert response.status_code == HTTP_200_OK
+            assert response.json() == {"data": [body["data"]]}
+
+    def test_get_schedules_as_ndjson(self, test_client, fake_web, aio_http_client):
+        """
+        GIVEN a request to get all schedules, accepting newline-delimited JSON
+        WHEN the request is made
+        THEN every schedule is sent on a line of its own.
+        """
+        schedules = [fake_schedule_response(meeting_id=meeting_id)["data"] for meeting_id in ("1", "2")]
+        fake_web.get(f"{FAKE_SCHEDULER_URL}/api/v1/schedules", payload={"data": schedules}, status=HTTP_200_OK)
+        self.overrides[get_async_http_client] = lambda: aio_http_client
+
+        with DependencyOverrider(self.overrides):
+            # when
+            response = test_client.get("/api/v1/schedules", headers={"Accept": "application/x-ndjson"})
+            # then
+            assert response.status_code == HTTP_200_OK
+            assert response.headers["content-type"] == "application/x-ndjson"
+            assert [json.loads(line) for line in response.text.splitlines()] == schedules
+
+    def test_get_schedule_by_id_is_cached(self, test_client, fake_web, aio_http_client, monkeypatch):
+        """
+        GIVEN a request to get a schedule by id, and the response cache enabled
+        WHEN the request is made twice
+        THEN the service is contacted once, and an up-to-date client gets Not Modified.
+        """
+        monkeypatch.setattr(app_settings, "USE_CACHE", True)
+        fake_web.get(f"{FAKE_SCHEDULER_URL}/api/v1/schedules/1",
+                     payload=fake_schedule_response(meeting_id="1"),
+                     status=HTTP_200_OK)
+        self.overrides[get_async_http_client] = lambda: aio_http_client
+        redis = FakeRedis()
+
+        with DependencyOverrider({**self.overrides, get_redis: lambda: redis}):
+            # when
+            first = test_client.get("/api/v1/schedules/1")
+            second = test_client.get("/api/v1/schedules/1")
+            revalidated = test_client.get("/api/v1/schedules/1", headers={"If-None-Match": first.headers["etag"]})
+            # then
+            assert first.status_code == second.status_code == HTTP_200_OK
+            assert first.json() == second.json()
+            assert revalidated.status_code == HTTP_304_NOT_MODIFIED
+
     def test_service_unavailable(self, test_client, fake_web, aio_http_client):
         """
         GIVEN a request to get all schedules, and a service that is not available
@@ -130,6 +194,64 @@ class TestSchedulerQueries(TestSchedulerServiceGateway):
             # then
             assert response.status_code == HTTP_404_NOT_FOUND
 
+    def test_get_schedules_expands_users_at_once(self, test_client, fake_web, aio_http_client):
+        """
+        GIVEN schedules sharing an organizer, with guests
+        WHEN they are requested with their organizer and guests expanded
+        THEN the users are looked up with a single request, and embedded in the schedules.
+        """
+        fake_web.get(f"{FAKE_SCHEDULER_URL}/api/v1/schedules", status=HTTP_200_OK, payload={"data": [
+            fake_schedule_response(meeting_id="1", guests=["janedoe"])["data"],
+            fake_schedule_response(meeting_id="2", guests=["unknown"])["data"],
+        ]})
+        users = [to_jsonable_dict(user_registered_factory(username)) for username in ("janedoe", "johndoe")]
+        fake_web.get(f"{FAKE_AUTH_URL}/api/v1/users?usernames=janedoe,johndoe,unknown", payload={"data": users})
+        self.overrides[get_async_http_client] = lambda: aio_http_client
+
+        with DependencyOverrider(self.overrides):
+            # when
+            response = test_client.get("/api/v1/schedules", params={"expand": "organizer,guests"})
+            # then
+            assert response.status_code == HTTP_200_OK
+            [first, second] = response.json()["data"]
+            assert first["organizer"]["username"] == second["organizer"]["username"] == "johndoe"
+            assert first["guests"][0]["username"] == "janedoe"
+            assert second["guests"] == ["unknown"]
+            assert len([url for method, url in fake_web.requests if url.host == "fake-auth-service"]) == 1
+
+    def test_get_schedule_by_id_expands_organizer(self, test_client, fake_web, aio_http_client):
+        """
+        GIVEN a schedule with guests
+        WHEN it is requested with its organizer expanded
+        THEN the organizer is embedded, and the guests are left as usernames.
+        """
+        fake_web.get(f"{FAKE_SCHEDULER_URL}/api/v1/schedules/1",
+                     payload=fake_schedule_response(meeting_id="1", guests=["janedoe"]),
+                     status=HTTP_200_OK)
+        fake_web.get(f"{FAKE_AUTH_URL}/api/v1/users?usernames=johndoe",
+                     payload={"data": [to_jsonable_dict(user_registered_factory("johndoe"))]})
+        self.overrides[get_async_http_client] = lambda: aio_http_client
+
+        with DependencyOverrider(self.overrides):
+            # when
+            response = test_client.get("/api/v1/schedules/1", params={"expand": "organizer"})
+            # then
+            assert response.status_code == HTTP_200_OK
+            assert response.json()["data"]["organizer"]["username"] == "johndoe"
+            assert response.json()["data"]["guests"] == ["janedoe"]
+
+    def test_get_schedules_rejects_unknown_expansion(self, test_client):
+        """
+        GIVEN a request to get all schedules
+        WHEN it expands a field which is not a user
+        THEN it is rejected.
+        """
+        with DependencyOverrider(self.overrides):
+            # when
+            response = test_client.get("/api/v1/schedules", params={"expand": "options"})
+            # then
+            assert response.status_code == HTTP_422_UNPROCESSABLE_ENTITY
+
 
 class TestSchedulerCommands(TestSchedulerServiceGateway):
 
@@ -163,6 +285,47 @@ class TestSchedulerCommands(TestSchedulerServiceGateway):
             # then
             assert response.status_code == HTTP_201_CREATED
 
+    def test_schedule_meeting_verifies_token_locally(self, test_client, fake_web, aio_http_client):
+        """
+        GIVEN the gateway knows the secret tokens are signed with
+        WHEN a request to schedule a meeting is made
+        THEN the organizer is authenticated without contacting the auth service
+        """
+        command = schedule_command_factory(title="Meeting with the team")
+        authenticator = LocalAuthenticator(verifier=TokenVerifier(secret="fake-secret"))
+
+        fake_web.post(f"{FAKE_SCHEDULER_URL}/api/v1/schedules",
+                      payload=fake_schedule_response(meeting_id="1"),
+                      status=HTTP_201_CREATED)
+
+        self.overrides[get_async_http_client] = lambda: aio_http_client
+
+        with DependencyOverrider({**self.overrides, get_authenticator: lambda: authenticator}):
+            # when
+            response = test_client.post("/api/v1/schedules",
+                                        headers={"Authorization": f"Bearer {token_factory('fake-secret')}"},
+                                        json=to_jsonable_dict(command))
+            # then
+            assert response.status_code == HTTP_201_CREATED
+            assert all(url.path != "/api/v1/auth/me" for _, url in fake_web.requests)
+
+    def test_schedule_meeting_rejects_forged_token(self, test_client, fake_web, aio_http_client):
+        """
+        GIVEN the gateway knows the secret tokens are signed with
+        WHEN a request to schedule a meeting is made with a token signed otherwise
+        THEN it is unauthorized
+        """
+        authenticator = LocalAuthenticator(verifier=TokenVerifier(secret="fake-secret"))
+        self.overrides[get_async_http_client] = lambda: aio_http_client
+
+        with DependencyOverrider({**self.overrides, get_authenticator: lambda: authenticator}):
+            # when
+            response = test_client.post("/api/v1/schedules",
+                                        headers={"Authorization": f"Bearer {token_factory('forged-secret')}"},
+                                        json=to_jsonable_dict(schedule_command_factory()))
+            # then
+            assert response.status_code == HTTP_401_UNAUTHORIZED
+
     def test_scheduling_meeting_with_organizer_not_found(self, test_client, fake_web, aio_http_client, auth_headers):
         """
         GIVEN a request to schedule a meeting, with invalid organizer
@@ -217,6 +380,37 @@ class TestSchedulerCommands(TestSchedulerServiceGateway):
             # then
             assert response.status_code == HTTP_200_OK
 
+    def test_toggle_voting_twice_authenticates_once(self, test_client, fake_web, aio_http_client, auth_headers):
+        """
+        GIVEN the auth service answers are cached
+        WHEN two requests with the same token are made
+        THEN the auth service is asked once
+        """
+        command = ToggleVoting()
+
+        fake_web.get(f"{FAKE_AUTH_URL}/api/v1/auth/me",
+                     payload={"data": to_jsonable_dict(user_registered_factory(username="johndoe"))},
+                     status=HTTP_200_OK,
+                     headers=auth_headers,
+                     )
+        fake_web.patch(f"{FAKE_SCHEDULER_URL}/api/v1/schedules/1/voting",
+                       payload=fake_schedule_response(meeting_id="1"),
+                       status=HTTP_200_OK,
+                       repeat=True)
+
+        self.overrides[get_async_http_client] = lambda: aio_http_client
+        token_cache = TokenCache(redis=FakeRedis(), ttl=60)
+
+        with DependencyOverrider({**self.overrides, get_token_cache: lambda: token_cache}):
+            # when
+            responses = [test_client.patch("/api/v1/schedules/1/voting",
+                                           json=to_jsonable_dict(command),
+                                           headers=auth_headers) for _ in range(2)]
+            # then
+            assert [response.status_code for response in responses] == [HTTP_200_OK, HTTP_200_OK]
+            assert sum(len(calls) for (method, url), calls in fake_web.requests.items()
+                       if url.path == "/api/v1/auth/me") == 1
+
     def test_toggle_voting_not_found(self, test_client, fake_web, aio_http_client, auth_headers):
         """
         GIVEN a request to toggle voting for an invalid schedule
@@ -0,0 +1,141 @@
+"""
+Test for the local authenticator service layer
+"""
+import base64
+
+import pytest
+from aioresponses import aioresponses
+from starlette.status import HTTP_200_OK, HTTP_503_SERVICE_UNAVAILABLE
+
+from app.adapters.token_verifier import InvalidTokenError, TokenVerifier, UnknownKeyError
+from app.service_layer.authenticator import LocalAuthenticator
+from tests.mocks import token_factory
+
+JWKS_URL = "http://fake-auth/.well-known/jwks.json"
+
+
+def key_set(**secrets: str) -> dict:
+    return {"keys": [{"kty": "oct", "kid": kid, "k": base64.urlsafe_b64encode(secret.encode()).rstrip(b"=").decode()}
+                     for kid, secret in secrets.items()]}
+
+
+class TestLocalAuthenticator:
+
+    @pytest.fixture
+    def fake_web(self):
+        with aioresponses() as mock:
+            yield mock
+
+    @pytest.fixture
+    def clock(self):
+        class FakeClock:
+            now = 1000.0
+
+            def __call__(self) -> float:
+                return self.now
+
+        return FakeClock()
+
+    @pytest.fixture
+    def authenticator(self, clock) -> LocalAuthenticator:
+        return LocalAuthenticator(verifier=TokenVerifier(), jwks_url=JWKS_URL, refresh_interval=60, clock=clock)
+
+    @pytest.mark.asyncio
+    async def test_shared_secret_needs_no_round_trip(self, fake_web, aio_http_client):
+        """
+        GIVEN an authenticator knowing the shared secret
+        WHEN a token is authenticated
+        THEN the user is read from its claims, without contacting any service
+        """
+        # given
+        authenticator = LocalAuthenticator(verifier=TokenVerifier(secret="fake-secret"))
+
+        # when
+        user = await authenticator.authenticate(token_factory("fake-secret", username="johndoe"),
+                                                client=aio_http_client)
+
+        # then
+        assert user.username == "johndoe"
+        assert not fake_web.requests
+
+    @pytest.mark.asyncio
+    async def test_key_set_is_loaded_once(self, fake_web, authenticator, aio_http_client):
+        """
+        GIVEN an authenticator with a key set url
+        WHEN tokens are authenticated
+        THEN the key set is fetched on first use only
+        """
+        # given
+        fake_web.get(JWKS_URL, payload=key_set(first="fake-secret"), status=HTTP_200_OK)
+
+        # when
+        for _ in range(3):
+            user = await authenticator.authenticate(token_factory("fake-secret", kid="first"), client=aio_http_client)
+
+        # then
+        assert user.username == "johndoe"
+        assert sum(len(calls) for calls in fake_web.requests.values()) == 1
+
+    @pytest.mark.asyncio
+    async def test_rotated_key_reloads_key_set(self, fake_web, authenticator, aio_http_client, clock):
+        """
+        GIVEN a loaded key set, older than the refresh interval
+        WHEN a token signed by a new key is authenticated
+        THEN the key set is reloaded and the token accepted
+        """
+        # given
+        fake_web.get(JWKS_URL, payload=key_set(first="fake-secret"), status=HTTP_200_OK)
+        fake_web.get(JWKS_URL, payload=key_set(first="fake-secret", second="new-secret"), status=HTTP_200_OK)
+        await authenticator.refresh(client=aio_http_client)
+        clock.now += 61
+
+        # when
+        user = await authenticator.authenticate(token_factory("new-secret", kid="second"), client=aio_http_client)
+
+        # then
+        assert user.username == "johndoe"
+
+    @pytest.mark.asyncio
+    async def test_unknown_key_does_not_reload_within_interval(self, fake_web, authenticator, aio_http_client):
+        """
+        GIVEN a key set loaded within the refresh interval
+        WHEN a token signed by an unknown key is authenticated
+        THEN it is rejected without fetching the key set again
+        """
+        # given
+        fake_web.get(JWKS_URL, payload=key_set(first="fake-secret"), status=HTTP_200_OK)
+        await authenticator.refresh(client=aio_http_client)
+
+        # when / then
+        with pytest.raises(UnknownKeyError):
+            await authenticator.authenticate(token_factory("forged-secret", kid="forged"), client=aio_http_client)
+
+        assert sum(len(calls) for calls in fake_web.requests.values()) == 1
+
+    @pytest.mark.asyncio
+    async def test_key_set_unavailable(self, fake_web, authenticator, aio_http_client):
+        """
+        GIVEN the key set cannot be fetched
+        WHEN a token is authenticated
+        THEN it is rejected
+        """
+        # given
+        fake_web.get(JWKS_URL, payload={"detail": "Service unavailable"}, status=HTTP_503_SERVICE_UNAVAILABLE)
+
+        # when / then
+        with pytest.raises(InvalidTokenError):
+            await authenticator.authenticate(token_factory("fake-secret", kid="first"), client=aio_http_client)
+
+    @pytest.mark.asyncio
+    async def test_token_without_user_claims(self, aio_http_client):
+        """
+        GIVEN a valid token
+        WHEN it misses the user claims
+        THEN it is rejected
+        """
+        # given
+        authenticator = LocalAuthenticator(verifier=TokenVerifier(secret="fake-secret"))
+
+        # when / then
+        with pytest.raises(InvalidTokenError):
+            await authenticator.authenticate(token_factory("fake-secret", username=None), client=aio_http_client)
@@ -6,11 +6,16 @@ from typing import Any
 import pytest
 from aioresponses import aioresponses
 from fastapi import HTTPException
+from pydantic import ValidationError
 from starlette.status import HTTP_200_OK, HTTP_201_CREATED, HTTP_202_ACCEPTED, HTTP_404_NOT_FOUND, \
     HTTP_503_SERVICE_UNAVAILABLE
 
-from app.domain.models import Service
-from app.service_layer.gateway import get_users, verify_status
+from app.adapters.telemetry.prometheus import CONTRACT_VIOLATIONS
+from app.domain.events.scheduler_service import MeetingScheduled
+from app.domain.models import ContractPolicy, Service
+from app.domain.schemas import ResponseModel
+from app.service_layer import gateway
+from app.service_layer.gateway import get_users, parse_response, verify_status
 
 
 class TestGateway:
@@ -41,7 +46,8 @@ class TestGateway:
         THEN it should return corresponding data.
         """
         # given
-        fake_web.get(f"{auth_service.base_url}/api/v1/users", payload=payload, status=status_code)
+        fake_web.get(f"{auth_service.base_url}/api/v1/users", payload=payload, status=status_code,
+                     repeat=True)
 
         # when
         response, status_code = await get_users(users="", service=auth_service, client=aio_http_client)
@@ -70,3 +76,58 @@ class TestGateway:
         # when / then
         with pytest.raises(HTTPException):
             await verify_status(response=payload, status_codes=valid_values, status_code=response_status)
+
+
+class TestParseResponse:
+
+    INVALID_RESPONSE = {"data": {"id": "1", "organizer": "johndoe", "title": "Sprint Planning", "options": []}}
+
+    def test_untrusted_response_is_validated(self):
+        """
+        GIVEN a service which is not trusted
+        WHEN a response which does not match its model is parsed
+        THEN it is rejected
+        """
+        # given
+        service = Service(name="scheduler", base_url="http://fake-scheduler")
+
+        # when / then
+        with pytest.raises(ValidationError):
+            parse_response(ResponseModel[MeetingScheduled], self.INVALID_RESPONSE, service)
+
+    def test_trusted_response_is_not_validated(self):
+        """
+        GIVEN a trusted service, which responses are never sampled
+        WHEN a response which does not match its model is parsed
+        THEN it is built as-is, nested models included
+        """
+        # given
+        service = Service(name="scheduler", base_url="http://fake-scheduler",
+                          contract=ContractPolicy(trusted=True, sample_rate=0))
+
+        # when
+        response = parse_response(ResponseModel[MeetingScheduled], self.INVALID_RESPONSE, service)
+
+        # then
+        assert isinstance(response.data, MeetingScheduled)
+        assert response.data.organizer == "johndoe"
+        assert response.data.guests == []
+
+    def test_sampled_contract_violation_is_counted(self):
+        """
+        GIVEN a trusted service, which responses are all sampled
+        WHEN a response which does not match its model is parsed
+        THEN the violation is counted, and the response built as-is still
+        """
+        # given
+        service = Service(name="drifting", base_url="http://fake-scheduler",
+                          contract=ContractPolicy(trusted=True, sample_rate=1))
+        violations = CONTRACT_VIOLATIONS.labels(service="drifting", app_name=gateway.app_name)
+        count = violations._value.get()
+
+        # when
+        response = parse_response(ResponseModel[MeetingScheduled], self.INVALID_RESPONSE, service)
+
+        # then
+        assert violations._value.get() == count + 1
+        assert response.data.id == "1"
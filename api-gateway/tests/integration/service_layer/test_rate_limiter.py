@@ -1,12 +1,22 @@
 """
 Test for Rate Limiter Service
 """
+import asyncio
 from unittest import mock
 
+import aioredis
 import pytest
+from pydantic import ValidationError
 
-from app.adapters.redis_connector import RedisClient
-from app.service_layer.rate_limiter import RedisRateLimiter
+from app.adapters.redis_connector import RedisClient, RedisConnectionError, RedisConnector
+from app.dependencies import app_settings, get_rate_limiter
+from app.domain.events.auth_service import UserAuthenticated
+from app.domain.models import Quota, RateLimitAlgorithm, RateLimitFailureMode, Role
+from app.adapters.telemetry.prometheus import RATE_LIMIT_REJECTIONS
+from app.service_layer.rate_limiter import FIXED_WINDOW_SCRIPT, RATE_LIMITERS, DenyCachingRateLimiter, Fallback, \
+    FixedWindowRateLimiter, PreAggregatedRateLimiter, QuotaRateLimiter, RateLimit, redis_probe
+from app.settings.app_settings import ApplicationSettings
+from tests.mocks import FakeRedis
 
 TTL = 10
 THRESHOLD = 3
@@ -19,55 +29,675 @@ class TestRateLimiter:
         yield mock.AsyncMock()
 
     @pytest.mark.asyncio
-    async def test_increments(self, redis_client_connector: RedisClient):
+    async def test_hit_counts_in_one_round_trip(self, redis_client_connector: RedisClient):
         """
-        Given a RedisRateLimiter instance
-        When the increment method is called
-        Then it should increment the number of requests for the given key
+        Given a FixedWindowRateLimiter instance
+        When a request is counted
+        Then the count and window are read from a single script run
         """
         # given
-        expected_count = 1
+        redis_client_connector.redis_client.evalsha = mock.AsyncMock(return_value=[1, TTL * 1000])
         redis_client_connector.redis_client.incr = mock.AsyncMock()
-        redis_client_connector.redis_client.incr.return_value = expected_count
-        identifier = "test"
-        redis_rate_limiter = RedisRateLimiter(redis=redis_client_connector, time_to_live=TTL, threshold=THRESHOLD)
+        redis_client_connector.redis_client.expire = mock.AsyncMock()
+        redis_rate_limiter = FixedWindowRateLimiter(redis=redis_client_connector, time_to_live=TTL, threshold=THRESHOLD)
 
         # when
-        result = await redis_rate_limiter.increment(identifier)
+        result = await redis_rate_limiter.hit("test")
 
         # then
-        assert result == expected_count
+        assert result == RateLimit(limit=THRESHOLD, count=1, reset_after=TTL)
+        redis_client_connector.redis_client.evalsha.assert_awaited_once_with(FixedWindowRateLimiter.sha, 1, "test",
+                                                                             TTL * 1000, THRESHOLD, 1)
+        redis_client_connector.redis_client.incr.assert_not_awaited()
+        redis_client_connector.redis_client.expire.assert_not_awaited()
 
     @pytest.mark.asyncio
-    async def test_number_bellow_threshold_is_allowed(self, redis_client_connector: RedisClient):
+    async def test_script_is_loaded_when_missing(self, redis_client_connector: RedisClient):
         """
-        Given a RedisRateLimiter instance
+        Given a redis server which script cache is empty
+        When a request is counted
+        Then the script is loaded, and run again by its digest
+        """
+        # given
+        redis_client_connector.redis_client.evalsha = mock.AsyncMock(
+            side_effect=[aioredis.exceptions.NoScriptError("NOSCRIPT"), [2, 5000]])
+        redis_client_connector.redis_client.script_load = mock.AsyncMock(return_value=FixedWindowRateLimiter.sha)
+        redis_rate_limiter = FixedWindowRateLimiter(redis=redis_client_connector, time_to_live=TTL, threshold=THRESHOLD)
+
+        # when
+        result = await redis_rate_limiter.hit("test")
+
+        # then
+        redis_client_connector.redis_client.script_load.assert_awaited_once_with(FIXED_WINDOW_SCRIPT)
+        assert result.count == 2
+        assert result.reset_after == 5
+
+    def test_number_bellow_threshold_is_allowed(self):
+        """
+        Given a rate limit
         When a request number is bellow the threshold
-        Then it should return True
+        Then it should be allowed
+        """
+        # when
+        result = RateLimit(limit=THRESHOLD, count=THRESHOLD - 1, reset_after=TTL)
+
+        # then
+        assert result.allowed
+        assert result.headers() == {"X-RateLimit-Limit": "3", "X-RateLimit-Remaining": "1", "X-RateLimit-Reset": "10"}
+
+    def test_number_above_threshold_is_not_allowed(self):
+        """
+        Given a rate limit
+        When a request number is above the threshold
+        Then it should not be allowed, and tell when to retry
+        """
+        # when
+        result = RateLimit(limit=THRESHOLD, count=THRESHOLD + 1, reset_after=2.5)
+
+        # then
+        assert not result.allowed
+        assert result.headers() == {"X-RateLimit-Limit": "3", "X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "3",
+                                    "Retry-After": "3"}
+
+    @pytest.mark.parametrize("algorithm", list(RateLimitAlgorithm))
+    def test_algorithm_is_selected_by_settings(self, algorithm, monkeypatch, redis_client_connector: RedisClient):
+        """
+        Given a rate limit algorithm set in the application settings
+        When the rate limiter is built
+        Then it counts requests with the script of the algorithm
         """
         # given
-        value = THRESHOLD - 1
-        redis_rate_limiter = RedisRateLimiter(redis=redis_client_connector, time_to_live=TTL, threshold=THRESHOLD)
+        monkeypatch.setattr(app_settings, "USE_LIMITER", True)
+        monkeypatch.setattr(app_settings, "LIMITER_ALGORITHM", algorithm)
 
         # when
-        result = await redis_rate_limiter.is_allowed(request_number=value)
+        rate_limiter = get_rate_limiter(redis=redis_client_connector)
 
         # then
-        assert result
+        assert isinstance(rate_limiter, DenyCachingRateLimiter)
+        assert type(rate_limiter.rate_limiter) is RATE_LIMITERS[algorithm]
+        assert len({limiter.sha for limiter in RATE_LIMITERS.values()}) == len(RateLimitAlgorithm)
 
+    def test_rate_limiter_is_shared_by_requests(self, monkeypatch, redis_client_connector: RedisClient):
+        """
+        Given the rate limiter enabled in the application settings
+        When two requests get the rate limiter
+        Then it is built once, and shared by both
+        """
+        # given
+        monkeypatch.setattr(app_settings, "USE_LIMITER", True)
+
+        # when
+        first, second = (get_rate_limiter(redis=redis_client_connector) for _ in range(2))
+
+        # then
+        assert first is second
+
+    @pytest.mark.parametrize("algorithm", list(RateLimitAlgorithm))
     @pytest.mark.asyncio
-    async def test_number_above_threshold_is_not_allowed(self, redis_client_connector: RedisClient):
+    async def test_rejected_request_tells_when_to_retry(self, algorithm, redis_client_connector: RedisClient):
         """
-        Given a RedisRateLimiter instance
-        When a request number is above the threshold
-        Then it should return False
+        Given a client which surpassed its rate limit
+        When another request is counted
+        Then it is not allowed, and retries after the time the script tells
+        """
+        # given
+        redis_client_connector.redis_client.evalsha = mock.AsyncMock(return_value=[THRESHOLD + 1, 1500])
+        rate_limiter = RATE_LIMITERS[algorithm](redis=redis_client_connector, time_to_live=TTL, threshold=THRESHOLD)
+
+        # when
+        result = await rate_limiter.hit("test")
+
+        # then
+        assert not result.allowed
+        assert result.headers()["Retry-After"] == "2"
+
+
+class TestQuotaRateLimiter:
+
+    @pytest.fixture
+    def quotas(self) -> list[Quota]:
+        return [
+            Quota(role=Role.USER, threshold=100, interval=3600),
+            Quota(role=Role.ADMIN, threshold=1000, interval=3600),
+            Quota(route="/api/v1/schedules", methods=["POST"], threshold=THRESHOLD, interval=TTL),
+        ]
+
+    @pytest.fixture
+    def limiter(self, quotas, redis_client_connector: RedisClient) -> QuotaRateLimiter:
+        return QuotaRateLimiter(redis=redis_client_connector, quotas=quotas, time_to_live=60, threshold=10)
+
+    @staticmethod
+    def user(role: Role) -> UserAuthenticated:
+        return UserAuthenticated(id="1", username="johndoe", email="john@doe.mail", role=role)
+
+    def test_request_matches_quotas_of_its_route_and_role(self, limiter, quotas):
+        """
+        Given a quota policy table
+        When a user schedules a meeting
+        Then the request counts against the quota of users and the quota of the route
+        """
+        # when
+        result = limiter.match(route="/api/v1/schedules", method="POST", user=self.user(Role.USER))
+
+        # then
+        assert result == [quotas[0], quotas[2]]
+
+    def test_anonymous_request_matches_no_role_quota(self, limiter, quotas):
+        """
+        Given a quota policy table
+        When an anonymous client lists meetings
+        Then the request counts against the default quota only
+        """
+        # when
+        result = limiter.match(route="/api/v1/schedules", method="GET")
+
+        # then
+        assert result == [limiter.default]
+        assert limiter.default == Quota(threshold=10, interval=60)
+
+    @pytest.mark.asyncio
+    async def test_quotas_are_counted_in_one_round_trip(self, limiter, quotas, redis_client_connector: RedisClient):
+        """
+        Given a request matching two quotas
+        When it is counted, with a cost of two
+        Then both quotas are counted by a single script run, which tells the rate limit of the binding one
+        """
+        # given
+        redis_client_connector.redis_client.evalsha = mock.AsyncMock(return_value=[2, 2, THRESHOLD, 4000])
+        matched = [quotas[0], quotas[2]]
+
+        # when
+        result = await limiter.hit("rate-{user:johndoe}", cost=2, quotas=matched)
+
+        # then
+        assert result == RateLimit(limit=THRESHOLD, count=2, reset_after=4)
+        redis_client_connector.redis_client.evalsha.assert_awaited_once_with(
+            QuotaRateLimiter.sha, 2, f"rate-{{user:johndoe}}:{quotas[0].key}", f"rate-{{user:johndoe}}:{quotas[2].key}",
+            2, 3600 * 1000, 100, TTL * 1000, THRESHOLD)
+
+    @pytest.mark.asyncio
+    async def test_blocked_user_is_rejected_in_process(self, quotas, redis_client_connector: RedisClient):
+        """
+        Given a user which surpassed the quota of its role
+        When it makes another request before the quota resets
+        Then the request is rejected without running the script
+        """
+        # given
+        redis_client_connector.redis_client.evalsha = mock.AsyncMock(return_value=[1, 101, 100, 4000])
+        limiter = QuotaRateLimiter(redis=redis_client_connector, quotas=quotas, time_to_live=60, threshold=10,
+                                   clock=lambda: 1000.0)
+        await limiter.hit("rate-{user:johndoe}", quotas=[quotas[0]])
+
+        # when
+        result = await limiter.hit("rate-{user:johndoe}", quotas=[quotas[0]])
+
+        # then
+        assert result == RateLimit(limit=100, count=101, reset_after=4)
+        redis_client_connector.redis_client.evalsha.assert_awaited_once()
+
+    @pytest.mark.parametrize("setting, value", [("FASTAPI_LIMITER_APPROXIMATE", "true"),
+                                                ("FASTAPI_LIMITER_ALGORITHM", RateLimitAlgorithm.GCRA.value)])
+    def test_quotas_reject_settings_they_cannot_honor(self, setting, value, monkeypatch):
+        """
+        Given quotas set in the application settings
+        When approximate counting or another algorithm than the fixed window is set along them
+        Then the settings are rejected
+        """
+        # given
+        monkeypatch.setenv("FASTAPI_LIMITER_QUOTAS", '[{"role": "USER", "threshold": 100, "interval": 3600}]')
+        monkeypatch.setenv(setting, value)
+
+        # when / then
+        with pytest.raises(ValidationError):
+            ApplicationSettings()
+
+    def test_edited_quota_is_counted_anew(self, quotas):
+        """
+        Given a quota
+        When its threshold is edited
+        Then its requests are counted under another key
+        """
+        # when
+        edited = quotas[0].copy(update={"threshold": 200})
+
+        # then
+        assert edited.key != quotas[0].key
+        assert Quota(**quotas[0].dict()).key == quotas[0].key
+
+
+class TestFallback:
+
+    @pytest.fixture
+    def redis(self) -> mock.AsyncMock:
+        redis = mock.AsyncMock(spec=RedisConnector)
+        redis.evalsha.side_effect = RedisConnectionError
+        redis.ping.return_value = False
+        return redis
+
+    @staticmethod
+    def limiter(redis, mode: RateLimitFailureMode = RateLimitFailureMode.OPEN,
+                probe_interval: float = 60) -> FixedWindowRateLimiter:
+        return FixedWindowRateLimiter(redis=redis, time_to_live=TTL, threshold=THRESHOLD,
+                                      fallback=Fallback(mode=mode, probe_interval=probe_interval))
+
+    @pytest.mark.asyncio
+    async def test_fail_open_counts_in_process(self, redis):
+        """
+        Given redis is unavailable, and the rate limiter fails open
+        When a client keeps sending requests
+        Then redis is asked once, and the requests beyond the threshold are rejected in process
+        """
+        # given
+        limiter = self.limiter(redis)
+
+        # when
+        results = [await limiter.hit("test") for _ in range(THRESHOLD + 1)]
+
+        # then
+        redis.evalsha.assert_awaited_once()
+        assert not redis_probe.available
+        assert [result.allowed for result in results] == [True] * THRESHOLD + [False]
+
+    @pytest.mark.asyncio
+    async def test_fail_closed_rejects_until_probe(self, redis):
+        """
+        Given redis is unavailable, and the rate limiter fails closed
+        When requests are counted
+        Then they are rejected without asking redis again, and told to retry once redis is probed
+        """
+        # given
+        limiter = self.limiter(redis, mode=RateLimitFailureMode.CLOSED, probe_interval=2)
+
+        # when
+        results = [await limiter.hit("test") for _ in range(2)]
+
+        # then
+        redis.evalsha.assert_awaited_once()
+        assert not any(result.allowed for result in results)
+        assert results[0].headers()["Retry-After"] == "2"
+
+    @pytest.mark.asyncio
+    async def test_probe_restores_redis(self, redis):
+        """
+        Given redis became unavailable
+        When it answers a ping again
+        Then requests are counted in redis again
+        """
+        # given
+        limiter = self.limiter(redis, probe_interval=0)
+        await limiter.hit("test")
+        redis.evalsha.side_effect = None
+        redis.evalsha.return_value = [2, TTL * 1000]
+
+        # when
+        redis.ping.return_value = True
+        await asyncio.wait_for(redis_probe.task, timeout=1)
+        result = await limiter.hit("test")
+
+        # then
+        assert redis_probe.available
+        assert result.count == 2
+        assert redis.evalsha.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_quotas_fall_back_together(self, redis):
+        """
+        Given redis is unavailable
+        When a request surpasses one of the quotas it matches
+        Then it is not counted against the others
+        """
+        # given
+        quotas = [Quota(threshold=2, interval=TTL), Quota(route="/", threshold=1, interval=TTL)]
+        limiter = QuotaRateLimiter(redis=redis, quotas=quotas, time_to_live=TTL, threshold=THRESHOLD,
+                                   fallback=Fallback())
+
+        # when
+        first = await limiter.hit("test", quotas=quotas)
+        second = await limiter.hit("test", quotas=quotas)
+
+        # then
+        assert first.allowed and first.limit == 1
+        assert not second.allowed
+        assert (await limiter.hit("test", quotas=quotas[:1])).count == 2
+
+    @pytest.mark.asyncio
+    async def test_fallbacks_count_apart(self, redis):
+        """
+        Given two rate limiters failing open, one of which remembers a single key
+        When both count requests while redis is unavailable
+        Then each one counts and evicts its own keys only
+        """
+        # given
+        first = FixedWindowRateLimiter(redis=redis, time_to_live=TTL, threshold=THRESHOLD,
+                                       fallback=Fallback(max_size=1))
+        second = self.limiter(redis)
+
+        # when
+        await second.hit("test")
+        await first.hit("other")
+        result = await second.hit("test")
+
+        # then
+        assert result.count == 2
+        assert list(first.fallback.local.counts) == [f"other:{first.default.key}"]
+
+    @pytest.mark.asyncio
+    async def test_errors_are_raised_without_fallback(self, redis):
+        """
+        Given redis is unavailable, and the rate limiter has no fallback
+        When a request is counted
+        Then the connection error is raised
+        """
+        # given
+        limiter = FixedWindowRateLimiter(redis=redis, time_to_live=TTL, threshold=THRESHOLD)
+
+        # when
+        with pytest.raises(RedisConnectionError):
+            await limiter.hit("test")
+
+        # then
+        assert redis_probe.available
+
+
+class TestPreAggregatedRateLimiter:
+
+    @pytest.fixture
+    def redis(self) -> FakeRedis:
+        redis = FakeRedis()
+        redis.incrby_many = mock.AsyncMock(wraps=redis.incrby_many)
+        return redis
+
+    @pytest.fixture
+    def clock(self) -> mock.Mock:
+        return mock.Mock(return_value=1000.0)
+
+    def limiter(self, redis, clock, max_drift: int = 100) -> PreAggregatedRateLimiter:
+        return PreAggregatedRateLimiter(redis=redis, time_to_live=TTL, threshold=THRESHOLD, max_drift=max_drift,
+                                        clock=clock)
+
+    @pytest.mark.asyncio
+    async def test_requests_are_counted_in_process(self, redis, clock):
+        """
+        Given an approximate rate limiter
+        When requests are counted between two syncs
+        Then redis is not contacted, and requests beyond the threshold are not allowed
+        """
+        # given
+        limiter = self.limiter(redis, clock)
+
+        # when
+        results = [await limiter.hit("test") for _ in range(THRESHOLD + 1)]
+
+        # then
+        redis.incrby_many.assert_not_awaited()
+        assert [result.allowed for result in results] == [True] * THRESHOLD + [False]
+        assert results[0].reset_after == TTL
+
+    @pytest.mark.asyncio
+    async def test_sync_batches_counts_of_every_key(self, redis, clock):
+        """
+        Given requests of several clients counted in process
+        When the counts are synced
+        Then they are added to redis in one round trip
+        """
+        # given
+        limiter = self.limiter(redis, clock)
+        await limiter.hit("first")
+        await limiter.hit("first")
+        await limiter.hit("second")
+
+        # when
+        await limiter.sync()
+
+        # then
+        redis.incrby_many.assert_awaited_once_with({"first:100": 2, "second:100": 1}, expire=TTL)
+        assert redis.data == {"first:100": "2", "second:100": "1"}
+
+    @pytest.mark.asyncio
+    async def test_counts_of_other_instances_are_shared(self, redis, clock):
+        """
+        Given two gateway instances counting the requests of a client
+        When they synced their counts
+        Then each one limits the client after their total
+        """
+        # given
+        first, second = self.limiter(redis, clock), self.limiter(redis, clock)
+        await first.hit("test")
+        await second.hit("test")
+        await first.sync()
+        await second.sync()
+        clock.return_value += 1
+        await first.sync()
+
+        # when
+        result = await first.hit("test")
+
+        # then
+        assert result.count == 3
+        assert not (await first.hit("test")).allowed
+
+    @pytest.mark.asyncio
+    async def test_idle_counts_are_read_every_refresh_interval(self, redis, clock):
+        """
+        Given two clients with requests synced already, one of which made another request since
+        When the counts are synced again, then once the refresh interval elapsed
+        Then only the count of the client with a request is synced first, both of them then
+        """
+        # given
+        limiter = self.limiter(redis, clock)
+        await limiter.hit("first")
+        await limiter.hit("second")
+        await limiter.sync()
+        await limiter.hit("first")
+
+        # when
+        await limiter.sync()
+        clock.return_value += 1
+        await limiter.sync()
+
+        # then
+        assert [call.args[0] for call in redis.incrby_many.await_args_list[1:]] == [{"first:100": 1},
+                                                                                    {"first:100": 0, "second:100": 0}]
+
+    @pytest.mark.asyncio
+    async def test_drift_wakes_the_syncer_up(self, redis, clock):
+        """
+        Given an approximate rate limiter allowing a drift of two requests, synced every hour
+        When a client makes a second request not synced yet
+        Then the request does not wait for redis, but the syncer syncs it right away
+        """
+        # given
+        limiter = self.limiter(redis, clock, max_drift=2)
+        syncer = asyncio.create_task(limiter.sync_forever(interval=3600))
+
+        # when
+        await limiter.hit("test")
+        await limiter.hit("test")
+        awaited = redis.incrby_many.await_count
+
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+        syncer.cancel()
+        await asyncio.gather(syncer, return_exceptions=True)
+
+        # then
+        assert awaited == 0
+        redis.incrby_many.assert_awaited_once()
+        assert limiter.counts["test:100"].pending == 0
+
+    @pytest.mark.asyncio
+    async def test_new_window_resets_count(self, redis, clock):
+        """
+        Given a client which surpassed its rate limit
+        When the next window starts
+        Then it is allowed again, and the past window is forgotten once synced
+        """
+        # given
+        limiter = self.limiter(redis, clock)
+        for _ in range(THRESHOLD + 1):
+            await limiter.hit("test")
+
+        # when
+        clock.return_value += TTL
+        result = await limiter.hit("test")
+        await limiter.sync()
+        await limiter.sync()
+
+        # then
+        assert result.allowed
+        assert list(limiter.counts) == ["test:101"]
+
+    @pytest.mark.asyncio
+    async def test_counts_are_kept_when_redis_is_unavailable(self, redis, clock):
+        """
+        Given redis is unavailable
+        When the counts are synced
+        Then they are kept in process, to be synced next time
+        """
+        # given
+        limiter = self.limiter(redis, clock)
+        await limiter.hit("test")
+        redis.incrby_many.side_effect = RedisConnectionError
+
+        # when
+        await limiter.sync()
+
+        # then
+        assert limiter.counts["test:100"].pending == 1
+        assert not redis_probe.available
+
+    @pytest.mark.asyncio
+    async def test_drift_is_not_synced_while_redis_is_unavailable(self, redis, clock):
+        """
+        Given redis is unavailable, and a client reached the drift once already
+        When it makes another request not synced yet
+        Then the syncer is not woken up until redis answers a ping
+        """
+        # given
+        limiter = self.limiter(redis, clock, max_drift=1)
+        redis.incrby_many.side_effect = RedisConnectionError
+        await limiter.hit("test")
+        await limiter.sync()
+        limiter.drifted.clear()
+
+        # when
+        result = await limiter.hit("test")
+
+        # then
+        assert not limiter.drifted.is_set()
+        redis.incrby_many.assert_awaited_once()
+        assert result.count == 2
+
+    @pytest.mark.asyncio
+    async def test_past_windows_are_forgotten_while_redis_is_unavailable(self, redis, clock):
+        """
+        Given redis is unavailable, and requests counted in a past window
+        When the counts are synced in the next window
+        Then the counts of the past window are forgotten rather than kept to be synced
+        """
+        # given
+        limiter = self.limiter(redis, clock)
+        redis.incrby_many.side_effect = RedisConnectionError
+        await limiter.hit("test")
+        await limiter.sync()
+        clock.return_value += TTL
+        await limiter.hit("test")
+
+        # when
+        await limiter.sync()
+
+        # then
+        assert list(limiter.counts) == ["test:101"]
+        redis.incrby_many.assert_awaited_once()
+
+
+class TestDenyCachingRateLimiter:
+
+    @pytest.fixture
+    def clock(self) -> mock.Mock:
+        return mock.Mock(return_value=1000.0)
+
+    @pytest.fixture
+    def counting_limiter(self) -> mock.AsyncMock:
+        limiter = mock.AsyncMock()
+        limiter.hit.return_value = RateLimit(limit=THRESHOLD, count=THRESHOLD + 1, reset_after=TTL)
+        return limiter
+
+    @pytest.mark.asyncio
+    async def test_blocked_client_is_rejected_in_process(self, counting_limiter, clock):
+        """
+        Given a client which surpassed its rate limit
+        When it keeps sending requests before it may retry
+        Then they are rejected without being counted, telling the time left to retry
+        """
+        # given
+        limiter = DenyCachingRateLimiter(rate_limiter=counting_limiter, clock=clock)
+        rejections = RATE_LIMIT_REJECTIONS.labels(source="deny-cache", app_name="gateway")._value.get()
+        await limiter.hit("test")
+
+        # when
+        clock.return_value += 4
+        results = [await limiter.hit("test") for _ in range(100)]
+
+        # then
+        counting_limiter.hit.assert_awaited_once()
+        assert not any(result.allowed for result in results)
+        assert results[0].headers()["Retry-After"] == str(TTL - 4)
+        assert RATE_LIMIT_REJECTIONS.labels(source="deny-cache", app_name="gateway")._value.get() == rejections + 100
+
+    @pytest.mark.asyncio
+    async def test_client_is_counted_again_once_it_may_retry(self, counting_limiter, clock):
+        """
+        Given a blocked client
+        When the time to retry comes
+        Then its requests are counted again
+        """
+        # given
+        limiter = DenyCachingRateLimiter(rate_limiter=counting_limiter, clock=clock)
+        await limiter.hit("test")
+
+        # when
+        clock.return_value += TTL
+        await limiter.hit("test")
+
+        # then
+        assert counting_limiter.hit.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_allowed_clients_are_not_remembered(self, clock):
+        """
+        Given a client within its rate limit
+        When its request is counted
+        Then it is not blocked
+        """
+        # given
+        counting_limiter = mock.AsyncMock()
+        counting_limiter.hit.return_value = RateLimit(limit=THRESHOLD, count=1, reset_after=TTL)
+        limiter = DenyCachingRateLimiter(rate_limiter=counting_limiter, clock=clock)
+
+        # when
+        await limiter.hit("test")
+
+        # then
+        assert "test" not in limiter.blocked
+
+    @pytest.mark.asyncio
+    async def test_blocked_clients_are_bounded(self, counting_limiter, clock):
+        """
+        Given a full blocked clients cache
+        When another client is blocked
+        Then the least recently rejected one is forgotten
         """
         # given
-        value = THRESHOLD + 1
-        redis_rate_limiter = RedisRateLimiter(redis=redis_client_connector, time_to_live=TTL, threshold=THRESHOLD)
+        limiter = DenyCachingRateLimiter(rate_limiter=counting_limiter, max_size=2, clock=clock)
+        await limiter.hit("first")
+        await limiter.hit("second")
+        await limiter.hit("first")
 
         # when
-        result = await redis_rate_limiter.is_allowed(request_number=value)
+        await limiter.hit("third")
 
         # then
-        assert not result
+        assert list(limiter.blocked) == ["first", "third"]
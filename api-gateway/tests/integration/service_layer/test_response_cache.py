@@ -0,0 +1,151 @@
+"""
+Test for the Response Cache Service
+"""
+from unittest import mock
+
+import pytest
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+from starlette.status import HTTP_200_OK, HTTP_304_NOT_MODIFIED, HTTP_404_NOT_FOUND
+
+from app.adapters.redis_connector import RedisConnectionError
+from app.service_layer.response_cache import CachedResponse, RedisResponseCache, cached
+from tests.mocks import FakeRedis
+
+TTL = 10
+
+
+def fake_request(path: str = "/api/v1/schedules", headers: dict[str, str] | None = None) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "query_string": b"",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+    })
+
+
+class TestResponseCache:
+
+    @pytest.fixture
+    def cache(self) -> RedisResponseCache:
+        return RedisResponseCache(redis=FakeRedis(), ttl=TTL)
+
+    @pytest.mark.asyncio
+    async def test_miss_fetches_and_caches(self, cache):
+        """
+        Given an empty cache
+        When a query is served
+        Then it is fetched from the service, and cached with its entity tag
+        """
+        # given
+        fetch = mock.AsyncMock(return_value=Response(content=b'{"data": []}', media_type="application/json"))
+
+        # when
+        response = await cached(request=fake_request(), cache=cache, fetch=fetch)
+
+        # then
+        fetch.assert_awaited_once()
+        assert response.status_code == HTTP_200_OK
+        assert response.body == b'{"data": []}'
+        assert response.headers["etag"] == (await cache.get("GET:/api/v1/schedules?")).etag
+
+    @pytest.mark.asyncio
+    async def test_hit_does_not_fetch(self, cache):
+        """
+        Given a cached query
+        When it is served again
+        Then the cached body is returned without contacting the service
+        """
+        # given
+        entry = CachedResponse.from_body(b'{"data": [1]}')
+        await cache.set("GET:/api/v1/schedules?", entry)
+        fetch = mock.AsyncMock()
+
+        # when
+        response = await cached(request=fake_request(), cache=cache, fetch=fetch)
+
+        # then
+        fetch.assert_not_awaited()
+        assert response.body == b'{"data": [1]}'
+        assert response.headers["etag"] == entry.etag
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("if_none_match", ["{etag}", 'W/{etag}', '"other", {etag}', "*"])
+    async def test_hit_with_matching_etag_is_not_modified(self, cache, if_none_match):
+        """
+        Given a cached query, and a client which already holds it
+        When it is served again
+        Then it is Not Modified
+        """
+        # given
+        entry = CachedResponse.from_body(b'{"data": [1]}')
+        await cache.set("GET:/api/v1/schedules?", entry)
+        request = fake_request(headers={"If-None-Match": if_none_match.format(etag=entry.etag)})
+
+        # when
+        response = await cached(request=request, cache=cache, fetch=mock.AsyncMock())
+
+        # then
+        assert response.status_code == HTTP_304_NOT_MODIFIED
+        assert response.body == b""
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self, cache):
+        """
+        Given an empty cache, and a failing service
+        When a query is served
+        Then the error is relayed but not cached
+        """
+        # given
+        fetch = mock.AsyncMock(return_value=Response(content=b'{}', status_code=HTTP_404_NOT_FOUND))
+
+        # when
+        response = await cached(request=fake_request(), cache=cache, fetch=fetch)
+
+        # then
+        assert response.status_code == HTTP_404_NOT_FOUND
+        assert await cache.get("GET:/api/v1/schedules?") is None
+
+    @pytest.mark.asyncio
+    async def test_large_streamed_body_is_relayed_without_being_cached(self, cache):
+        """
+        Given an empty cache, and a service streaming a body larger than the cacheable size
+        When a query is served
+        Then the whole body is streamed to the client, but not cached
+        """
+        # given
+        async def chunks():
+            for chunk in (b'{"data": ', b'[1, 2, 3]', b'}'):
+                yield chunk
+
+        fetch = mock.AsyncMock(return_value=StreamingResponse(content=chunks(), media_type="application/json"))
+
+        # when
+        response = await cached(request=fake_request(), cache=cache, fetch=fetch, max_size=12)
+
+        # then
+        assert response.status_code == HTTP_200_OK
+        assert b"".join([chunk async for chunk in response.body_iterator]) == b'{"data": [1, 2, 3]}'
+        assert "etag" not in response.headers
+        assert await cache.get("GET:/api/v1/schedules?") is None
+
+    @pytest.mark.asyncio
+    async def test_unavailable_redis_is_a_miss(self):
+        """
+        Given a cache whose redis is unavailable
+        When a query is served
+        Then it is fetched from the service
+        """
+        # given
+        redis = FakeRedis()
+        redis.get = mock.AsyncMock(side_effect=RedisConnectionError())
+        redis.set = mock.AsyncMock(side_effect=RedisConnectionError())
+        fetch = mock.AsyncMock(return_value=Response(content=b'{"data": []}'))
+
+        # when
+        response = await cached(request=fake_request(), cache=RedisResponseCache(redis=redis, ttl=TTL), fetch=fetch)
+
+        # then
+        assert response.status_code == HTTP_200_OK
+        fetch.assert_awaited_once()
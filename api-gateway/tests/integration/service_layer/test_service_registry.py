@@ -0,0 +1,103 @@
+"""
+Test module for service_registry.py
+"""
+import asyncio
+import json
+import os
+
+import pytest
+from fastapi import HTTPException
+from starlette.status import HTTP_503_SERVICE_UNAVAILABLE
+
+from app.domain.models import Service
+from app.service_layer.gateway import get_service
+from app.service_layer.service_registry import ServiceRegistry
+from app.settings.gateway_settings import GatewaySettings
+
+
+@pytest.fixture(name="services_file")
+def fixture_services_file(tmp_path, monkeypatch):
+    path = tmp_path / "services.json"
+    path.write_text(json.dumps([{"name": "Auth", "base_url": "http://auth"}]))
+    monkeypatch.setenv("GATEWAY_SERVICES_FILE", str(path))
+    return path
+
+
+class TestServiceRegistry:
+
+    @pytest.mark.asyncio
+    async def test_services_are_looked_up_by_normalized_name(self):
+        """
+        GIVEN a registry
+        WHEN services are looked up under any casing
+        THEN the registered service is returned, and unknown ones are unavailable
+        """
+        # given
+        registry = ServiceRegistry([Service(name="Auth", base_url="http://auth")])
+
+        # when
+        service = await get_service(service_name="AUTH", services=registry)
+
+        # then
+        assert service.base_url == "http://auth"
+        with pytest.raises(HTTPException) as error:
+            await get_service(service_name="unknown", services=registry)
+
+        assert error.value.status_code == HTTP_503_SERVICE_UNAVAILABLE
+
+    def test_reload_swaps_services(self, services_file):
+        """
+        GIVEN a registry loaded from a services file
+        WHEN the file changes and the registry is reloaded
+        THEN the new services replace the previous ones
+        """
+        # given
+        registry = ServiceRegistry.from_settings(GatewaySettings())
+        services_file.write_text(json.dumps([{"name": "Scheduler", "base_url": "http://scheduler"}]))
+
+        # when
+        reloaded = registry.reload()
+
+        # then
+        assert reloaded
+        assert registry.get("auth") is None
+        assert [service.name for service in registry] == ["Scheduler"]
+
+    def test_invalid_configuration_keeps_current_services(self, services_file):
+        """
+        GIVEN a registry loaded from a services file
+        WHEN the file becomes invalid and the registry is reloaded
+        THEN the current services are kept
+        """
+        # given
+        registry = ServiceRegistry.from_settings(GatewaySettings())
+        services_file.write_text(json.dumps([{"name": "Scheduler"}]))
+
+        # when
+        reloaded = registry.reload()
+
+        # then
+        assert not reloaded
+        assert registry.get("auth") is not None
+
+    @pytest.mark.asyncio
+    async def test_watch_reloads_on_file_change(self, services_file):
+        """
+        GIVEN a registry watching its services file
+        WHEN the file changes
+        THEN the services are reloaded
+        """
+        # given
+        registry = ServiceRegistry.from_settings(GatewaySettings())
+        watcher = asyncio.create_task(registry.watch(path=str(services_file), interval=0.01))
+        await asyncio.sleep(0.02)
+
+        # when
+        services_file.write_text(json.dumps([{"name": "Scheduler", "base_url": "http://scheduler"}]))
+        stat = os.stat(services_file)
+        os.utime(services_file, (stat.st_atime, stat.st_mtime + 1))
+        await asyncio.sleep(0.05)
+        watcher.cancel()
+
+        # then
+        assert registry.get("scheduler") is not None
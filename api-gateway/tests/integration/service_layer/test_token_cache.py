@@ -0,0 +1,222 @@
+"""
+Test for the token introspection cache service layer
+"""
+import datetime
+from unittest import mock
+
+import pytest
+from fastapi import HTTPException
+from starlette.status import HTTP_401_UNAUTHORIZED, HTTP_503_SERVICE_UNAVAILABLE
+
+from app.adapters.redis_connector import RedisConnectionError
+from app.adapters.telemetry.prometheus import TOKEN_CACHE_LOOKUPS
+from app.domain.events.auth_service import UserAuthenticated
+from app.service_layer.token_cache import TokenCache, introspect
+from tests.mocks import FakeRedis
+
+NOW = 1_700_000_000.0
+TOKEN = "eyThisIsAFakeToken"
+
+
+def fake_user(expires_in: int | None = None) -> UserAuthenticated:
+    exp = datetime.datetime.fromtimestamp(NOW + expires_in, tz=datetime.timezone.utc) if expires_in else None
+    return UserAuthenticated(id="1", username="johndoe", email="john@doe.mail", role="user", exp=exp)
+
+
+def lookups(tier: str, result: str) -> float:
+    return TOKEN_CACHE_LOOKUPS.labels(tier=tier, result=result, app_name="gateway")._value.get()
+
+
+class TestTokenCache:
+
+    @pytest.fixture
+    def redis(self) -> FakeRedis:
+        return FakeRedis()
+
+    @pytest.fixture
+    def cache(self, redis) -> TokenCache:
+        return TokenCache(redis=redis, ttl=60, negative_ttl=5, clock=lambda: NOW)
+
+    @pytest.mark.asyncio
+    async def test_miss_asks_auth_service_once(self, cache):
+        """
+        GIVEN an empty cache
+        WHEN the same token is authenticated twice
+        THEN the auth service is asked once, and the second lookup hits the process cache
+        """
+        # given
+        fetch = mock.AsyncMock(return_value=fake_user())
+        hits = lookups("memory", "hit")
+
+        # when
+        first = await introspect(TOKEN, cache=cache, fetch=fetch)
+        second = await introspect(TOKEN, cache=cache, fetch=fetch)
+
+        # then
+        fetch.assert_awaited_once()
+        assert first == second
+        assert lookups("memory", "hit") == hits + 1
+
+    @pytest.mark.asyncio
+    async def test_token_is_not_stored_in_clear(self, cache, redis):
+        """
+        GIVEN a cached token
+        WHEN the cache keys are listed
+        THEN the token is not one of them
+        """
+        # when
+        await cache.set(TOKEN, user=fake_user())
+
+        # then
+        assert all(TOKEN not in key for key in [*redis.data, *cache.identities])
+
+    @pytest.mark.asyncio
+    async def test_redis_is_shared_by_instances(self, cache, redis):
+        """
+        GIVEN a token cached by another gateway instance
+        WHEN it is looked up
+        THEN it is found in redis, and kept in process
+        """
+        # given
+        await cache.set(TOKEN, user=fake_user())
+        other = TokenCache(redis=redis, ttl=60, negative_ttl=5, clock=lambda: NOW)
+        hits = lookups("redis", "hit")
+
+        # when
+        identity = await other.get(TOKEN)
+
+        # then
+        assert identity.user.username == "johndoe"
+        assert lookups("redis", "hit") == hits + 1
+        assert len(other.identities) == 1
+
+    @pytest.mark.asyncio
+    async def test_entry_expires_with_token(self, redis):
+        """
+        GIVEN a token expiring before the cache TTL
+        WHEN it is looked up after it expired
+        THEN it is a miss
+        """
+        # given
+        clock = mock.Mock(return_value=NOW)
+        cache = TokenCache(redis=redis, ttl=60, clock=clock)
+        await cache.set(TOKEN, user=fake_user(expires_in=10))
+
+        # when
+        clock.return_value = NOW + 11
+
+        # then
+        assert await cache.get(TOKEN) is None
+
+    @pytest.mark.asyncio
+    async def test_expired_token_is_not_cached(self, cache):
+        """
+        GIVEN a token which already expired
+        WHEN it is cached
+        THEN it is not
+        """
+        # when
+        await cache.set(TOKEN, user=fake_user(expires_in=-1))
+
+        # then
+        assert await cache.get(TOKEN) is None
+
+    @pytest.mark.asyncio
+    async def test_invalid_token_is_negatively_cached(self, cache):
+        """
+        GIVEN a token the auth service rejects
+        WHEN it is authenticated twice
+        THEN the second rejection is replayed from the cache
+        """
+        # given
+        fetch = mock.AsyncMock(side_effect=HTTPException(status_code=HTTP_401_UNAUTHORIZED, detail="Invalid token."))
+
+        # when
+        for _ in range(2):
+            with pytest.raises(HTTPException) as error:
+                await introspect(TOKEN, cache=cache, fetch=fetch)
+
+        # then
+        fetch.assert_awaited_once()
+        assert error.value.status_code == HTTP_401_UNAUTHORIZED
+
+    @pytest.mark.asyncio
+    async def test_structured_rejection_detail_is_replayed(self, cache, redis):
+        """
+        GIVEN a token the auth service rejects with a structured detail, as FastAPI validation errors are
+        WHEN another gateway instance authenticates it
+        THEN the rejection is replayed from redis, detail included
+        """
+        # given
+        detail = [{"loc": ["header", "authorization"], "msg": "field required", "type": "value_error.missing"}]
+        fetch = mock.AsyncMock(side_effect=HTTPException(status_code=HTTP_401_UNAUTHORIZED, detail=detail))
+
+        with pytest.raises(HTTPException):
+            await introspect(TOKEN, cache=cache, fetch=fetch)
+
+        # when
+        with pytest.raises(HTTPException) as error:
+            await introspect(TOKEN, cache=TokenCache(redis=redis, ttl=60, clock=lambda: NOW), fetch=fetch)
+
+        # then
+        fetch.assert_awaited_once()
+        assert error.value.detail == detail
+
+    @pytest.mark.asyncio
+    async def test_auth_service_failure_is_not_cached(self, cache):
+        """
+        GIVEN the auth service is unavailable
+        WHEN a token is authenticated twice
+        THEN the auth service is asked both times
+        """
+        # given
+        fetch = mock.AsyncMock(side_effect=HTTPException(status_code=HTTP_503_SERVICE_UNAVAILABLE))
+
+        # when
+        for _ in range(2):
+            with pytest.raises(HTTPException):
+                await introspect(TOKEN, cache=cache, fetch=fetch)
+
+        # then
+        assert fetch.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_least_recently_used_is_evicted(self):
+        """
+        GIVEN a full process cache
+        WHEN another token is cached
+        THEN the least recently used one is evicted
+        """
+        # given
+        cache = TokenCache(redis=None, ttl=60, max_size=2, clock=lambda: NOW)
+        await cache.set("first", user=fake_user())
+        await cache.set("second", user=fake_user())
+        await cache.get("first")
+
+        # when
+        await cache.set("third", user=fake_user())
+
+        # then
+        assert await cache.get("first") is not None
+        assert await cache.get("second") is None
+
+    @pytest.mark.asyncio
+    async def test_redis_unavailable(self):
+        """
+        GIVEN redis is unavailable
+        WHEN a token is cached and looked up
+        THEN it is served from the process cache
+        """
+        # given
+        redis = FakeRedis()
+        redis.get = mock.AsyncMock(side_effect=RedisConnectionError)
+        redis.set = mock.AsyncMock(side_effect=RedisConnectionError)
+        cache = TokenCache(redis=redis, ttl=60, clock=lambda: NOW)
+
+        # when
+        await cache.set(TOKEN, user=fake_user())
+
+        # then
+        assert (await cache.get(TOKEN)).user.username == "johndoe"
+        cache.identities.clear()
+        assert await cache.get(TOKEN) is None
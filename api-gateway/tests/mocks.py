@@ -3,9 +3,11 @@ Tests Mocks
 """
 import datetime
 from datetime import timedelta
+import time
 from typing import Any
 from uuid import uuid4
 
+from jose import jwt
 from pydantic import EmailStr
 
 from app.adapters.redis_connector import R, RedisConnector
@@ -44,6 +46,30 @@ def user_registered_response_factory(username: str, user_id: str | None = None)
     }
 
 
+def token_factory(secret: str,
+                  username: str = "johndoe",
+                  expires_in: int = 3600,
+                  kid: str | None = None,
+                  **claims: Any) -> str:
+    """
+    Creates an HS256 JSON Web Token, as the auth service issues them.
+
+    Args:
+        secret (str): The signing secret.
+        username (str): The username claim.
+        expires_in (int): Seconds until the token expires, negative for an expired one.
+        kid (str, optional): The signing key id.
+        **claims: Claims overriding the default ones.
+
+    Returns:
+        str: The signed token.
+    """
+    payload = {"id": "1", "username": username, "email": f"{username}@e.mail", "role": "user",
+               "exp": int(time.time()) + expires_in, **claims}
+
+    return jwt.encode(payload, secret, algorithm="HS256", headers={"kid": kid} if kid else None)
+
+
 def schedule_command_factory(title: str = "Test Meeting") -> ScheduleMeeting:
     """
     Creates a schedule command.
@@ -70,7 +96,7 @@ class FakeRedis(RedisConnector):
     async def ping(self) -> bool:
         return self._ping
 
-    async def set(self, key: str, value: str) -> R:
+    async def set(self, key: str, value: str, expire: int | timedelta | None = None) -> R:
         self.data[key] = value
         return "OK"
 
@@ -93,3 +119,15 @@ class FakeRedis(RedisConnector):
         incr = int(self.data[key]) + 1
         self.data[key] = str(incr)
         return incr
+
+    async def incrby_many(self, increments: dict[str, int], expire: int | timedelta) -> list[int]:
+        for key, amount in increments.items():
+            self.data[key] = str(int(self.data.get(key, 0)) + amount)
+
+        return [int(self.data[key]) for key in increments]
+
+    async def script_load(self, script: str) -> str:
+        raise NotImplementedError
+
+    async def evalsha(self, sha: str, keys: list[str], args: list[str | int | float]) -> Any:
+        raise NotImplementedError
@@ -0,0 +1,91 @@
+"""
+Test module for bulkhead.py
+"""
+import asyncio
+
+import pytest
+from starlette.status import HTTP_503_SERVICE_UNAVAILABLE
+
+from app.adapters.bulkhead import Bulkhead, BulkheadFullError
+from app.domain.models import BulkheadPolicy
+
+
+async def hold(bulkhead: Bulkhead, release: asyncio.Event) -> None:
+    async with bulkhead.slot():
+        await release.wait()
+
+
+class TestBulkhead:
+
+    @pytest.mark.asyncio
+    async def test_queued_request_gets_the_released_slot(self):
+        """
+        GIVEN a bulkhead whose only slot is taken
+        WHEN a request waits for a slot, and the slot is released
+        THEN the request gets it
+        """
+        # given
+        bulkhead = Bulkhead(name="fake", policy=BulkheadPolicy(max_concurrent=1, max_queued=1, queue_timeout=1))
+        release = asyncio.Event()
+        holder = asyncio.create_task(hold(bulkhead, release))
+        await asyncio.sleep(0)
+
+        # when
+        waiter = asyncio.create_task(hold(bulkhead, asyncio.Event()))
+        await asyncio.sleep(0)
+        assert bulkhead.queued == 1
+        release.set()
+        await holder
+        await asyncio.sleep(0)
+
+        # then
+        assert bulkhead.queued == 0
+        assert not waiter.done()
+        waiter.cancel()
+
+    @pytest.mark.asyncio
+    async def test_full_queue_sheds_requests(self):
+        """
+        GIVEN a bulkhead whose slot and queue are taken
+        WHEN another request comes
+        THEN it is shed straight away
+        """
+        # given
+        bulkhead = Bulkhead(name="fake", policy=BulkheadPolicy(max_concurrent=1, max_queued=1, queue_timeout=1))
+        release = asyncio.Event()
+        tasks = [asyncio.create_task(hold(bulkhead, release)) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        # when
+        with pytest.raises(BulkheadFullError) as error:
+            async with bulkhead.slot():
+                pass
+
+        # then
+        assert error.value.status_code == HTTP_503_SERVICE_UNAVAILABLE
+        release.set()
+        await asyncio.gather(*tasks)
+
+    @pytest.mark.asyncio
+    async def test_queue_timeout_sheds_requests(self):
+        """
+        GIVEN a bulkhead whose slot is taken
+        WHEN a request waits longer than the queue timeout
+        THEN it is shed, and leaves the queue
+        """
+        # given
+        bulkhead = Bulkhead(name="fake", policy=BulkheadPolicy(max_concurrent=1, max_queued=1, queue_timeout=0.01))
+        release = asyncio.Event()
+        holder = asyncio.create_task(hold(bulkhead, release))
+        await asyncio.sleep(0)
+
+        # when
+        with pytest.raises(BulkheadFullError):
+            async with bulkhead.slot():
+                pass
+
+        # then
+        assert bulkhead.queued == 0
+        release.set()
+        await holder
+        assert not bulkhead.semaphore.locked()
@@ -0,0 +1,167 @@
+"""
+Test module for circuit_breaker.py
+"""
+import pytest
+from aioresponses import aioresponses
+from fastapi import HTTPException
+from starlette.status import HTTP_500_INTERNAL_SERVER_ERROR, HTTP_503_SERVICE_UNAVAILABLE
+
+from app.adapters.circuit_breaker import CircuitBreaker, CircuitOpenError, get_circuit_breaker
+from app.adapters.network import gateway
+from app.domain.models import CircuitBreakerPolicy, CircuitState, Service
+
+FAKE_SERVICE_URL = "http://fake-service"
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestCircuitBreaker:
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def breaker(self, clock):
+        policy = CircuitBreakerPolicy(window=4, minimum_calls=4, failure_rate=0.5, slow_call_duration=1.0,
+                                      open_duration=10.0, half_open_calls=2)
+        return CircuitBreaker(name="fake", policy=policy, clock=clock)
+
+    def test_opens_once_failure_rate_is_reached(self, breaker):
+        """
+        GIVEN a closed circuit
+        WHEN half of the most recent calls failed
+        THEN the circuit opens and rejects calls
+        """
+        # when
+        for failed in (False, True, False, True):
+            breaker.acquire()
+            breaker.record(failed=failed, duration=0.1)
+
+        # then
+        assert breaker.state == CircuitState.OPEN
+        with pytest.raises(CircuitOpenError) as error:
+            breaker.acquire()
+
+        assert error.value.status_code == HTTP_503_SERVICE_UNAVAILABLE
+
+    def test_slow_calls_count_as_failures(self, breaker):
+        """
+        GIVEN a closed circuit
+        WHEN the most recent calls succeeded, but slowly
+        THEN the circuit opens
+        """
+        # when
+        for _ in range(4):
+            breaker.record(failed=False, duration=2.0)
+
+        # then
+        assert breaker.state == CircuitState.OPEN
+
+    def test_stays_closed_below_minimum_calls(self, breaker):
+        """
+        GIVEN a closed circuit
+        WHEN fewer calls than the minimum all failed
+        THEN the circuit stays closed
+        """
+        # when
+        for _ in range(3):
+            breaker.record(failed=True, duration=0.1)
+
+        # then
+        assert breaker.state == CircuitState.CLOSED
+
+    @pytest.mark.parametrize("trial_fails, expected_state", [(False, CircuitState.CLOSED), (True, CircuitState.OPEN)])
+    def test_half_open_trials_decide_next_state(self, breaker, clock, trial_fails, expected_state):
+        """
+        GIVEN a circuit which has been open long enough to half-open
+        WHEN the trial calls complete
+        THEN the circuit closes if they all succeeded, and reopens otherwise
+        """
+        # given
+        for _ in range(4):
+            breaker.record(failed=True, duration=0.1)
+        clock.now = 10.0
+        assert breaker.state == CircuitState.HALF_OPEN
+
+        # when
+        breaker.acquire()
+        breaker.acquire()
+        with pytest.raises(CircuitOpenError):
+            breaker.acquire()
+
+        breaker.record(failed=False, duration=0.1)
+        breaker.record(failed=trial_fails, duration=0.1)
+
+        # then
+        assert breaker.state == expected_state
+
+    def test_registry_returns_one_breaker_per_service(self):
+        """
+        GIVEN a service
+        WHEN its circuit breaker is requested under different name casings
+        THEN the same breaker is returned
+        """
+        # when
+        breaker = get_circuit_breaker(Service(name="Fake", base_url=FAKE_SERVICE_URL))
+
+        # then
+        assert get_circuit_breaker(Service(name="fake", base_url=FAKE_SERVICE_URL)) is breaker
+
+
+class TestGatewayCircuitBreaker:
+
+    @pytest.fixture
+    def fake_web(self):
+        with aioresponses() as mock:
+            yield mock
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_fails_fast(self, fake_web, aio_http_client):
+        """
+        GIVEN a service answering with server errors
+        WHEN enough requests failed to open its circuit
+        THEN the next request is rejected without reaching the service
+        """
+        # given
+        service = Service(name="fake", base_url=FAKE_SERVICE_URL,
+                          circuit_breaker=CircuitBreakerPolicy(window=2, minimum_calls=2))
+        fake_web.get(f"{FAKE_SERVICE_URL}/items", status=HTTP_500_INTERNAL_SERVER_ERROR, payload={}, repeat=True)
+
+        for _ in range(2):
+            _, status_code = await gateway(client=aio_http_client, method="GET", service=service, path="/items")
+            assert status_code == HTTP_500_INTERNAL_SERVER_ERROR
+
+        # when
+        with pytest.raises(HTTPException) as error:
+            await gateway(client=aio_http_client, method="GET", service=service, path="/items")
+
+        # then
+        assert error.value.status_code == HTTP_503_SERVICE_UNAVAILABLE
+        assert len(list(fake_web.requests.values())[0]) == 2
+
+    @pytest.mark.asyncio
+    async def test_disabled_breaker_lets_every_request_through(self, fake_web, aio_http_client):
+        """
+        GIVEN a service whose circuit breaker is disabled
+        WHEN it keeps answering with server errors
+        THEN every request reaches it
+        """
+        # given
+        service = Service(name="fake", base_url=FAKE_SERVICE_URL,
+                          circuit_breaker=CircuitBreakerPolicy(enabled=False, window=2, minimum_calls=2))
+        fake_web.get(f"{FAKE_SERVICE_URL}/items", status=HTTP_500_INTERNAL_SERVER_ERROR, payload={}, repeat=True)
+
+        # when
+        statuses = [(await gateway(client=aio_http_client, method="GET", service=service, path="/items"))[1]
+                    for _ in range(3)]
+
+        # then
+        assert statuses == [HTTP_500_INTERNAL_SERVER_ERROR] * 3
@@ -0,0 +1,122 @@
+"""
+Test module for concurrency_limiter.py
+"""
+import pytest
+from starlette.status import HTTP_503_SERVICE_UNAVAILABLE
+
+from app.adapters.concurrency_limiter import AimdLimiter, ConcurrencyLimitError, GradientLimiter, \
+    get_concurrency_limiter
+from app.domain.models import ConcurrencyLimitPolicy, LimitAlgorithm, Service
+
+
+class TestAimdLimiter:
+
+    @pytest.fixture
+    def limiter(self):
+        policy = ConcurrencyLimitPolicy(initial_limit=2, min_limit=1, max_limit=10, backoff_ratio=0.5,
+                                        latency_threshold=1.0)
+        return AimdLimiter(name="fake", policy=policy)
+
+    def test_rejects_requests_beyond_the_limit(self, limiter):
+        """
+        GIVEN a limiter allowing two requests in flight
+        WHEN a third one comes
+        THEN it is rejected
+        """
+        # given
+        limiter.acquire()
+        limiter.acquire()
+
+        # when / then
+        with pytest.raises(ConcurrencyLimitError) as error:
+            limiter.acquire()
+
+        assert error.value.status_code == HTTP_503_SERVICE_UNAVAILABLE
+
+    def test_success_at_capacity_grows_the_limit(self, limiter):
+        """
+        GIVEN a limiter with requests in flight up to its limit
+        WHEN one succeeds quickly
+        THEN the limit grows by one
+        """
+        # given
+        limiter.acquire()
+        limiter.acquire()
+
+        # when
+        limiter.release(latency=0.1)
+
+        # then
+        assert limiter.limit == 3
+
+    @pytest.mark.parametrize("latency, dropped", [(0.1, True), (2.0, False)])
+    def test_failure_or_high_latency_shrinks_the_limit(self, limiter, latency, dropped):
+        """
+        GIVEN a limiter
+        WHEN a request fails, or is slower than the latency threshold
+        THEN the limit is multiplied by the backoff ratio
+        """
+        # given
+        limiter.acquire()
+
+        # when
+        limiter.release(latency=latency, dropped=dropped)
+
+        # then
+        assert limiter.limit == 1
+
+    def test_limit_never_goes_below_minimum(self, limiter):
+        """
+        GIVEN a limiter
+        WHEN requests keep failing
+        THEN the limit stays at its minimum
+        """
+        # when
+        for _ in range(5):
+            limiter.acquire()
+            limiter.release(latency=0.1, dropped=True)
+
+        # then
+        assert limiter.limit == 1
+        assert limiter.in_flight == 0
+
+
+class TestGradientLimiter:
+
+    def test_rising_latency_shrinks_the_limit(self):
+        """
+        GIVEN a gradient limiter which observed a steady latency
+        WHEN the latency rises well above it
+        THEN the limit shrinks
+        """
+        # given
+        limiter = GradientLimiter(name="fake", policy=ConcurrencyLimitPolicy(initial_limit=4, tolerance=1.0,
+                                                                             smoothing=1.0))
+        for _ in range(3):
+            limiter.acquire()
+        limiter.release(latency=0.1)
+        limit = limiter.limit
+
+        # when
+        limiter.acquire()
+        limiter.release(latency=10.0)
+
+        # then
+        assert limiter.limit < limit
+
+    def test_registry_follows_service_algorithm(self):
+        """
+        GIVEN a service
+        WHEN its limit algorithm changes
+        THEN its limiter is replaced
+        """
+        # given
+        service = Service(name="fake", base_url="http://fake")
+        assert isinstance(get_concurrency_limiter(service), AimdLimiter)
+
+        # when
+        service = Service(name="fake", base_url="http://fake",
+                          concurrency_limit=ConcurrencyLimitPolicy(algorithm=LimitAlgorithm.GRADIENT))
+
+        # then
+        assert isinstance(get_concurrency_limiter(service), GradientLimiter)
@@ -1,11 +1,15 @@
 """
 Test module for http_client.py
 """
+import asyncio
+
 import aiohttp
 from aioresponses import aioresponses
 import pytest
+from yarl import URL
 
 from app.adapters.http_client import AiohttpClient
+from app.domain.models import ConnectionPool, Service
 
 
 class TestAiohttpClient:
@@ -37,6 +41,64 @@ class TestAiohttpClient:
         # then
         assert client.aiohttp_client is None
 
+    @pytest.mark.asyncio
+    async def test_should_create_a_tuned_client_per_service(self):
+        # given
+        client = AiohttpClient()
+        auth = Service(name="auth", base_url="http://auth",
+                       pool=ConnectionPool(size=5, keepalive_timeout=3, connect_timeout=1, read_timeout=4,
+                                           dns_cache_ttl=30, timeout=8))
+        scheduler = Service(name="scheduler", base_url="http://scheduler")
+
+        # when
+        auth_session = client.get_aiohttp_client(auth)
+        scheduler_session = client.get_aiohttp_client(scheduler)
+
+        # then
+        assert auth_session is not scheduler_session
+        assert auth_session is client.get_aiohttp_client(Service(name="Auth", base_url="http://auth", pool=auth.pool))
+        assert auth_session.connector.limit == 5
+        assert auth_session.connector.limit_per_host == 5
+        assert auth_session.connector._keepalive_timeout == 3
+        assert auth_session.timeout == aiohttp.ClientTimeout(total=8, sock_connect=1, sock_read=4)
+        assert scheduler_session.connector.limit == ConnectionPool().size
+
+        await client.close_aiohttp_client()
+        assert auth_session.closed and scheduler_session.closed
+        assert not client.service_clients
+
+    @pytest.mark.asyncio
+    async def test_should_replace_the_client_of_a_service_whose_pool_changed(self):
+        # given
+        client = AiohttpClient()
+        session = client.get_aiohttp_client(Service(name="auth", base_url="http://auth",
+                                                    pool=ConnectionPool(timeout=0)))
+
+        # when
+        replaced = client.get_aiohttp_client(Service(name="auth", base_url="http://auth", pool=ConnectionPool(size=5)))
+        await asyncio.sleep(0.01)
+
+        # then
+        assert replaced is not session
+        assert replaced.connector.limit == 5
+        assert session.closed and not replaced.closed
+        assert not client.retired_clients
+
+        await client.close_aiohttp_client()
+
+    @pytest.mark.asyncio
+    async def test_should_time_out_shared_client_after_default_pool(self):
+        # given
+        client = AiohttpClient()
+
+        # when
+        session = client.get_aiohttp_client()
+
+        # then
+        assert session.timeout.total == ConnectionPool().timeout
+
+        await client.close_aiohttp_client()
+
     @pytest.mark.asyncio
     @pytest.mark.parametrize(
         "status, headers, raise_for_status",
@@ -118,6 +180,27 @@ class TestAiohttpClient:
         if headers:
             assert response.request_info.headers == headers
 
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("method", ["post", "put", "patch"])
+    async def test_should_send_pre_encoded_body_as_is(self, fake_web, method, aio_http_client):
+        # given
+        body = b'{"fooBar": 1}'
+        getattr(fake_web, method)("https://example.com/api", status=200, payload={"fake": "response"})
+
+        # when
+        await getattr(aio_http_client, method)(
+            "https://example.com/api",
+            data=body,
+            headers={"foo": "bar"},
+            content_type="application/vnd.api+json",
+        )
+
+        # then
+        [request] = fake_web.requests[(method.upper(), URL("https://example.com/api"))]
+        assert request.kwargs["data"] is body
+        assert "json" not in request.kwargs
+        assert request.kwargs["headers"] == {"foo": "bar", "Content-Type": "application/vnd.api+json"}
+
     @pytest.mark.asyncio
     @pytest.mark.parametrize("status", [404, 500])
     async def test_should_execute_post_and_raise(self, fake_web, status, aio_http_client):
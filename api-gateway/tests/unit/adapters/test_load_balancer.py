@@ -0,0 +1,167 @@
+"""
+Test module for load_balancer.py
+"""
+import pytest
+from aioresponses import aioresponses
+from pydantic import ValidationError
+from starlette.status import HTTP_200_OK
+
+from app.adapters.load_balancer import (Endpoint, LeastOutstandingBalancer, PeakEwmaBalancer, RoundRobinBalancer,
+                                        get_load_balancer)
+from app.adapters.network import gateway
+from app.domain.models import Balancer, Service
+
+ENDPOINTS = ["http://replica-1", "http://replica-2"]
+
+
+@pytest.fixture(name="endpoints")
+def fixture_endpoints() -> list[Endpoint]:
+    return [Endpoint(service="fake", url=url) for url in ENDPOINTS]
+
+
+class TestBalancers:
+
+    def test_round_robin_picks_endpoints_in_turn(self, endpoints):
+        """
+        GIVEN a round-robin balancer over two endpoints
+        WHEN endpoints are picked
+        THEN they are picked in turn
+        """
+        # given
+        balancer = RoundRobinBalancer(endpoints)
+
+        # when
+        picked = [balancer.pick().url for _ in range(4)]
+
+        # then
+        assert picked == ENDPOINTS * 2
+
+    def test_least_outstanding_picks_the_idle_endpoint(self, endpoints):
+        """
+        GIVEN a least-outstanding balancer, and a request in flight to the first endpoint
+        WHEN an endpoint is picked
+        THEN the idle one is picked
+        """
+        # given
+        balancer = LeastOutstandingBalancer(endpoints)
+        endpoints[0].start()
+
+        # when
+        picked = balancer.pick()
+
+        # then
+        assert picked.url == ENDPOINTS[1]
+
+    def test_peak_ewma_avoids_the_slow_endpoint(self, endpoints):
+        """
+        GIVEN a peak-EWMA balancer, and a slow first endpoint
+        WHEN an endpoint is picked
+        THEN the fast one is picked
+        """
+        # given
+        balancer = PeakEwmaBalancer(endpoints)
+        for endpoint, latency in zip(endpoints, (1.0, 0.1)):
+            endpoint.start()
+            endpoint.finish(latency)
+
+        # when
+        picked = balancer.pick()
+
+        # then
+        assert picked.url == ENDPOINTS[1]
+        assert endpoints[0].ewma == 1.0
+
+    @pytest.mark.asyncio
+    async def test_endpoint_tracks_requests_in_flight(self, endpoints):
+        """
+        GIVEN a balancer
+        WHEN a request is sent to one of its endpoints
+        THEN it is counted in flight until it completes
+        """
+        # given
+        balancer = RoundRobinBalancer(endpoints)
+
+        # when
+        async with balancer.endpoint() as url:
+            # then
+            assert url == ENDPOINTS[0]
+            assert endpoints[0].in_flight == 1
+
+        assert endpoints[0].in_flight == 0
+
+    def test_registry_follows_service_strategy(self):
+        """
+        GIVEN a service
+        WHEN its balancing strategy changes
+        THEN its load balancer is replaced
+        """
+        # given
+        service = Service(name="fake", endpoints=ENDPOINTS)
+        assert isinstance(get_load_balancer(service), RoundRobinBalancer)
+
+        # when
+        service = Service(name="fake", endpoints=ENDPOINTS, balancer=Balancer.PEAK_EWMA)
+
+        # then
+        assert isinstance(get_load_balancer(service), PeakEwmaBalancer)
+
+
+class TestServiceEndpoints:
+
+    def test_endpoints_default_to_base_url(self):
+        """
+        GIVEN a service with a base url only
+        WHEN it is created
+        THEN the base url is its only endpoint
+        """
+        # when
+        service = Service(name="fake", base_url=ENDPOINTS[0])
+
+        # then
+        assert service.endpoints == [ENDPOINTS[0]]
+
+    def test_base_url_defaults_to_first_endpoint(self):
+        """
+        GIVEN a service with endpoints only
+        WHEN it is created
+        THEN its base url is the first endpoint
+        """
+        # when
+        service = Service(name="fake", endpoints=ENDPOINTS)
+
+        # then
+        assert service.base_url == ENDPOINTS[0]
+
+    def test_service_needs_an_url(self):
+        """
+        GIVEN a service without base url nor endpoints
+        WHEN it is created
+        THEN it is invalid
+        """
+        # when / then
+        with pytest.raises(ValidationError):
+            Service(name="fake")
+
+
+class TestGatewayLoadBalancing:
+
+    @pytest.mark.asyncio
+    async def test_requests_are_spread_across_endpoints(self, aio_http_client):
+        """
+        GIVEN a service with two endpoints
+        WHEN two requests are made through the gateway
+        THEN each endpoint gets one
+        """
+        # given
+        service = Service(name="fake", endpoints=ENDPOINTS)
+
+        with aioresponses() as fake_web:
+            for url in ENDPOINTS:
+                fake_web.post(f"{url}/items", status=HTTP_200_OK, payload={"from": url})
+
+            # when
+            bodies = [(await gateway(client=aio_http_client, method="POST", service=service, path="/items"))[0]
+                      for _ in ENDPOINTS]
+
+        # then
+        assert bodies == [{"from": url} for url in ENDPOINTS]
@@ -0,0 +1,265 @@
+"""
+Test module for network.py
+"""
+import asyncio
+from unittest import mock
+
+import aiohttp
+from aioresponses import aioresponses
+from fastapi import HTTPException
+import pytest
+from yarl import URL
+from starlette.status import HTTP_200_OK, HTTP_404_NOT_FOUND, HTTP_503_SERVICE_UNAVAILABLE
+
+from app.adapters.bulkhead import get_bulkhead
+from app.adapters.concurrency_limiter import get_concurrency_limiter
+from app.adapters.load_balancer import get_load_balancer
+from app.adapters.network import SingleFlight, forwarded_headers, gateway, gateway_stream
+from app.domain.models import BulkheadPolicy, Service
+
+FAKE_SERVICE_URL = "http://fake-service"
+
+
+async def read_body(response) -> bytes:
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
+class TestGatewayStream:
+
+    @pytest.fixture
+    def fake_web(self):
+        with aioresponses() as mock:
+            yield mock
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("status", [HTTP_200_OK, HTTP_404_NOT_FOUND])
+    async def test_relays_status_headers_and_body(self, fake_web, aio_http_client, status):
+        """
+        GIVEN a service answering with a given status, headers and body
+        WHEN the request is streamed through the gateway
+        THEN the response is relayed as-is
+        """
+        # given
+        body = b'{"data": [{"id": "1"}]}'
+        fake_web.get(f"{FAKE_SERVICE_URL}/items", status=status, body=body,
+                     headers={"Content-Type": "application/json", "X-Trace": "abc"})
+
+        # when
+        response = await gateway_stream(client=aio_http_client, method="GET", service_url=FAKE_SERVICE_URL,
+                                        path="/items")
+
+        # then
+        assert response.status_code == status
+        assert response.headers["x-trace"] == "abc"
+        assert response.headers["content-type"] == "application/json"
+        assert await read_body(response) == body
+
+    @pytest.mark.asyncio
+    async def test_unreachable_service_is_unavailable(self, fake_web, aio_http_client):
+        """
+        GIVEN a service which cannot be reached
+        WHEN the request is streamed through the gateway
+        THEN it raises Service Unavailable
+        """
+        # given
+        error = aiohttp.ClientConnectorError(connection_key=mock.MagicMock(), os_error=OSError("unreachable"))
+        fake_web.get(f"{FAKE_SERVICE_URL}/items", exception=error)
+
+        # when / then
+        with pytest.raises(HTTPException) as error:
+            await gateway_stream(client=aio_http_client, method="GET", service_url=FAKE_SERVICE_URL, path="/items")
+
+        assert error.value.status_code == HTTP_503_SERVICE_UNAVAILABLE
+
+    @pytest.mark.asyncio
+    async def test_slots_are_held_until_the_body_is_relayed(self, fake_web, aio_http_client):
+        """
+        GIVEN a service with a bulkhead, an adaptive concurrency limit and a load balancer
+        WHEN its response headers arrived, then its body is relayed
+        THEN the request holds its slots and its endpoint until the body is relayed
+        """
+        # given
+        service = Service(name="fake", base_url=FAKE_SERVICE_URL, bulkhead=BulkheadPolicy(max_concurrent=1))
+        fake_web.get(f"{FAKE_SERVICE_URL}/items", status=HTTP_200_OK, body=b"[]")
+        response = await gateway_stream(client=aio_http_client, method="GET", service=service, path="/items")
+        [endpoint] = get_load_balancer(service).endpoints
+
+        # when
+        in_flight = (get_bulkhead(service).semaphore.locked(), get_concurrency_limiter(service).in_flight,
+                     endpoint.in_flight)
+        await read_body(response)
+
+        # then
+        assert in_flight == (True, 1, 1)
+        assert not get_bulkhead(service).semaphore.locked()
+        assert get_concurrency_limiter(service).in_flight == 0
+        assert endpoint.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_slots_are_released_when_the_body_is_never_relayed(self, fake_web, aio_http_client):
+        """
+        GIVEN a service with a bulkhead, an adaptive concurrency limit and a load balancer
+        WHEN the client goes away before the response starts, so that its body is never iterated
+        THEN the request slots and its endpoint are released all the same
+        """
+        # given
+        service = Service(name="fake", base_url=FAKE_SERVICE_URL, bulkhead=BulkheadPolicy(max_concurrent=1))
+        fake_web.get(f"{FAKE_SERVICE_URL}/items", status=HTTP_200_OK, body=b"[]")
+        response = await gateway_stream(client=aio_http_client, method="GET", service=service, path="/items")
+        [endpoint] = get_load_balancer(service).endpoints
+
+        async def receive():
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            await asyncio.Event().wait()
+
+        # when
+        await response({"type": "http"}, receive, send)
+
+        # then
+        assert not get_bulkhead(service).semaphore.locked()
+        assert get_concurrency_limiter(service).in_flight == 0
+        assert endpoint.in_flight == 0
+
+    def test_hop_by_hop_headers_are_not_forwarded(self):
+        """
+        GIVEN service response headers with hop-by-hop and body encoding headers
+        WHEN they are filtered
+        THEN only end-to-end headers remain
+        """
+        # given
+        headers = {"Connection": "keep-alive", "Transfer-Encoding": "chunked", "Content-Length": "10",
+                   "Content-Encoding": "gzip", "Content-Type": "application/json"}
+
+        # when
+        forwarded = forwarded_headers(headers)
+
+        # then
+        assert forwarded == {"Content-Type": "application/json"}
+
+
+
+class TestGateway:
+
+    @pytest.fixture
+    def fake_web(self):
+        with aioresponses() as mock:
+            yield mock
+
+    @pytest.mark.asyncio
+    async def test_encoded_body_is_forwarded_without_re_encoding(self, fake_web, aio_http_client):
+        """
+        GIVEN a command already encoded as JSON
+        WHEN it is forwarded through the gateway
+        THEN the service receives the very same bytes
+        """
+        # given
+        command = '{"username": "johndoe", "voting": true}'
+        fake_web.patch(f"{FAKE_SERVICE_URL}/items/1", status=HTTP_200_OK, payload={"data": {}})
+
+        # when
+        _, status_code = await gateway(client=aio_http_client, method="PATCH", service_url=FAKE_SERVICE_URL,
+                                       path="/items/1", request_body=command)
+
+        # then
+        [request] = fake_web.requests[("PATCH", URL(f"{FAKE_SERVICE_URL}/items/1"))]
+        assert status_code == HTTP_200_OK
+        assert request.kwargs["data"] == command.encode()
+        assert request.kwargs["headers"]["Content-Type"] == "application/json"
+
+    @pytest.mark.asyncio
+    async def test_identical_concurrent_gets_are_coalesced(self, fake_web, aio_http_client):
+        """
+        GIVEN many identical GET requests in flight
+        WHEN they are sent through the gateway
+        THEN the service is requested once, and every caller gets its response
+        """
+        # given
+        fake_web.get(f"{FAKE_SERVICE_URL}/items/1", status=HTTP_200_OK, payload={"data": {"id": "1"}})
+
+        # when
+        responses = await asyncio.gather(*[
+            gateway(client=aio_http_client, method="GET", service_url=FAKE_SERVICE_URL, path="/items/1")
+            for _ in range(5)
+        ])
+
+        # then
+        assert len(fake_web.requests[("GET", URL(f"{FAKE_SERVICE_URL}/items/1"))]) == 1
+        assert responses == [({"data": {"id": "1"}}, HTTP_200_OK)] * 5
+
+    @pytest.mark.asyncio
+    async def test_gets_with_different_headers_are_not_coalesced(self, fake_web, aio_http_client):
+        """
+        GIVEN concurrent GET requests on behalf of different users
+        WHEN they are sent through the gateway
+        THEN each of them reaches the service
+        """
+        # given
+        fake_web.get(f"{FAKE_SERVICE_URL}/me", status=HTTP_200_OK, payload={}, repeat=True)
+
+        # when
+        await asyncio.gather(*[
+            gateway(client=aio_http_client, method="GET", service_url=FAKE_SERVICE_URL, path="/me",
+                    headers={"Authorization": f"Bearer {token}"})
+            for token in ("a", "b")
+        ])
+
+        # then
+        assert len(fake_web.requests[("GET", URL(f"{FAKE_SERVICE_URL}/me"))]) == 2
+
+
+class TestSingleFlight:
+
+    @pytest.mark.asyncio
+    async def test_shares_failures(self):
+        """
+        GIVEN a failing call, and an identical one in flight
+        WHEN both are awaited
+        THEN both callers get the failure from a single execution
+        """
+        # given
+        single_flight = SingleFlight()
+        calls = 0
+
+        async def call():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0)
+            raise HTTPException(status_code=HTTP_503_SERVICE_UNAVAILABLE)
+
+        # when
+        results = await asyncio.gather(single_flight.do("key", call), single_flight.do("key", call),
+                                       return_exceptions=True)
+
+        # then
+        assert calls == 1
+        assert all(isinstance(result, HTTPException) for result in results)
+        assert not single_flight.calls
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_the_others(self):
+        """
+        GIVEN a call shared by two callers
+        WHEN the first caller is cancelled
+        THEN the second one still gets the result
+        """
+        # given
+        single_flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def call():
+            await release.wait()
+            return "result"
+
+        leader = asyncio.ensure_future(single_flight.do("key", call))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(single_flight.do("key", call))
+        await asyncio.sleep(0)
+
+        # when
+        leader.cancel()
+        release.set()
+
+        # then
+        assert await follower == ("result", True)
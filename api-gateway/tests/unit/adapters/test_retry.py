@@ -0,0 +1,216 @@
+"""
+Test module for retry.py
+"""
+import asyncio
+from unittest import mock
+
+import aiohttp
+import pytest
+from aioresponses import aioresponses
+from starlette.status import HTTP_200_OK, HTTP_201_CREATED, HTTP_503_SERVICE_UNAVAILABLE
+
+from app.adapters.network import gateway
+from app.adapters.retry import RetryBudget, get_latency_window, hedged, retrying
+from app.domain.models import RetryPolicy, Service
+
+FAKE_SERVICE_URL = "http://fake-service"
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(name="service")
+def fixture_service() -> Service:
+    return Service(name="fake", base_url=FAKE_SERVICE_URL, retry=RetryPolicy(attempts=3, backoff=0))
+
+
+class TestRetryBudget:
+
+    def test_denies_retries_once_exhausted(self):
+        """
+        GIVEN a retry budget granting one retry per second
+        WHEN more retries are requested within a second
+        THEN only the available ones are allowed
+        """
+        # given
+        clock = FakeClock()
+        budget = RetryBudget(ratio=0.0, min_per_second=0.1, clock=clock)
+
+        # when
+        allowed = [budget.withdraw() for _ in range(2)]
+
+        # then
+        assert allowed == [True, False]
+
+    def test_requests_and_time_refill_the_budget(self):
+        """
+        GIVEN an exhausted retry budget
+        WHEN requests are made, then time passes
+        THEN retries are allowed again
+        """
+        # given
+        clock = FakeClock()
+        budget = RetryBudget(ratio=0.5, min_per_second=0.1, clock=clock)
+        budget.withdraw()
+
+        # when / then
+        budget.deposit()
+        assert not budget.withdraw()
+        budget.deposit()
+        assert budget.withdraw()
+
+        clock.now = 10.0
+        assert budget.withdraw()
+
+
+    def test_deposits_do_not_raise_the_capacity(self):
+        """
+        GIVEN a retry budget granting one retry per second
+        WHEN many requests deposit tokens at once
+        THEN the retries allowed are still bounded by ten seconds worth of the minimum allowance
+        """
+        # given
+        clock = FakeClock()
+        budget = RetryBudget(ratio=0.5, min_per_second=1.0, clock=clock)
+
+        # when
+        for _ in range(100):
+            budget.deposit()
+
+        # then
+        assert sum(budget.withdraw() for _ in range(50)) == 10
+
+class TestRetrying:
+
+    @pytest.mark.asyncio
+    async def test_retries_retryable_results(self, service):
+        """
+        GIVEN a call answering with Service Unavailable, then Ok
+        WHEN it is retried
+        THEN the Ok result is returned
+        """
+        # given
+        call = mock.AsyncMock(side_effect=[HTTP_503_SERVICE_UNAVAILABLE, HTTP_200_OK])
+
+        # when
+        result = await retrying(service=service, call=call, retryable=lambda status: status >= 500,
+                                budget=RetryBudget(ratio=0, min_per_second=1))
+
+        # then
+        assert result == HTTP_200_OK
+        assert call.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_stops_when_budget_is_exhausted(self, service):
+        """
+        GIVEN a call which keeps failing, and a budget allowing a single retry
+        WHEN it is retried
+        THEN it is attempted twice only
+        """
+        # given
+        call = mock.AsyncMock(return_value=HTTP_503_SERVICE_UNAVAILABLE)
+
+        # when
+        result = await retrying(service=service, call=call, retryable=lambda status: status >= 500,
+                                budget=RetryBudget(ratio=0, min_per_second=0.1))
+
+        # then
+        assert result == HTTP_503_SERVICE_UNAVAILABLE
+        assert call.await_count == 2
+
+
+class TestHedged:
+
+    @pytest.mark.asyncio
+    async def test_slow_call_is_hedged(self):
+        """
+        GIVEN a service with hedging enabled and observed latencies
+        WHEN a call takes longer than the observed percentile
+        THEN a second copy is sent, and the first result to arrive is returned
+        """
+        # given
+        service = Service(name="fake", base_url=FAKE_SERVICE_URL,
+                          retry=RetryPolicy(hedge=True, hedge_min_samples=1))
+        get_latency_window(service).record(0.01)
+        calls = []
+
+        async def call():
+            calls.append(len(calls))
+            await asyncio.sleep(1 if len(calls) == 1 else 0)
+            return len(calls)
+
+        # when
+        result = await hedged(service=service, call=call, budget=RetryBudget(ratio=0, min_per_second=1))
+
+        # then
+        assert result == 2
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_fast_call_is_not_hedged(self):
+        """
+        GIVEN a service with hedging enabled, without enough observed latencies
+        WHEN a call is made
+        THEN it is sent once
+        """
+        # given
+        service = Service(name="fake", base_url=FAKE_SERVICE_URL, retry=RetryPolicy(hedge=True))
+        call = mock.AsyncMock(return_value=HTTP_200_OK)
+
+        # when
+        result = await hedged(service=service, call=call)
+
+        # then
+        assert result == HTTP_200_OK
+        assert call.await_count == 1
+        assert len(get_latency_window(service).samples) == 1
+
+
+class TestGatewayRetries:
+
+    @pytest.fixture
+    def fake_web(self):
+        with aioresponses() as mock:
+            yield mock
+
+    @pytest.mark.asyncio
+    async def test_transient_connection_error_is_retried(self, fake_web, aio_http_client, service):
+        """
+        GIVEN a service which is unreachable once, then answers
+        WHEN a GET request is made through the gateway
+        THEN the request is retried and succeeds
+        """
+        # given
+        error = aiohttp.ClientConnectorError(connection_key=mock.MagicMock(), os_error=OSError("unreachable"))
+        fake_web.get(f"{FAKE_SERVICE_URL}/items", exception=error)
+        fake_web.get(f"{FAKE_SERVICE_URL}/items", status=HTTP_200_OK, payload={"data": []})
+
+        # when
+        body, status_code = await gateway(client=aio_http_client, method="GET", service=service, path="/items")
+
+        # then
+        assert status_code == HTTP_200_OK
+        assert body == {"data": []}
+
+    @pytest.mark.asyncio
+    async def test_non_idempotent_request_is_not_retried(self, fake_web, aio_http_client, service):
+        """
+        GIVEN a service answering with Service Unavailable, then Created
+        WHEN a POST request is made through the gateway
+        THEN it is not retried
+        """
+        # given
+        fake_web.post(f"{FAKE_SERVICE_URL}/items", status=HTTP_503_SERVICE_UNAVAILABLE, payload={})
+        fake_web.post(f"{FAKE_SERVICE_URL}/items", status=HTTP_201_CREATED, payload={})
+
+        # when
+        _, status_code = await gateway(client=aio_http_client, method="POST", service=service, path="/items")
+
+        # then
+        assert status_code == HTTP_503_SERVICE_UNAVAILABLE
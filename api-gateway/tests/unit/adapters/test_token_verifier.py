@@ -0,0 +1,165 @@
+"""
+Test module for token_verifier.py
+"""
+import base64
+import hashlib
+import json
+import time
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+import pytest
+from starlette.status import HTTP_401_UNAUTHORIZED
+
+from app.adapters.token_verifier import InvalidTokenError, TokenVerifier, UnknownKeyError
+from tests.mocks import token_factory
+
+SECRET = "fake-secret"
+PRIVATE_KEY = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+PUBLIC_JWK = jwk.construct(PRIVATE_KEY.public_key().public_bytes(serialization.Encoding.PEM,
+                                                                 serialization.PublicFormat.SubjectPublicKeyInfo),
+                           algorithm="RS256").to_dict()
+
+
+def encode(segment: bytes) -> str:
+    return base64.urlsafe_b64encode(segment).rstrip(b"=").decode()
+
+
+def rs256_token(claims: dict, kid: str = "rsa") -> str:
+    private_pem = PRIVATE_KEY.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                            serialization.NoEncryption())
+
+    return jwt.encode({"exp": int(time.time()) + 3600, **claims}, private_pem, algorithm="RS256",
+                      headers={"kid": kid})
+
+
+class TestHmacTokens:
+
+    @pytest.fixture
+    def verifier(self):
+        return TokenVerifier(secret=SECRET)
+
+    def test_valid_token_claims_are_returned(self, verifier):
+        """
+        GIVEN a token signed with the shared secret
+        WHEN it is verified
+        THEN its claims are returned
+        """
+        # when
+        claims = verifier.verify(token_factory(SECRET, username="johndoe"))
+
+        # then
+        assert claims["username"] == "johndoe"
+
+    @pytest.mark.parametrize("token", [
+        token_factory("other-secret"),
+        token_factory(SECRET, expires_in=-10),
+        token_factory(SECRET, nbf=4102444800),
+        "not-a-token",
+        "e30.e30.",
+        jwt.encode({"username": "johndoe"}, SECRET, algorithm="HS256"),
+    ])
+    def test_invalid_token_is_rejected(self, verifier, token):
+        """
+        GIVEN a token signed with another secret, expired, not valid yet, malformed, or which never expires
+        WHEN it is verified
+        THEN it is rejected as unauthorized
+        """
+        # when / then
+        with pytest.raises(InvalidTokenError) as error:
+            verifier.verify(token)
+
+        assert error.value.status_code == HTTP_401_UNAUTHORIZED
+
+    def test_unsigned_token_is_rejected(self, verifier):
+        """
+        GIVEN a token which claims not to be signed
+        WHEN it is verified
+        THEN it is rejected
+        """
+        # given
+        token = f"{encode(json.dumps({'alg': 'none'}).encode())}.{encode(json.dumps({'username': 'root'}).encode())}."
+
+        # when / then
+        with pytest.raises(InvalidTokenError):
+            verifier.verify(token)
+
+    def test_expiry_leeway(self):
+        """
+        GIVEN a verifier tolerating some clock skew
+        WHEN a token expired within the leeway is verified
+        THEN it is accepted
+        """
+        # given
+        verifier = TokenVerifier(secret=SECRET, leeway=30)
+
+        # when / then
+        assert verifier.verify(token_factory(SECRET, expires_in=-10))
+
+
+class TestKeySetTokens:
+
+    @pytest.fixture
+    def verifier(self):
+        verifier = TokenVerifier(algorithms=["RS256", "HS256"])
+        verifier.load_keys({"keys": [
+            {**PUBLIC_JWK, "kid": "rsa"},
+            {"kty": "oct", "kid": "oct", "k": encode(SECRET.encode())},
+        ]})
+        return verifier
+
+    def test_rsa_token_is_verified_with_public_key(self, verifier):
+        """
+        GIVEN a key set with an RSA public key
+        WHEN a token signed with its private key is verified
+        THEN its claims are returned
+        """
+        # when
+        claims = verifier.verify(rs256_token({"username": "johndoe"}))
+
+        # then
+        assert claims["username"] == "johndoe"
+
+    def test_tampered_rsa_token_is_rejected(self, verifier):
+        """
+        GIVEN a token signed with the RSA private key
+        WHEN its claims are tampered with
+        THEN it is rejected
+        """
+        # given
+        header, _, signature = rs256_token({"username": "johndoe"}).split(".")
+        token = f"{header}.{encode(json.dumps({'username': 'root'}).encode())}.{signature}"
+
+        # when / then
+        with pytest.raises(InvalidTokenError):
+            verifier.verify(token)
+
+    def test_hmac_token_is_verified_with_symmetric_key(self, verifier):
+        """
+        GIVEN a key set with a symmetric key
+        WHEN a token signed with it is verified
+        THEN its claims are returned
+        """
+        # when / then
+        assert verifier.verify(token_factory(SECRET, kid="oct"))["username"] == "johndoe"
+
+    def test_token_cannot_use_public_key_as_hmac_secret(self, verifier):
+        """
+        GIVEN a key set with an RSA public key
+        WHEN a token is signed with HMAC, using the public key as secret
+        THEN it is rejected
+        """
+        # when / then
+        with pytest.raises(InvalidTokenError):
+            verifier.verify(token_factory(hashlib.sha256(PUBLIC_JWK["n"].encode()).hexdigest(), kid="rsa"))
+
+    def test_token_signed_by_unknown_key(self, verifier):
+        """
+        GIVEN a key set
+        WHEN a token signed by a key missing from it is verified
+        THEN it is rejected, telling the key is unknown
+        """
+        # when / then
+        with pytest.raises(UnknownKeyError):
+            verifier.verify(token_factory(SECRET, kid="rotated"))
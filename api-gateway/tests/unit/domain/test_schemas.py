@@ -45,7 +45,7 @@ class TestSchemas:
         """
         model = self.FooSchema(foo="bar", foo_bar="bar_baz")
 
-        assert model.json() == '{"foo": "bar", "fooBar": "bar_baz"}'
+        assert model.json() == '{"foo":"bar","fooBar":"bar_baz"}'
 
     def test_camel_case_model_with_none_is_camel_case(self):
         """
@@ -55,4 +55,4 @@ class TestSchemas:
         """
         model = self.FooSchema(foo="bar")
 
-        assert model.json() == '{"foo": "bar"}'
+        assert model.json() == '{"foo":"bar"}'
@@ -0,0 +1,133 @@
+"""
+Test module for ndjson.py
+"""
+import json
+from typing import AsyncIterator
+from unittest import mock
+
+import pytest
+
+from app.utils import ndjson as ndjson_module
+from app.utils.ndjson import InvalidStreamError, iter_items, ndjson
+
+DOCUMENT = json.dumps({
+    "next": "cursor",
+    "count": 123,
+    "data": [{"id": str(i), "title": "Sprint \"Planning\" [é]"} for i in range(5)],
+    "links": {"self": "/api/v1/schedules"},
+}).encode()
+
+
+async def chunked(document: bytes, size: int) -> AsyncIterator[bytes]:
+    for start in range(0, len(document), size):
+        yield document[start:start + size]
+
+
+class TestIterItems:
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("size", [1, 3, 16, len(DOCUMENT)])
+    async def test_items_are_decoded_whatever_the_chunks(self, size):
+        """
+        GIVEN a JSON object wrapping an array of items among other members
+        WHEN it is received in chunks of any size, splitting strings and multibyte characters
+        THEN every item is decoded, in order
+        """
+        # when
+        items = [item async for item in iter_items(chunked(DOCUMENT, size))]
+
+        # then
+        assert items == json.loads(DOCUMENT)["data"]
+
+    @pytest.mark.asyncio
+    async def test_items_are_decoded_before_the_document_ends(self):
+        """
+        GIVEN a JSON object which is still being received
+        WHEN its first item arrived whole
+        THEN the item is decoded already
+        """
+        # given
+        async def chunks() -> AsyncIterator[bytes]:
+            yield b'{"data": [{"id": "1"}, {"id'
+            raise ConnectionError
+
+        items = iter_items(chunks())
+
+        # when
+        item = await items.__anext__()
+
+        # then
+        assert item == {"id": "1"}
+
+    @pytest.mark.asyncio
+    async def test_items_are_decoded_once_whole(self):
+        """
+        GIVEN a JSON object wrapping a large item, with literals, escaped quotes and nested arrays
+        WHEN it is received one byte at a time
+        THEN the item is decoded once, when it was received whole
+        """
+        # given
+        item = {"title": 'Say \\"hi\\" [{', "done": True, "empty": None, "ranks": [[1.5, -2], []] * 50}
+        document = json.dumps({"data": [item, False]}).encode()
+
+        # when
+        with mock.patch.object(ndjson_module.decoder, "raw_decode", wraps=ndjson_module.decoder.raw_decode) as decode:
+            items = [item async for item in iter_items(chunked(document, 1))]
+
+        # then
+        assert items == [item, False]
+        assert [buffer[position] for buffer, position in (call.args for call in decode.call_args_list)].count("{") == 1
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("chunks, expected", [
+        ([b'{"data":[1.', b'5]}'], 1.5),
+        ([b'{"data":[1e', b'5]}'], 1e5),
+        ([b'{"data":[-', b'12]}'], -12),
+        ([b'{"data":[-1', b'2]}'], -12),
+    ])
+    async def test_numbers_split_across_chunks_are_decoded_whole(self, chunks, expected):
+        """
+        GIVEN a JSON object wrapping a number which is split across chunks
+        WHEN its items are decoded
+        THEN the number is decoded once received whole, rather than from its first digits
+        """
+        # given
+        async def received() -> AsyncIterator[bytes]:
+            for chunk in chunks:
+                yield chunk
+
+        # when
+        items = [item async for item in iter_items(received())]
+
+        # then
+        assert items == [expected]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("document", [b'{"data": [{"id": "1"}', b'[{"id": "1"}]', b'{"data": [{"id": 1x}]}',
+                                          b'{"data": [nope]}'])
+    async def test_invalid_document_is_rejected(self, document):
+        """
+        GIVEN a truncated JSON object, an array, or an object wrapping an invalid item
+        WHEN its items are decoded
+        THEN it is rejected
+        """
+        # when / then
+        with pytest.raises(InvalidStreamError):
+            _ = [item async for item in iter_items(chunked(document, 4))]
+
+
+class TestNdjson:
+
+    @pytest.mark.asyncio
+    async def test_items_are_encoded_one_per_line(self):
+        """
+        GIVEN items
+        WHEN they are encoded
+        THEN every item is on a line of its own
+        """
+        # when
+        lines = [line async for line in ndjson(iter_items(chunked(DOCUMENT, 8)))]
+
+        # then
+        assert [json.loads(line) for line in lines] == json.loads(DOCUMENT)["data"]
+        assert all(line.endswith(b"\n") and line.count(b"\n") == 1 for line in lines)
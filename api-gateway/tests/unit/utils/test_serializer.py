@@ -0,0 +1,63 @@
+"""
+Test module for serializer.py
+"""
+import datetime
+
+import pytest
+
+from app.domain.events.scheduler_service import MeetingScheduled, OptionVoted
+from app.domain.schemas import ResponseModels
+from app.utils import serializer
+from app.utils.serializer import ModelResponse
+
+MEETINGS = ResponseModels[MeetingScheduled](data=[
+    MeetingScheduled(id="1", organizer="johndoe", voting=True, title="Sprint Planning", description=None,
+                     location="Room 1", date=datetime.datetime(2023, 5, 3, 9, 30, tzinfo=datetime.timezone.utc),
+                     guests=["clarasmith"],
+                     options=[OptionVoted(date=datetime.datetime(2023, 5, 3, 9, 30), votes=["josé"])]),
+])
+
+
+class TestModelResponse:
+
+    def test_model_is_rendered_camel_case_without_none(self):
+        """
+        GIVEN a response wrapping camel case models
+        WHEN it is rendered
+        THEN the members are aliased, and the unset ones left out
+        """
+        # when
+        response = ModelResponse(content=MEETINGS)
+
+        # then
+        assert response.body == (
+            '{"data":[{"id":"1","organizer":"johndoe","voting":true,"title":"Sprint Planning","location":"Room 1",'
+            '"date":"2023-05-03T09:30:00+00:00","guests":["clarasmith"],'
+            '"options":[{"date":"2023-05-03T09:30:00","votes":["josé"]}]}]}'
+        ).encode()
+
+    def test_standard_library_renders_the_same(self, monkeypatch):
+        """
+        GIVEN orjson is not installed
+        WHEN a response is rendered
+        THEN its body is the same as with orjson
+        """
+        # given
+        body = ModelResponse(content=MEETINGS).body
+        monkeypatch.setattr(serializer, "orjson", None)
+
+        # when
+        response = ModelResponse(content=MEETINGS)
+
+        # then
+        assert response.body == body
+
+    @pytest.mark.parametrize("value", [{"data": [1, "é", None]}, {1: True}])
+    def test_values_round_trip(self, value):
+        """
+        GIVEN a JSON encode-able value
+        WHEN it is encoded and decoded back
+        THEN it is unchanged, but for its keys which become strings
+        """
+        # when / then
+        assert serializer.loads(serializer.dumps(value)) == {str(key): item for key, item in value.items()}